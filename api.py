@@ -3,11 +3,21 @@
 AudioMate Backend API Server
 
 REST API endpoints for script generation and speech synthesis.
+
+Served through the create_app() factory, which also starts the warmup phase
+(see warmup.py); for multi-worker deployments:
+
+    gunicorn -w 4 --threads 8 -b 0.0.0.0:5001 'api:create_app()'
 """
 
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Blueprint, request, jsonify, send_file, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import os
+import json
+import time
+import queue
+import threading
+import mimetypes
 from pathlib import Path
 import traceback
 from dotenv import load_dotenv
@@ -15,15 +25,54 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-from llm import ScriptGenerator
+from llm import ScriptGenerator, SCRIPT_FIELDS, get_script_cache
 from speech_generator import ElevenLabsSpeechGenerator
+from jobs import JobManager, JobQueueFull
+from mixing import Rendition
+from batch import DEFAULT_BATCH_CONCURRENCY
+from pipeline import generate_ad, AdCancelled
+from time_stretch import parse_stretch_options
+from warmup import Warmup, default_steps
+from output_store import get_output_store, DEFAULT_PAGE_SIZE, FILTER_COLUMNS
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend requests
+# Every endpoint; registered on the app by create_app
+routes = Blueprint('api', __name__)
 
 # Initialize the speech generator
 speech_generator = None
 
+# Startup warmup of this worker (set by create_app)
+warmup = None
+
+# Background render jobs: a bounded pool so request threads stay free
+job_manager = JobManager(
+    max_workers=int(os.getenv('RENDER_WORKERS', '4')),
+    max_queued=int(os.getenv('RENDER_QUEUE_SIZE', '32'))
+)
+
+# Upper bound for the per-request max_concurrency of /api/generate-batch
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '8'))
+
+# Seconds between keep-alive comments on idle server-sent event streams
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def sse_event(event, data, event_id=None):
+    """Format one server-sent event with a JSON payload."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def render_params(tone, gender, background_music, language, **options):
+    """Parameters recorded with a render in the output store (options that are None are left out)."""
+    params = {'tone': tone, 'gender': gender, 'background_music': background_music, 'language': language}
+    params.update((key, value) for key, value in options.items() if value is not None)
+    return params
+
 def init_speech_generator():
     """Initialize the speech generator with API key from environment."""
     global speech_generator
@@ -34,7 +83,7 @@ def init_speech_generator():
     speech_generator = ElevenLabsSpeechGenerator(api_key=api_key)
 
 
-@app.route('/api/generate-script', methods=['POST'])
+@routes.route('/api/generate-script', methods=['POST'])
 def generate_script():
     """
     Generate a script using LLM API.
@@ -51,24 +100,19 @@ def generate_script():
     
     Returns:
     - script: string (the generated script)
+    - cached: boolean (answered from the script cache without calling Gemini)
     """
     try:
         data = request.get_json()
         
         # Validate required fields
-        required_fields = [
-            'product_name', 'product_details', 'company_context', 
-            'target_audience', 'distribution_method', 'desired_length',
-            'example_output', 'language'
-        ]
-        
-        missing_fields = [field for field in required_fields if field not in data]
+        missing_fields = [field for field in SCRIPT_FIELDS if field not in data]
         if missing_fields:
             return jsonify({
                 'error': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Create script generator with user inputs
+        # Create script generator with user inputs (shares the process-wide Gemini client and script cache)
         script_generator = ScriptGenerator(data)
         
         # Generate the script
@@ -76,6 +120,7 @@ def generate_script():
         
         return jsonify({
             'script': script,
+            'cached': script_generator.cached,
             'inputs': data
         }), 200
         
@@ -87,7 +132,256 @@ def generate_script():
         }), 500
 
 
-@app.route('/api/generate-speech', methods=['POST'])
+@routes.route('/api/generate-script/stream', methods=['POST'])
+def generate_script_stream():
+    """
+    Generate a script and stream it as server-sent events while the model writes it.
+    
+    Request body: same fields as /api/generate-script.
+    
+    Returns:
+    - text/event-stream with:
+      - token events ({"text": fragment}) as the model produces them
+      - one done event with the full script and metadata (model, cached,
+        time_to_first_token, elapsed, usage, inputs)
+      - or one error event ({"error": message}) if generation fails midway
+    """
+    data = request.get_json(silent=True) or {}
+    missing_fields = [field for field in SCRIPT_FIELDS if field not in data]
+    if missing_fields:
+        return jsonify({
+            'error': f'Missing required fields: {", ".join(missing_fields)}'
+        }), 400
+    
+    script_generator = ScriptGenerator(data)
+    
+    def stream():
+        try:
+            for index, text in enumerate(script_generator.stream_script()):
+                yield sse_event('token', {'text': text}, event_id=index)
+            yield sse_event('done', {**script_generator.metadata, 'inputs': data})
+        except Exception as e:
+            print(f"Error streaming script: {e}")
+            traceback.print_exc()
+            yield sse_event('error', {'error': f'Failed to generate script: {str(e)}'})
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@routes.route('/api/generate-ad', methods=['POST'])
+def generate_ad_stream():
+    """
+    Write a script and render it to speech in one pass, as server-sent events.
+    
+    Sentences are sent to TTS as soon as the model finishes them, while voice
+    selection and music preparation run in parallel (see pipeline.py).
+    
+    Request body: the /api/generate-script fields, plus optional tone, gender,
+    background_music and (speech) language, as for /api/generate-speech, and
+    target_duration/max_stretch; fit_to_length: true uses desired_length as the
+    target duration.
+    
+    The render runs in the job pool, like async /api/generate-speech renders (503 when
+    the queue is full), and is abandoned if the client disconnects before it is saved.
+    
+    Returns:
+    - text/event-stream with token, sentence, voice_selected, synthesized, script_done
+      and mixing events, then a done event (script, filename, filepath, sentences,
+      duration, timings) or an error event
+    """
+    if not speech_generator:
+        return jsonify({
+            'error': 'ElevenLabs API key not configured. Please set ELEVENLABS_API_KEY environment variable.'
+        }), 500
+    
+    data = request.get_json(silent=True) or {}
+    missing_fields = [field for field in SCRIPT_FIELDS if field not in data]
+    if missing_fields:
+        return jsonify({
+            'error': f'Missing required fields: {", ".join(missing_fields)}'
+        }), 400
+    
+    try:
+        stretch = parse_stretch_options(data)
+        if 'target_duration' not in stretch and data.get('fit_to_length'):
+            stretch.update(parse_stretch_options({'target_duration': data['desired_length']}))
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    script_generator = ScriptGenerator(data)
+    events = queue.Queue()
+    # Set when the client goes away: the pipeline stops instead of rendering for nobody
+    disconnected = threading.Event()
+    
+    def on_event(event, **info):
+        # The pipeline's own done event carries a local path; run() sends the public one
+        if event != 'done':
+            events.put((event, info))
+    
+    def run(progress=None):
+        try:
+            result = generate_ad(
+                script_generator,
+                speech_generator,
+                tone=data.get('tone', 'professional'),
+                gender=data.get('gender', 'neutral'),
+                background_music=data.get('background_music', 'none'),
+                language=data.get('language', 'english'),
+                on_event=on_event,
+                cancel_event=disconnected,
+                **stretch
+            )
+            record = get_output_store().add(
+                result['filepath'],
+                render_params(data.get('tone', 'professional'), data.get('gender', 'neutral'),
+                              data.get('background_music', 'none'), data.get('language', 'english'),
+                              source='generate-ad', characters=len(result['script']), **stretch),
+                duration=result['duration']
+            )
+            done = {
+                'script': result['script'],
+                'voice_id': result['voice_id'],
+                'id': record['id'],
+                'filename': record['filename'],
+                'filepath': record['filepath'],
+                'sentences': result['sentences'],
+                'duration': result['duration'],
+                'timings': result['timings'],
+                'metadata': result['metadata']
+            }
+            events.put(('done', done))
+            return done
+        except AdCancelled:
+            print(f"🛑 Ad generation stopped: the client disconnected")
+            raise
+        except Exception as e:
+            print(f"Error generating ad: {e}")
+            traceback.print_exc()
+            events.put(('error', {'error': f'Failed to generate ad: {str(e)}'}))
+            raise
+    
+    try:
+        job_manager.submit('ad', run)
+    except JobQueueFull as e:
+        return jsonify({
+            'error': str(e)
+        }), 503
+    
+    def stream():
+        event_id = 0
+        try:
+            while True:
+                try:
+                    event, info = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event(event, info, event_id=event_id)
+                event_id += 1
+                if event in ('done', 'error'):
+                    return
+        finally:
+            disconnected.set()
+    
+    response = Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Also covers a client that disconnects before the first event
+    response.call_on_close(disconnected.set)
+    return response
+
+
+def render_speech(script, tone, gender, background_music, language, chunked=False, renditions=None, progress=None,
+                  target_duration=None, max_stretch=None):
+    """
+    Render one ad to the outputs directory (shared by the sync and job endpoints)
+    and record it in the output store.
+    
+    Returns:
+    - dict with id, filename and filepath of the rendered file, plus files (one entry per
+      rendition) when renditions were requested; an output identical to an earlier one
+      points at the earlier file
+    """
+    # Generate output filename
+    output_file = ElevenLabsSpeechGenerator.generate_output_filename(
+        tone=tone,
+        gender=gender,
+        language=language,
+        background_music=background_music
+    )
+    
+    stretch = {'target_duration': target_duration}
+    if max_stretch is not None:
+        stretch['max_stretch'] = max_stretch
+    params = render_params(tone, gender, background_music, language, chunked=chunked,
+                           characters=len(script), **stretch)
+    
+    if renditions:
+        # One synthesis and mix, encoded to every rendition in parallel
+        written = speech_generator.generate_speech_renditions(
+            script,
+            renditions,
+            output_file=output_file,
+            tone=tone,
+            gender=gender,
+            background_music=background_music,
+            language=language,
+            chunked=chunked,
+            progress_callback=progress,
+            **stretch
+        )
+        if not written:
+            raise RuntimeError('Speech synthesis failed, no audio was produced')
+        
+        files = []
+        for path, rendition in written:
+            record = get_output_store().add(path, {**params, 'rendition': rendition.to_dict()})
+            files.append({
+                'id': record['id'],
+                'filename': record['filename'],
+                'filepath': record['filepath'],
+                'size': record['size'],
+                **rendition.to_dict()
+            })
+        return {
+            'id': files[0]['id'],
+            'filename': files[0]['filename'],
+            'filepath': files[0]['filepath'],
+            'files': files
+        }
+    
+    # Generate speech
+    result = speech_generator.generate_speech(
+        script,
+        output_file=output_file,
+        tone=tone,
+        gender=gender,
+        background_music=background_music,
+        language=language,
+        chunked=chunked,
+        progress_callback=progress,
+        **stretch
+    )
+    if not result or not Path(result).exists():
+        raise RuntimeError('Speech synthesis failed, no audio was produced')
+    
+    record = get_output_store().add(result, params)
+    return {
+        'id': record['id'],
+        'filename': record['filename'],
+        'filepath': record['filepath']
+    }
+
+
+@routes.route('/api/generate-speech', methods=['POST'])
 def generate_speech():
     """
     Generate speech from script using ElevenLabs API.
@@ -98,10 +392,25 @@ def generate_speech():
     - gender: string ("male", "female", "neutral")
     - background_music: string (e.g., "electronic", "ambient", "upbeat", "classical", "acoustic", "none")
     - language: string (e.g., "english", "spanish", "french", etc.)
+    - chunked: boolean (optional; synthesize long scripts as parallel sentence chunks)
+    - renditions: list (optional; delivery formats rendered from a single mix, each a codec
+      name or {codec, bitrate, sample_rate, channels}, e.g. [{"codec": "mp3", "bitrate": 192},
+      {"codec": "mp3", "bitrate": 48, "sample_rate": 22050}, "wav"])
+    - target_duration: number (optional; time-stretch the speech to exactly this many seconds,
+      e.g. a 15/30/60 s slot, instead of re-synthesizing)
+    - max_stretch: number (optional; largest tempo change for target_duration, default 0.15 = ±15%)
+    - async: boolean (optional; queue the render as a background job and return immediately)
     
     Returns:
-    - filename: string (the output filename)
+    - filename: string (the output filename; the first rendition when several were requested)
+    - id: string (render id in the output store)
     - filepath: string (relative path to the file)
+    - files: list (with renditions: id, filename, filepath, size, codec, bitrate, sample_rate, channels)
+    
+    With async=true, returns 202 with:
+    - job_id: string
+    - status_url: string (poll for job status)
+    - events_url: string (server-sent events stream of render stages)
     """
     try:
         if not speech_generator:
@@ -117,23 +426,255 @@ def generate_speech():
                 'error': 'Missing required field: script'
             }), 400
         
-        script = data.get('script')
+        options = {
+            'tone': data.get('tone', 'professional'),
+            'gender': data.get('gender', 'neutral'),
+            'background_music': data.get('background_music', 'none'),
+            'language': data.get('language', 'english'),
+            'chunked': bool(data.get('chunked', False))
+        }
+        
+        try:
+            options.update(parse_stretch_options(data))
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                'error': str(e)
+            }), 400
+        
+        if data.get('renditions'):
+            if not isinstance(data['renditions'], list):
+                return jsonify({
+                    'error': 'renditions must be a list'
+                }), 400
+            try:
+                options['renditions'] = [Rendition.from_spec(spec) for spec in data['renditions']]
+            except (TypeError, ValueError) as e:
+                return jsonify({
+                    'error': f'Invalid renditions: {e}'
+                }), 400
+        
+        if data.get('async'):
+            try:
+                job = job_manager.submit('speech', render_speech, data['script'], **options)
+            except JobQueueFull as e:
+                return jsonify({
+                    'error': str(e)
+                }), 503
+            
+            return jsonify({
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f"/api/jobs/{job.id}",
+                'events_url': f"/api/jobs/{job.id}/events"
+            }), 202
+        
+        result = render_speech(data['script'], **options)
+        
+        return jsonify({
+            **result,
+            'message': 'Speech generated successfully'
+        }), 200
+        
+    except Exception as e:
+        print(f"Error generating speech: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'error': f'Failed to generate speech: {str(e)}'
+        }), 500
+
+
+def record_batch_item(result, batch_id):
+    """Record a finished batch item in the output store, pointing the result at the indexed files."""
+    params = render_params(result.get('tone'), result.get('gender'), result.get('background_music'),
+                           result.get('language'), source='batch', batch_id=batch_id)
+    for entry in result.get('files') or [result]:
+        rendition = {key: entry[key] for key in ('codec', 'bitrate', 'sample_rate', 'channels') if key in entry}
+        record = get_output_store().add(entry['filepath'], {**params, **({'rendition': rendition} if rendition else {})})
+        entry.update(id=record['id'], filename=record['filename'], filepath=record['filepath'])
+    if result.get('files'):
+        result.update(id=result['files'][0]['id'], filename=result['files'][0]['filename'],
+                      filepath=result['files'][0]['filepath'])
+
+
+@routes.route('/api/generate-batch', methods=['POST'])
+def generate_batch():
+    """
+    Render a matrix of scripts × voice/music combinations, streaming results as they finish.
+    
+    Request body should contain:
+    - scripts: list of strings
+    - combinations: list of {tone, gender, language, background_music} (optional), or
+    - tones, genders, languages, background_music: lists whose cartesian product is rendered
+    - chunked: boolean (optional)
+    - renditions: list (optional; as in /api/generate-speech, applied to every item)
+    - max_concurrency: integer (optional; syntheses running at once, capped by BATCH_MAX_CONCURRENCY)
+    
+    Returns:
+    - application/x-ndjson stream: one {"type": "plan", ...} line, one {"type": "item", ...}
+      line per finished item (status, filename, filepath or error), then {"type": "done", ...}
+    """
+    try:
+        if not speech_generator:
+            return jsonify({
+                'error': 'ElevenLabs API key not configured. Please set ELEVENLABS_API_KEY environment variable.'
+            }), 500
+        
+        data = request.get_json()
+        scripts = data.get('scripts')
+        if not isinstance(scripts, list) or not scripts or not all(isinstance(script, str) and script.strip() for script in scripts):
+            return jsonify({
+                'error': 'scripts must be a non-empty list of strings'
+            }), 400
+        
+        try:
+            max_concurrency = min(int(data.get('max_concurrency', DEFAULT_BATCH_CONCURRENCY)), BATCH_MAX_CONCURRENCY)
+            plan, results = speech_generator.generate_batch(
+                scripts,
+                combinations=data.get('combinations'),
+                tones=data.get('tones'),
+                genders=data.get('genders'),
+                languages=data.get('languages'),
+                background_music=data.get('background_music'),
+                max_concurrency=max_concurrency,
+                chunked=bool(data.get('chunked', False)),
+                renditions=data.get('renditions')
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                'error': str(e)
+            }), 400
+        
+        def stream():
+            counts = {'succeeded': 0, 'failed': 0}
+            started = time.time()
+            yield json.dumps({'type': 'plan', **plan.summary()}) + "\n"
+            for result in results:
+                counts[result['status']] += 1
+                if result['status'] == 'succeeded':
+                    record_batch_item(result, plan.batch_id)
+                yield json.dumps({'type': 'item', **result}) + "\n"
+            yield json.dumps({'type': 'done', **counts, 'elapsed': round(time.time() - started, 3)}) + "\n"
+        
+        return Response(
+            stream_with_context(stream()),
+            mimetype='application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
+    except Exception as e:
+        print(f"Error generating batch: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'error': f'Failed to generate batch: {str(e)}'
+        }), 500
+
+
+@routes.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status of a render job.
+    
+    Returns:
+    - job_id, status (queued, running, succeeded, failed), stage, result, error, events
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            'error': f'Job not found: {job_id}'
+        }), 404
+    
+    return jsonify(job.to_dict()), 200
+
+
+@routes.route('/api/jobs/<job_id>/events', methods=['GET'])
+def get_job_events(job_id):
+    """
+    Follow a render job as a server-sent events stream.
+    
+    Each event is named after the stage it reports (queued, running, voice_selection,
+    synthesis, mixing, encoding, succeeded, failed); the stream ends when the job finishes.
+    Reconnecting clients resume after the Last-Event-ID they received.
+    
+    Returns:
+    - text/event-stream
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            'error': f'Job not found: {job_id}'
+        }), 404
+    
+    try:
+        next_event = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        next_event = 0
+    
+    def stream():
+        nonlocal next_event
+        while True:
+            events = job.wait_for_events(next_event, timeout=SSE_KEEPALIVE_SECONDS)
+            if not events and not job.finished:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield sse_event(event['stage'], event, event_id=event['id'])
+            next_event += len(events)
+            if job.finished and next_event >= len(job.events):
+                return
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@routes.route('/api/generate-speech/stream', methods=['GET', 'POST'])
+def generate_speech_stream():
+    """
+    Stream speech mixed with background music while it is being synthesized.
+    
+    Accepts the same fields as /api/generate-speech, either as a JSON body (POST)
+    or as query parameters (GET, so an <audio> element can play it directly).
+    
+    Returns:
+    - Chunked audio/wav response; the first audio arrives with the first TTS chunk
+    - X-Audio-Filename header: name of the saved copy, retrievable via /api/audio/<filename>
+    """
+    try:
+        if not speech_generator:
+            return jsonify({
+                'error': 'ElevenLabs API key not configured. Please set ELEVENLABS_API_KEY environment variable.'
+            }), 500
+        
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        data = data or {}
+        
+        if not data.get('script'):
+            return jsonify({
+                'error': 'Missing required field: script'
+            }), 400
+        
         tone = data.get('tone', 'professional')
         gender = data.get('gender', 'neutral')
         background_music = data.get('background_music', 'none')
         language = data.get('language', 'english')
         
-        # Generate output filename
         output_file = ElevenLabsSpeechGenerator.generate_output_filename(
             tone=tone,
             gender=gender,
             language=language,
-            background_music=background_music
+            background_music=background_music,
+            extension='wav'
         )
         
-        # Generate speech
-        speech_generator.generate_speech(
-            script,
+        params = render_params(tone, gender, background_music, language, source='stream',
+                               characters=len(data['script']))
+        
+        # Voice selection and the TTS request run here, so failures still return JSON errors
+        audio_stream = speech_generator.generate_speech_stream(
+            data['script'],
             output_file=output_file,
             tone=tone,
             gender=gender,
@@ -141,34 +682,53 @@ def generate_speech():
             language=language
         )
         
-        # Extract relative path from absolute path
-        filename = Path(output_file).name
-        filepath = f"outputs/{filename}"
+        def stream_and_record():
+            try:
+                yield from audio_stream
+            finally:
+                audio_stream.close()
+                # Only complete streams are renders (an incomplete one's file is already removed).
+                # Its name is already in the response headers, so the file is never deduplicated away
+                if audio_stream.completed and Path(output_file).exists():
+                    try:
+                        get_output_store().add(output_file, params, deduplicate=False)
+                    except Exception as e:
+                        print(f"⚠️  Failed to index {output_file}: {e}")
         
-        return jsonify({
-            'filename': filename,
-            'filepath': filepath,
-            'message': 'Speech generated successfully'
-        }), 200
+        try:
+            response = Response(
+                stream_with_context(stream_and_record()),
+                mimetype='audio/wav',
+                headers={
+                    'X-Audio-Filename': Path(output_file).name,
+                    'Cache-Control': 'no-store'
+                }
+            )
+            # Releases the TTS slot even if the client goes away before the first chunk
+            response.call_on_close(audio_stream.close)
+        except Exception:
+            audio_stream.close()
+            raise
+        return response
         
     except Exception as e:
-        print(f"Error generating speech: {e}")
+        print(f"Error streaming speech: {e}")
         traceback.print_exc()
         return jsonify({
-            'error': f'Failed to generate speech: {str(e)}'
+            'error': f'Failed to stream speech: {str(e)}'
         }), 500
 
 
-@app.route('/api/audio/<filename>', methods=['GET'])
+@routes.route('/api/audio/<filename>', methods=['GET'])
 def get_audio(filename):
     """
     Retrieve an audio file from the outputs directory.
     
     Parameters:
-    - filename: string (the name of the audio file)
+    - filename: string (the name of the audio file, or a render id)
     
     Returns:
-    - Audio file (MP3)
+    - Audio file (MP3, or WAV for streamed renders)
     """
     try:
         # Security check: prevent directory traversal
@@ -177,11 +737,9 @@ def get_audio(filename):
                 'error': 'Invalid filename'
             }), 400
         
-        # Construct the file path
-        file_path = Path('outputs') / filename
-        
-        # Check if file exists
-        if not file_path.exists():
+        # Only indexed renders are served
+        file_path = get_output_store().resolve(filename)
+        if file_path is None:
             return jsonify({
                 'error': f'Audio file not found: {filename}'
             }), 404
@@ -189,7 +747,7 @@ def get_audio(filename):
         # Send the file
         return send_file(
             str(file_path),
-            mimetype='audio/mpeg',
+            mimetype=mimetypes.guess_type(file_path.name)[0] or 'audio/mpeg',
             as_attachment=False
         )
         
@@ -201,9 +759,128 @@ def get_audio(filename):
         }), 500
 
 
+@routes.route('/api/audio/<filename>/analysis', methods=['GET'])
+def get_audio_analysis(filename):
+    """
+    Retrieve the analysis sidecar of an audio file.
+    
+    Written while the render was mixed; files without one (e.g. unmixed TTS output)
+    are decoded once and the sidecar is saved for next time.
+    
+    Parameters:
+    - filename: string (the name of the audio file, or a render id)
+    
+    Returns:
+    - sample_rate, frames, duration
+    - peaks: zoom levels of interleaved 8-bit min/max pairs ({samples_per_peak, bits, length, data})
+    - loudness: integrated_lufs, short_term_max_lufs, short_term_lufs (every short_term_hop_seconds)
+    - sample_peak_dbfs, true_peak_dbtp, clipped_samples
+    """
+    from audio_analysis import SIDECAR_SUFFIX, sidecar_path, load_or_create_sidecar
+    
+    try:
+        if '..' in filename or '/' in filename or '\\' in filename or filename.endswith(SIDECAR_SUFFIX):
+            return jsonify({
+                'error': 'Invalid filename'
+            }), 400
+        
+        file_path = get_output_store().resolve(filename)
+        if file_path is None:
+            return jsonify({
+                'error': f'Audio file not found: {filename}'
+            }), 404
+        
+        load_or_create_sidecar(str(file_path))
+        return send_file(sidecar_path(str(file_path)), mimetype='application/json', as_attachment=False)
+        
+    except Exception as e:
+        print(f"Error analyzing audio: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'error': f'Failed to analyze audio: {str(e)}'
+        }), 500
+
+
+@routes.route('/api/renders', methods=['GET'])
+def list_renders():
+    """
+    Page through rendered files, newest first (served from the output index).
+    
+    Query parameters:
+    - limit: integer (optional, default 50, at most 500)
+    - cursor: string (optional; next_cursor of the previous page)
+    - tone, gender, language, background_music: string (optional exact filters)
+    
+    Returns:
+    - renders: list of {id, filename, filepath, size, duration, format, content_hash, params, created_at, ...}
+    - next_cursor: string, or null on the last page
+    """
+    try:
+        renders, next_cursor = get_output_store().list(
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE),
+            cursor=request.args.get('cursor'),
+            **{column: request.args.get(column) for column in FILTER_COLUMNS}
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    return jsonify({
+        'renders': renders,
+        'next_cursor': next_cursor
+    }), 200
+
+
+@routes.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Report cache statistics.
+    
+    Returns:
+    - voice_catalog: catalog version, voice count and freshness
+    - tts_cache: hit/miss counters and size of the TTS audio cache
+    - music_cache: decoded music beds in memory and how they were obtained (hits, mmap loads, decodes)
+    - tts_scheduler: TTS queue depth, requests in flight, current concurrency limit, wait times and 429s
+    - jobs: render worker pool size and job counts by status
+    - script_cache: entries, hit/miss counters and evictions of the generated script cache
+    - output_store: indexed renders and files, their total size, deduplicated and swept renders
+    """
+    if not speech_generator:
+        return jsonify({
+            'error': 'ElevenLabs API key not configured. Please set ELEVENLABS_API_KEY environment variable.'
+        }), 500
+    
+    return jsonify({
+        **speech_generator.get_cache_stats(),
+        'jobs': job_manager.stats(),
+        'script_cache': get_script_cache().stats(),
+        'output_store': get_output_store().stats()
+    }), 200
+
+
+@routes.route('/api/ready', methods=['GET'])
+def get_readiness():
+    """
+    Readiness probe: whether this worker finished its startup warmup.
+    
+    Returns:
+    - 200 once warmup is done (503 while it is still running), with:
+    - ready: boolean
+    - ok: boolean (every warmup step succeeded)
+    - seconds: warmup duration so far
+    - steps: status (pending, running, done, failed) and seconds of each step
+    """
+    if warmup is None:
+        return jsonify({'ready': False, 'ok': False, 'steps': {}}), 503
+    
+    status = warmup.to_dict()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
 # Serve frontend static files (must be last, after all API routes)
-@app.route('/', defaults={'path': ''}, methods=['GET'])
-@app.route('/<path:path>', methods=['GET'])
+@routes.route('/', defaults={'path': ''}, methods=['GET'])
+@routes.route('/<path:path>', methods=['GET'])
 def serve_frontend(path):
     """Serve the frontend application."""
     from flask import send_from_directory
@@ -223,13 +900,45 @@ def serve_frontend(path):
     return send_from_directory(frontend_path, 'index.html')
 
 
-if __name__ == '__main__':
-    # Create outputs directory if it doesn't exist
+def create_app(run_warmup=True, wait_for_warmup=False):
+    """
+    Build the Flask app for one worker process.
+    
+    Creates the speech generator and starts the warmup phase (codec probing, audio
+    imports, voice catalog, music beds, Gemini client). Requests are accepted right
+    away; /api/ready answers 503 until warmup has finished.
+    
+    Args:
+        run_warmup (bool): Warm the hot-path state at startup
+        wait_for_warmup (bool): Finish warmup before returning instead of in the background
+    
+    Returns:
+        Flask
+    """
+    global warmup
+    
+    app = Flask(__name__)
+    CORS(app, expose_headers=['X-Audio-Filename'])  # Enable CORS for frontend requests
+    app.register_blueprint(routes)
+    
+    # Create outputs directory and its index; the sweeper applies the retention settings
     Path('outputs').mkdir(exist_ok=True)
+    get_output_store().start_sweeper()
     
     # Initialize the speech generator
     init_speech_generator()
     
-    # Run the Flask app
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    warmup = Warmup(default_steps(speech_generator) if run_warmup else [])
+    if wait_for_warmup or not run_warmup:
+        warmup.run()
+    else:
+        warmup.start()
+    return app
+
+
+if __name__ == '__main__':
+    app = create_app()
+    
+    # Run the Flask app (the reloader would build and warm a second copy)
+    app.run(debug=True, host='0.0.0.0', port=5001, use_reloader=False)
 
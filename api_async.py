@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+AudioMate Async API Server
+
+ASGI variant of api.py for high concurrency: the same /api/generate-script,
+/api/generate-speech and /api/audio contract, but renders wait on ElevenLabs
+and Gemini as asyncio tasks (pooled httpx.AsyncClient, Gemini's client.aio)
+instead of each holding an OS thread. CPU-bound mixing and encoding run in a
+thread pool, so one process can hold hundreds of in-flight renders.
+
+Run with:  uvicorn api_async:app --host 0.0.0.0 --port 5001
+"""
+
+import os
+import mimetypes
+import traceback
+from pathlib import Path
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, FileResponse
+from starlette.routing import Route
+from starlette.concurrency import run_in_threadpool
+
+from llm import ScriptGenerator, SCRIPT_FIELDS, get_script_cache
+from speech_generator import ElevenLabsSpeechGenerator
+from async_speech import AsyncSpeechClient, DEFAULT_MAX_CONNECTIONS
+from mixing import Rendition
+from time_stretch import parse_stretch_options
+from warmup import Warmup, default_steps
+from audio_analysis import SIDECAR_SUFFIX, sidecar_path, load_or_create_sidecar
+from output_store import get_output_store, DEFAULT_PAGE_SIZE, FILTER_COLUMNS
+
+# Load environment variables
+load_dotenv()
+
+NOT_CONFIGURED = 'ElevenLabs API key not configured. Please set ELEVENLABS_API_KEY environment variable.'
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Build the shared generator and async client on startup; close the connection pool on shutdown."""
+    Path('outputs').mkdir(exist_ok=True)
+    get_output_store().start_sweeper()
+    app.state.speech = None
+    generator = None
+
+    api_key = os.getenv('ELEVENLABS_API_KEY')
+    if not api_key:
+        print("⚠️  Warning: ELEVENLABS_API_KEY not set. Speech generation will not work.")
+    else:
+        generator = ElevenLabsSpeechGenerator(api_key=api_key)
+        app.state.speech = AsyncSpeechClient(
+            generator, max_connections=int(os.getenv('ASYNC_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS))
+        )
+
+    # Same warmup as the Flask app, in the background; /api/ready reports it
+    app.state.warmup = Warmup(default_steps(generator)).start()
+
+    yield
+
+    if app.state.speech:
+        await app.state.speech.aclose()
+
+
+async def generate_script(request):
+    """Generate a script (same contract as api.py: returns script, cached and inputs)."""
+    try:
+        data = await request.json()
+        missing_fields = [field for field in SCRIPT_FIELDS if field not in data]
+        if missing_fields:
+            return JSONResponse({
+                'error': f'Missing required fields: {", ".join(missing_fields)}'
+            }, status_code=400)
+
+        script_generator = ScriptGenerator(data)
+        script = await script_generator.generate_script_async()
+
+        return JSONResponse({
+            'script': script,
+            'cached': script_generator.cached,
+            'inputs': data
+        })
+
+    except Exception as e:
+        print(f"Error generating script: {e}")
+        traceback.print_exc()
+        return JSONResponse({
+            'error': f'Failed to generate script: {str(e)}'
+        }, status_code=500)
+
+
+async def generate_speech(request):
+    """
+    Generate speech from a script (same contract as api.py: script, tone, gender,
+    background_music, language, chunked, renditions, target_duration, max_stretch).
+
+    Every request is already non-blocking here, so ``async: true`` is accepted but the
+    response is always the finished render.
+    """
+    try:
+        speech = request.app.state.speech
+        if not speech:
+            return JSONResponse({'error': NOT_CONFIGURED}, status_code=500)
+
+        data = await request.json()
+        if 'script' not in data:
+            return JSONResponse({
+                'error': 'Missing required field: script'
+            }, status_code=400)
+
+        options = {
+            'tone': data.get('tone', 'professional'),
+            'gender': data.get('gender', 'neutral'),
+            'background_music': data.get('background_music', 'none'),
+            'language': data.get('language', 'english'),
+            'chunked': bool(data.get('chunked', False))
+        }
+        try:
+            options.update(parse_stretch_options(data))
+            if data.get('renditions'):
+                if not isinstance(data['renditions'], list):
+                    raise ValueError('renditions must be a list')
+                options['renditions'] = [Rendition.from_spec(spec) for spec in data['renditions']]
+        except (TypeError, ValueError) as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        output_file = ElevenLabsSpeechGenerator.generate_output_filename(
+            tone=options['tone'],
+            gender=options['gender'],
+            language=options['language'],
+            background_music=options['background_music']
+        )
+        written = await speech.generate_speech(data['script'], output_file, **options)
+
+        params = {key: value for key, value in options.items() if key != 'renditions' and value is not None}
+        params['characters'] = len(data['script'])
+        files = []
+        for path, rendition in written:
+            extra = {'rendition': rendition.to_dict()} if rendition else {}
+            # Hashing and the index write are blocking I/O
+            record = await speech.run_blocking(get_output_store().add, path, {**params, **extra})
+            files.append({
+                'id': record['id'],
+                'filename': record['filename'],
+                'filepath': record['filepath'],
+                'size': record['size'],
+                **(rendition.to_dict() if rendition else {})
+            })
+        result = {
+            'id': files[0]['id'],
+            'filename': files[0]['filename'],
+            'filepath': files[0]['filepath']
+        }
+        if options.get('renditions'):
+            result['files'] = files
+        return JSONResponse({
+            **result,
+            'message': 'Speech generated successfully'
+        })
+
+    except Exception as e:
+        print(f"Error generating speech: {e}")
+        traceback.print_exc()
+        return JSONResponse({
+            'error': f'Failed to generate speech: {str(e)}'
+        }, status_code=500)
+
+
+async def get_audio(request):
+    """Retrieve an indexed audio file by filename or render id (streamed without blocking the loop)."""
+    filename = request.path_params['filename']
+    if '..' in filename or '/' in filename or '\\' in filename:
+        return JSONResponse({'error': 'Invalid filename'}, status_code=400)
+
+    file_path = await run_in_threadpool(get_output_store().resolve, filename)
+    if file_path is None:
+        return JSONResponse({'error': f'Audio file not found: {filename}'}, status_code=404)
+
+    return FileResponse(str(file_path), media_type=mimetypes.guess_type(file_path.name)[0] or 'audio/mpeg')
+
+
+async def get_audio_analysis(request):
+    """Analysis sidecar of an audio file (as in api.py); computed off the loop if it's missing."""
+    filename = request.path_params['filename']
+    if '..' in filename or '/' in filename or '\\' in filename or filename.endswith(SIDECAR_SUFFIX):
+        return JSONResponse({'error': 'Invalid filename'}, status_code=400)
+
+    file_path = await run_in_threadpool(get_output_store().resolve, filename)
+    if file_path is None:
+        return JSONResponse({'error': f'Audio file not found: {filename}'}, status_code=404)
+
+    try:
+        await run_in_threadpool(load_or_create_sidecar, str(file_path))
+    except Exception as e:
+        print(f"Error analyzing audio: {e}")
+        traceback.print_exc()
+        return JSONResponse({'error': f'Failed to analyze audio: {str(e)}'}, status_code=500)
+    return FileResponse(sidecar_path(str(file_path)), media_type='application/json')
+
+
+async def list_renders(request):
+    """Page through rendered files, newest first (same query parameters and response as api.py)."""
+    try:
+        renders, next_cursor = await run_in_threadpool(
+            get_output_store().list,
+            limit=request.query_params.get('limit', DEFAULT_PAGE_SIZE),
+            cursor=request.query_params.get('cursor'),
+            **{column: request.query_params.get(column) for column in FILTER_COLUMNS}
+        )
+    except (TypeError, ValueError) as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    return JSONResponse({'renders': renders, 'next_cursor': next_cursor})
+
+
+async def get_stats(request):
+    """Cache, TTS scheduler and script cache statistics (as in api.py, without the job pool)."""
+    speech = request.app.state.speech
+    if not speech:
+        return JSONResponse({'error': NOT_CONFIGURED}, status_code=500)
+    stats = await speech.run_blocking(speech.generator.get_cache_stats)
+    return JSONResponse({
+        **stats,
+        'script_cache': get_script_cache().stats(),
+        'output_store': await run_in_threadpool(get_output_store().stats)
+    })
+
+
+async def get_readiness(request):
+    """Readiness probe: 200 once startup warmup has finished, 503 before (body as in api.py)."""
+    status = request.app.state.warmup.to_dict()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
+
+app = Starlette(
+    routes=[
+        Route('/api/generate-script', generate_script, methods=['POST']),
+        Route('/api/generate-speech', generate_speech, methods=['POST']),
+        Route('/api/audio/{filename}', get_audio, methods=['GET']),
+        Route('/api/audio/{filename}/analysis', get_audio_analysis, methods=['GET']),
+        Route('/api/renders', list_renders, methods=['GET']),
+        Route('/api/stats', get_stats, methods=['GET']),
+        Route('/api/ready', get_readiness, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host='0.0.0.0', port=5001)
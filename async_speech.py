@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Async Speech Client
+
+asyncio counterpart of ElevenLabsSpeechGenerator's render path, used by the
+ASGI server (api_async.py). TTS requests go through one pooled
+httpx.AsyncClient and wait for the shared TTS scheduler without holding a
+thread, so a single process can keep hundreds of renders waiting on the API.
+
+Everything CPU-bound (decoding, chunk joining, time stretching, mixing,
+encoding) and the occasional blocking call (voice catalog refresh, TTS cache
+I/O) runs in a thread pool. Voice selection, request building, caches and
+mixing are shared with the wrapped synchronous generator.
+"""
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from speech_generator import (
+    DEFAULT_TTS_FORMAT, DEFAULT_STREAM_FORMAT, DEFAULT_CHUNK_CONCURRENCY, DEFAULT_CROSSFADE_MS,
+    TTS_RETRY_STATUS_CODES, _no_progress
+)
+from time_stretch import DEFAULT_MAX_STRETCH
+
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MIX_WORKERS = os.cpu_count() or 4
+
+
+class AsyncSpeechClient:
+    def __init__(self, generator, max_connections=DEFAULT_MAX_CONNECTIONS, mix_workers=DEFAULT_MIX_WORKERS):
+        """
+        Wrap a synchronous generator for use from asyncio.
+
+        Args:
+            generator (ElevenLabsSpeechGenerator): Supplies voices, caches, scheduler and mixing
+            max_connections (int): Pooled keep-alive connections to the ElevenLabs API
+            mix_workers (int): Threads for CPU-bound mixing/encoding and blocking calls
+        """
+        self.generator = generator
+        connect_timeout, read_timeout = generator.http.timeout
+        self.http = httpx.AsyncClient(
+            base_url=generator.base_url,
+            headers=generator.headers,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+        self.executor = ThreadPoolExecutor(max_workers=mix_workers, thread_name_prefix='mix')
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        """Run a blocking or CPU-bound call in the mixing pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: fn(*args, **kwargs))
+
+    async def synthesize(self, voice_id, data, output_format=DEFAULT_TTS_FORMAT):
+        """
+        Async synthesize(): TTS cache, then the scheduler, then the API.
+
+        Retries connect errors and 5xx with jittered backoff; a read timeout is not retried,
+        since the API may already have accepted (and billed) the request. A 429 pauses the
+        scheduler queue and the request retries at the front of it.
+
+        Raises:
+            httpx.HTTPError: If the request still fails after the retries
+        """
+        generator = self.generator
+        cache_key = None
+        if generator.tts_cache:
+            cache_key = generator._tts_cache_key(voice_id, data, output_format)
+            audio = await self.run_blocking(generator.tts_cache.get, cache_key)
+            if audio is not None:
+                return audio
+
+        ticket = None
+        attempt = 0
+        while True:
+            slot = await generator.tts_scheduler.acquire_async(len(data["text"]), ticket=ticket)
+            ticket = slot.ticket
+            try:
+                response = await self.http.post(
+                    f"/text-to-speech/{voice_id}",
+                    params={"output_format": output_format},
+                    json=data
+                )
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                slot.release()
+                if attempt >= generator.http.max_retries:
+                    raise
+                await asyncio.sleep(generator.http.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            generator.tts_scheduler.observe(response, slot)
+            slot.release()
+            if attempt < generator.http.max_retries:
+                if response.status_code == 429:
+                    attempt += 1
+                    continue
+                if response.status_code in TTS_RETRY_STATUS_CODES:
+                    delay = generator.http.retry_after(response)
+                    await asyncio.sleep(delay if delay is not None else generator.http.backoff_delay(attempt))
+                    attempt += 1
+                    continue
+            response.raise_for_status()
+            break
+
+        if generator.tts_cache:
+            await self.run_blocking(generator.tts_cache.put, cache_key, response.content)
+        return response.content
+
+    async def generate_speech(self, text, output_file, voice_id=None, stability=0.5, similarity_boost=0.5,
+                              tone=None, gender=None, background_music=None, language=None, chunked=False,
+                              max_concurrency=DEFAULT_CHUNK_CONCURRENCY, target_duration=None,
+                              max_stretch=DEFAULT_MAX_STRETCH, renditions=None, progress_callback=None):
+        """
+        Async counterpart of generate_speech / generate_speech_renditions.
+
+        Returns:
+            list of (str, Rendition or None): Written files (one per rendition, or a single file)
+        """
+        from mixing import Rendition, mix_buffer
+
+        generator = self.generator
+        progress = progress_callback or _no_progress
+
+        if voice_id is None:
+            progress('voice_selection')
+            # Served from the cached catalog; may block on a refresh, so off the event loop
+            voice_id = await self.run_blocking(generator.select_voice, tone=tone, gender=gender, language=language)
+        data = generator.build_tts_request(text, stability, similarity_boost, tone=tone, language=language)
+
+        progress('synthesis', voice_id=voice_id, chunked=chunked)
+        encoded = samples = sample_rate = None
+        if chunked:
+            samples, sample_rate = await self._synthesize_chunked(voice_id, data, language, max_concurrency)
+        else:
+            encoded = await self.synthesize(voice_id, data)
+
+        if target_duration:
+            samples, sample_rate = await self.run_blocking(
+                generator.fit_speech_to_duration, encoded if samples is None else samples, sample_rate,
+                target_duration, max_stretch, progress
+            )
+            encoded = None
+
+        if renditions:
+            renditions = [Rendition.from_spec(spec) for spec in renditions]
+            music = None
+            if background_music and background_music != 'none':
+                progress('mixing', background_music=background_music)
+                music = lambda rate: generator._load_music_samples(background_music, rate)
+
+            def mix_and_encode():
+                mixed, mixed_rate = mix_buffer(samples if samples is not None else encoded, music=music,
+                                               sample_rate=sample_rate)
+                progress('encoding', renditions=len(renditions))
+                return generator._encode_renditions(mixed, mixed_rate, renditions, output_file)
+
+            return await self.run_blocking(mix_and_encode)
+
+        audio = await self.run_blocking(
+            generator.render_synthesized, encoded, samples, sample_rate, background_music=background_music,
+            format=os.path.splitext(output_file)[1].lstrip('.') or 'mp3', progress_callback=progress
+        )
+        path = await self.run_blocking(audio.save, output_file)
+        return [(path, None)]
+
+    async def _synthesize_chunked(self, voice_id, data, language, max_concurrency):
+        """Async synthesize_chunked_samples: chunks are requested concurrently, joined in the pool."""
+        from text_chunker import chunk_text
+        from mixing import pcm16_to_float32, crossfade_join
+
+        sample_rate = int(DEFAULT_STREAM_FORMAT.split("_", 1)[1])
+        lang_code = self.generator.language_codes.get((language or '').lower(), language)
+        chunks = chunk_text(data["text"], lang_code)
+
+        limit = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def synthesize_chunk(i):
+            chunk_data = dict(data, text=chunks[i])
+            if i > 0:
+                chunk_data["previous_text"] = chunks[i - 1]
+            if i + 1 < len(chunks):
+                chunk_data["next_text"] = chunks[i + 1]
+            async with limit:
+                return await self.synthesize(voice_id, chunk_data, DEFAULT_STREAM_FORMAT)
+
+        pcm_chunks = await asyncio.gather(*(synthesize_chunk(i) for i in range(len(chunks))))
+        joined = await self.run_blocking(
+            lambda: crossfade_join([pcm16_to_float32(pcm) for pcm in pcm_chunks], sample_rate,
+                                   crossfade_ms=DEFAULT_CROSSFADE_MS)
+        )
+        return joined, sample_rate
+
+    async def aclose(self):
+        await self.http.aclose()
+        self.executor.shutdown(wait=False)
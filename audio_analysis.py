@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Audio Analysis Sidecars
+
+Computes a compact description of a render from the mixed samples, one block
+at a time, while the mixer still holds them: min/max peak pairs at several
+zoom levels (enough for the frontend to draw a waveform without downloading
+the audio), ITU-R BS.1770 integrated and short-term loudness, true peak
+(4x oversampled) and the number of clipped samples.
+
+The result is stored as ``<audio file>.analysis.json`` next to the output,
+so QC checks and waveform views never decode the audio again.
+"""
+
+import os
+import json
+import math
+import tempfile
+
+from lazy_imports import lazy_module, optional_import
+
+np = lazy_module('numpy')
+
+
+SIDECAR_SUFFIX = '.analysis.json'
+SIDECAR_VERSION = 1
+
+# Finest waveform zoom level; every further level merges ZOOM_FACTOR peaks
+DEFAULT_SAMPLES_PER_PEAK = 512
+ZOOM_FACTOR = 4
+DEFAULT_ZOOM_LEVELS = 3
+
+# Samples this close to full scale count as clipped (the mixer clips to ±1.0)
+CLIP_THRESHOLD = 0.9999
+
+# BS.1770: 400 ms gating blocks every 100 ms, 3 s short-term windows
+SEGMENT_SECONDS = 0.1
+GATE_SEGMENTS = 4
+SHORT_TERM_SEGMENTS = 30
+SHORT_TERM_HOP_SEGMENTS = 10
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+# True peak: 4x oversampling with a 48-tap windowed-sinc interpolator (12 taps per phase)
+OVERSAMPLING = 4
+TRUE_PEAK_TAPS = 48
+
+
+def _k_weighting_sos(sample_rate):
+    """BS.1770 K-weighting (high shelf + high pass) as second-order sections for ``sample_rate``."""
+    # High shelf: +4 dB above ~1.5 kHz, modelling the acoustic effect of the head
+    gain, q, frequency = 4.0, 1 / math.sqrt(2), 1500.0
+    a = 10 ** (gain / 40)
+    w0 = 2 * math.pi * frequency / sample_rate
+    alpha = math.sin(w0) / (2 * q)
+    cos_w0 = math.cos(w0)
+    shelf = [
+        a * ((a + 1) + (a - 1) * cos_w0 + 2 * math.sqrt(a) * alpha),
+        -2 * a * ((a - 1) + (a + 1) * cos_w0),
+        a * ((a + 1) + (a - 1) * cos_w0 - 2 * math.sqrt(a) * alpha),
+        (a + 1) - (a - 1) * cos_w0 + 2 * math.sqrt(a) * alpha,
+        2 * ((a - 1) - (a + 1) * cos_w0),
+        (a + 1) - (a - 1) * cos_w0 - 2 * math.sqrt(a) * alpha,
+    ]
+    # High pass at 38 Hz (the RLB weighting)
+    q, frequency = 0.5, 38.0
+    w0 = 2 * math.pi * frequency / sample_rate
+    alpha = math.sin(w0) / (2 * q)
+    cos_w0 = math.cos(w0)
+    high_pass = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2, 1 + alpha, -2 * cos_w0, 1 - alpha]
+
+    sos = np.array([shelf, high_pass], dtype=np.float64)
+    sos[:, :3] /= sos[:, 3:4]
+    sos[:, 3:] /= sos[:, 3:4].copy()
+    return sos
+
+
+def _true_peak_phases():
+    """Polyphase interpolation filter, shape (taps per phase, OVERSAMPLING); phase 0 reproduces the input."""
+    n = np.arange(TRUE_PEAK_TAPS)
+    h = np.sinc((n - TRUE_PEAK_TAPS // 2) / OVERSAMPLING) * np.kaiser(TRUE_PEAK_TAPS, 8.0)
+    # Output 4j + p of the upsampled signal is sum_i x[j - i] * h[4i + p]: column p holds h[p::4],
+    # reversed so it lines up with a window of inputs ordered oldest first
+    phases = h.reshape(-1, OVERSAMPLING)[::-1]
+    phases /= phases.sum(axis=0, keepdims=True)
+    return np.ascontiguousarray(phases, dtype=np.float32)
+
+
+def _lufs(mean_square):
+    return -0.691 + 10 * math.log10(mean_square) if mean_square > 0 else float('-inf')
+
+
+def _db(value):
+    return round(20 * math.log10(value), 2) if value > 0 else None
+
+
+class AudioAnalyzer:
+    def __init__(self, sample_rate=None, samples_per_peak=DEFAULT_SAMPLES_PER_PEAK, zoom_levels=DEFAULT_ZOOM_LEVELS):
+        """
+        Incremental analysis of a mono float32 signal.
+
+        Args:
+            sample_rate (int, optional): Sample rate; may be given later through start()
+                when only the mixer knows it
+            samples_per_peak (int): Samples per min/max pair at the finest zoom level
+            zoom_levels (int): Number of zoom levels, each ZOOM_FACTOR times coarser
+        """
+        self.samples_per_peak = samples_per_peak
+        self.zoom_levels = zoom_levels
+        self.sample_rate = None
+        if sample_rate:
+            self.start(sample_rate)
+
+    def start(self, sample_rate):
+        """Reset the analysis for a signal at ``sample_rate``."""
+        self.sample_rate = int(sample_rate)
+        self.frames = 0
+        self.sample_peak = 0.0
+        self.true_peak = 0.0
+        self.clipped = 0
+
+        self._mins = []
+        self._maxs = []
+        self._peak_pending = np.zeros(0, dtype=np.float32)
+
+        signal = optional_import('scipy.signal', "Loudness will not be measured")
+        self._sosfilt = signal.sosfilt if signal is not None else None
+        self._sos = _k_weighting_sos(self.sample_rate)
+        self._zi = np.zeros((self._sos.shape[0], 2))
+        self._segment = max(1, int(round(self.sample_rate * SEGMENT_SECONDS)))
+        self._energies = []
+        self._loudness_pending = np.zeros(0, dtype=np.float64)
+
+        self._phases = _true_peak_phases()
+        self._history = np.zeros(self._phases.shape[0] - 1, dtype=np.float32)
+        return self
+
+    def feed(self, block):
+        """Add the next block of samples."""
+        if self.sample_rate is None:
+            raise ValueError("AudioAnalyzer.start(sample_rate) must be called before feed()")
+        block = np.asarray(block, dtype=np.float32)
+        if not len(block):
+            return
+        self.frames += len(block)
+
+        magnitude = np.abs(block)
+        self.sample_peak = max(self.sample_peak, float(magnitude.max()))
+        self.clipped += int(np.count_nonzero(magnitude >= CLIP_THRESHOLD))
+
+        self._feed_peaks(block)
+        self._feed_true_peak(block)
+        if self._sosfilt is not None:
+            self._feed_loudness(block)
+
+    def _feed_peaks(self, block):
+        pending = np.concatenate([self._peak_pending, block]) if len(self._peak_pending) else block
+        whole = len(pending) - len(pending) % self.samples_per_peak
+        if whole:
+            pairs = pending[:whole].reshape(-1, self.samples_per_peak)
+            self._mins.append(pairs.min(axis=1))
+            self._maxs.append(pairs.max(axis=1))
+        self._peak_pending = pending[whole:].copy()
+
+    def _feed_true_peak(self, block):
+        taps = self._phases.shape[0]
+        extended = np.concatenate([self._history, block])
+        # Every window of `taps` inputs, interpolated at OVERSAMPLING points at once
+        windows = np.lib.stride_tricks.sliding_window_view(extended, taps)
+        interpolated = windows @ self._phases
+        self.true_peak = max(self.true_peak, float(np.abs(interpolated).max()))
+        self._history = extended[-(taps - 1):].copy()
+
+    def _feed_loudness(self, block):
+        weighted, self._zi = self._sosfilt(self._sos, block.astype(np.float64), zi=self._zi)
+        pending = np.concatenate([self._loudness_pending, weighted]) if len(self._loudness_pending) else weighted
+        whole = len(pending) - len(pending) % self._segment
+        if whole:
+            self._energies.append(np.mean(np.square(pending[:whole]).reshape(-1, self._segment), axis=1))
+        self._loudness_pending = pending[whole:]
+
+    def _peak_levels(self):
+        mins = np.concatenate(self._mins + ([self._peak_pending.min(keepdims=True)] if len(self._peak_pending) else []))
+        maxs = np.concatenate(self._maxs + ([self._peak_pending.max(keepdims=True)] if len(self._peak_pending) else []))
+        levels = []
+        for level in range(self.zoom_levels):
+            if level:
+                starts = np.arange(0, len(mins), ZOOM_FACTOR)
+                if not len(starts):
+                    break
+                mins = np.minimum.reduceat(mins, starts)
+                maxs = np.maximum.reduceat(maxs, starts)
+            # 8-bit pairs, interleaved min, max (the layout waveform renderers expect)
+            data = np.empty(2 * len(mins), dtype=np.int16)
+            data[0::2] = np.clip(np.round(mins * 127), -128, 127)
+            data[1::2] = np.clip(np.round(maxs * 127), -128, 127)
+            levels.append({
+                'samples_per_peak': self.samples_per_peak * ZOOM_FACTOR ** level,
+                'bits': 8,
+                'length': len(mins),
+                'data': data.tolist(),
+            })
+        return levels
+
+    def _loudness(self):
+        if self._sosfilt is None:
+            return None
+        # A trailing partial segment is left out, as BS.1770 does with incomplete blocks
+        energies = np.concatenate(self._energies) if self._energies else np.zeros(0)
+        if not len(energies):
+            return {'integrated_lufs': None, 'short_term_max_lufs': None, 'short_term_lufs': [],
+                    'short_term_hop_seconds': SHORT_TERM_HOP_SEGMENTS * SEGMENT_SECONDS}
+
+        # Gating blocks: 400 ms, overlapping by 75%
+        count = max(1, len(energies) - GATE_SEGMENTS + 1)
+        blocks = np.array([energies[i:i + GATE_SEGMENTS].mean() for i in range(count)])
+        with np.errstate(divide='ignore'):
+            block_lufs = -0.691 + 10 * np.log10(blocks)
+        gated = blocks[block_lufs > ABSOLUTE_GATE_LUFS]
+        integrated = None
+        if len(gated):
+            relative_gate = _lufs(gated.mean()) + RELATIVE_GATE_LU
+            gated = blocks[(block_lufs > ABSOLUTE_GATE_LUFS) & (block_lufs > relative_gate)]
+            integrated = _lufs(gated.mean())
+
+        short_term = []
+        last_start = max(0, len(energies) - SHORT_TERM_SEGMENTS)
+        for start in range(0, last_start + 1, SHORT_TERM_HOP_SEGMENTS):
+            value = _lufs(energies[start:start + SHORT_TERM_SEGMENTS].mean())
+            short_term.append(round(value, 1) if math.isfinite(value) else None)
+        measured = [value for value in short_term if value is not None]
+        return {
+            'integrated_lufs': round(integrated, 1) if integrated is not None and math.isfinite(integrated) else None,
+            'short_term_max_lufs': max(measured) if measured else None,
+            'short_term_lufs': short_term,
+            'short_term_hop_seconds': SHORT_TERM_HOP_SEGMENTS * SEGMENT_SECONDS,
+        }
+
+    def result(self):
+        """
+        The analysis so far.
+
+        Returns:
+            dict: sample_rate, frames, duration, peaks (zoom levels), loudness, sample_peak_dbfs,
+            true_peak_dbtp and clipped_samples; dB values are None for silence
+        """
+        return {
+            'version': SIDECAR_VERSION,
+            'sample_rate': self.sample_rate,
+            'frames': self.frames,
+            'duration': round(self.frames / self.sample_rate, 3) if self.sample_rate else 0.0,
+            'peaks': self._peak_levels() if self.frames else [],
+            'loudness': self._loudness(),
+            'sample_peak_dbfs': _db(self.sample_peak),
+            'true_peak_dbtp': _db(max(self.true_peak, self.sample_peak)),
+            'clipped_samples': self.clipped,
+        }
+
+
+def analyze(samples, sample_rate, block_frames=64 * 1024):
+    """Analyze a whole mono float32 buffer (in blocks, as the mixer would)."""
+    analyzer = AudioAnalyzer(sample_rate)
+    for start in range(0, len(samples), block_frames):
+        analyzer.feed(samples[start:start + block_frames])
+    return analyzer.result()
+
+
+def sidecar_path(audio_path):
+    """``outputs/ad.mp3`` → ``outputs/ad.mp3.analysis.json``."""
+    return f"{audio_path}{SIDECAR_SUFFIX}"
+
+
+def write_sidecar(audio_path, analysis):
+    """Write the analysis next to ``audio_path`` (atomically); returns the sidecar path."""
+    path = sidecar_path(audio_path)
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.analysis-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(analysis, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def load_or_create_sidecar(audio_path):
+    """
+    The analysis of an output file: read from its sidecar, or computed by decoding the
+    file once (outputs written without one, e.g. untouched TTS passthrough) and then saved.
+
+    Returns:
+        dict
+    """
+    path = sidecar_path(audio_path)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    from mixing import decode_audio
+
+    with open(audio_path, 'rb') as f:
+        samples, sample_rate = decode_audio(f.read())
+    analysis = analyze(samples, sample_rate)
+    write_sidecar(audio_path, analysis)
+    return analysis
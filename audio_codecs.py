@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Audio Codec Backends
+
+A small registry of decode/encode/mix backends used by the file-based
+mixing path. What the machine can do (ffmpeg on PATH, libsndfile formats,
+scipy) is detected once per process and cached, so choosing a backend
+never spawns a process.
+
+Backends, in order of preference:
+
+- soundfile: in-process decode/encode through libsndfile, block-streamed mix
+- scipy: WAV only, whole-file mix
+- wave: WAV only, standard library, last resort
+- ffmpeg: subprocess per call; never chosen automatically, only when
+  explicitly selected (e.g. ``--codec-backend ffmpeg``)
+
+(Named audio_codecs so it doesn't shadow the standard library codecs module.)
+"""
+
+import os
+import abc
+import shutil
+import functools
+import importlib.util
+from pathlib import Path
+
+
+@functools.lru_cache(maxsize=None)
+def detect_capabilities():
+    """
+    Probe the available audio tooling once per process.
+
+    Returns:
+        dict: ``ffmpeg`` (path or None), ``soundfile`` (bool), ``soundfile_formats``
+        (lowercase extensions libsndfile can handle), ``scipy`` (bool)
+    """
+    capabilities = {
+        'ffmpeg': shutil.which('ffmpeg'),
+        'soundfile': False,
+        'soundfile_formats': frozenset(),
+        'scipy': importlib.util.find_spec('scipy') is not None,
+    }
+    try:
+        import soundfile as sf
+
+        capabilities['soundfile'] = True
+        capabilities['soundfile_formats'] = frozenset(name.lower() for name in sf.available_formats())
+    except (ImportError, OSError) as e:
+        print(f"⚠️  soundfile unavailable: {e}")
+    return capabilities
+
+
+def _extension(path):
+    return Path(path).suffix.lstrip('.').lower()
+
+
+class CodecBackend(abc.ABC):
+    """Base class: a named way to convert and mix audio files."""
+
+    name = None
+    # Chosen by CodecRegistry.select without being asked for by name
+    automatic = True
+
+    @abc.abstractmethod
+    def available(self, capabilities):
+        """Whether the tooling this backend needs is present."""
+
+    def supports(self, capabilities, *paths):
+        """Whether this backend can read/write every one of ``paths`` (by extension)."""
+        return True
+
+    def supports_music(self, capabilities, music_file):
+        """Whether this backend can read the music bed ``music_file`` itself."""
+        return self.supports(capabilities, music_file)
+
+    @abc.abstractmethod
+    def convert(self, input_file, output_file):
+        """Re-encode ``input_file`` into the format implied by ``output_file``'s extension."""
+
+    @abc.abstractmethod
+    def mix(self, speech_file, music_file, output_file, load_music=None):
+        """
+        Mix speech (90%) with background music (10%) into ``output_file``.
+
+        ``load_music(sample_rate)`` may supply an already decoded bed (e.g. from the
+        music bed cache) to backends that can use one. Returns True on success.
+        """
+
+
+class SoundfileBackend(CodecBackend):
+    name = 'soundfile'
+
+    def available(self, capabilities):
+        return capabilities['soundfile']
+
+    def supports(self, capabilities, *paths):
+        # Only the speech/output need libsndfile; the music bed may come from load_music
+        return all(_extension(path) in capabilities['soundfile_formats'] for path in paths)
+
+    def supports_music(self, capabilities, music_file):
+        # The bed is decoded through load_music (music bed cache, librosa), not libsndfile
+        return True
+
+    def convert(self, input_file, output_file):
+        from mixing import mix_stream
+
+        mix_stream(input_file, output_file, format=_extension(output_file) or 'wav')
+        return True
+
+    def mix(self, speech_file, music_file, output_file, load_music=None):
+        from mixing import mix_stream, decode_audio, output_path_for
+
+        if load_music is None:
+            def load_music(sample_rate):
+                with open(music_file, 'rb') as f:
+                    return decode_audio(f.read(), sample_rate)[0]
+
+        format, sample_rate, frames = mix_stream(
+            speech_file, output_file, format=_extension(output_file) or 'mp3', music=load_music
+        )
+        print(f"🎵 Mixed {frames / sample_rate:.2f}s of audio with soundfile ({output_path_for(output_file, format)})")
+        return True
+
+
+class FfmpegBackend(CodecBackend):
+    name = 'ffmpeg'
+    # One process per call: only used when asked for explicitly
+    automatic = False
+
+    def available(self, capabilities):
+        return capabilities['ffmpeg'] is not None
+
+    def convert(self, input_file, output_file):
+        import subprocess
+
+        result = subprocess.run([detect_capabilities()['ffmpeg'], '-i', input_file, '-y', output_file],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"⚠️  FFmpeg failed: {result.stderr}")
+            return False
+        return True
+
+    def mix(self, speech_file, music_file, output_file, load_music=None):
+        import subprocess
+
+        cmd = [
+            detect_capabilities()['ffmpeg'], '-i', speech_file, '-i', music_file,
+            '-filter_complex', '[0]volume=0.9[speech];[1]volume=0.1[music];[speech][music]amix=inputs=2:duration=first',
+            '-y', output_file
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"⚠️  FFmpeg failed: {result.stderr}")
+            return False
+        print(f"🎵 Mixed audio using FFmpeg")
+        return True
+
+
+class ScipyBackend(CodecBackend):
+    name = 'scipy'
+
+    def available(self, capabilities):
+        return capabilities['scipy']
+
+    def supports(self, capabilities, *paths):
+        return all(_extension(path) == 'wav' for path in paths)
+
+    def convert(self, input_file, output_file):
+        from scipy.io import wavfile
+
+        rate, data = wavfile.read(input_file)
+        wavfile.write(output_file, rate, data)
+        return True
+
+    def mix(self, speech_file, music_file, output_file, load_music=None):
+        from scipy.io import wavfile
+        import numpy as np
+
+        # Read the speech file
+        speech_rate, speech_data = wavfile.read(speech_file)
+
+        # Read the background music file
+        music_rate, music_data = wavfile.read(music_file)
+
+        # Ensure both files have the same sample rate
+        if speech_rate != music_rate:
+            print(f"⚠️  Sample rate mismatch: speech={speech_rate}Hz, music={music_rate}Hz")
+            # Resample music to match speech rate
+            from scipy import signal
+            music_data = signal.resample(music_data, int(len(music_data) * speech_rate / music_rate))
+            music_rate = speech_rate
+
+        # Ensure both files have the same length
+        min_length = min(len(speech_data), len(music_data))
+        speech_data = speech_data[:min_length]
+        music_data = music_data[:min_length]
+
+        # Normalize the data to prevent clipping
+        speech_data = speech_data.astype(np.float32)
+        music_data = music_data.astype(np.float32)
+
+        # Mix the audio (speech at 90% volume, background at 10%)
+        mixed_data = speech_data * 0.9 + music_data * 0.1
+
+        # Normalize to prevent clipping
+        max_val = np.max(np.abs(mixed_data))
+        if max_val > 1.0:
+            mixed_data = mixed_data / max_val
+
+        # Convert back to 16-bit PCM
+        mixed_data = (mixed_data * 32767).astype(np.int16)
+
+        # Save the mixed audio
+        wavfile.write(output_file, speech_rate, mixed_data)
+        print(f"🎵 Mixed audio using scipy")
+        return True
+
+
+class WaveBackend(CodecBackend):
+    name = 'wave'
+
+    def available(self, capabilities):
+        return True
+
+    def supports(self, capabilities, *paths):
+        return all(_extension(path) == 'wav' for path in paths)
+
+    def convert(self, input_file, output_file):
+        shutil.copyfile(input_file, output_file)
+        return True
+
+    def mix(self, speech_file, music_file, output_file, load_music=None):
+        import wave
+        import numpy as np
+
+        # Read speech file
+        with wave.open(speech_file, 'rb') as w1:
+            speech_data = np.frombuffer(w1.readframes(w1.getnframes()), dtype=np.int16)
+            speech_params = w1.getparams()
+
+        # Read music file
+        with wave.open(music_file, 'rb') as w2:
+            music_data = np.frombuffer(w2.readframes(w2.getnframes()), dtype=np.int16)
+
+        # Ensure same length
+        min_length = min(len(speech_data), len(music_data))
+        speech_data = speech_data[:min_length]
+        music_data = music_data[:min_length]
+
+        # Mix with volume control
+        mixed = (0.9 * speech_data + 0.1 * music_data).astype(np.int16)
+
+        # Write output
+        with wave.open(output_file, 'wb') as out:
+            out.setparams(speech_params)
+            out.writeframes(mixed.tobytes())
+
+        print(f"🎵 Mixed audio using pure Python")
+        return True
+
+
+class CodecRegistry:
+    def __init__(self, backends=()):
+        """
+        Ordered collection of codec backends.
+
+        Args:
+            backends (iterable): CodecBackend instances, most preferred first
+        """
+        self._backends = {}
+        for backend in backends:
+            self.register(backend)
+
+    def register(self, backend):
+        self._backends[backend.name] = backend
+
+    def names(self):
+        return list(self._backends)
+
+    def available(self):
+        """Names of the backends usable on this machine."""
+        capabilities = detect_capabilities()
+        return [name for name, backend in self._backends.items() if backend.available(capabilities)]
+
+    def select(self, preferred=None, files=(), music_file=None):
+        """
+        Pick the backend for a job.
+
+        Args:
+            preferred (str, optional): Backend name requested explicitly (the only way ffmpeg
+                is ever chosen); ``None`` or "auto" picks the first automatic backend that is
+                available and can handle ``files``
+            files (iterable): Paths the backend has to read or write
+            music_file (str, optional): Music bed of a mix; only backends that can read it
+                (or take it decoded through ``load_music``) are picked
+
+        Returns:
+            CodecBackend
+
+        Raises:
+            ValueError: For an unknown or unavailable preferred backend, or if none fits
+        """
+        capabilities = detect_capabilities()
+        if preferred and preferred != 'auto':
+            backend = self._backends.get(preferred)
+            if backend is None:
+                raise ValueError(f"Unknown codec backend: {preferred} (choose from {', '.join(self.names())})")
+            if not backend.available(capabilities):
+                raise ValueError(f"Codec backend not available on this machine: {preferred}")
+            return backend
+
+        for backend in self._backends.values():
+            if (backend.automatic and backend.available(capabilities) and backend.supports(capabilities, *files)
+                    and (music_file is None or backend.supports_music(capabilities, music_file))):
+                return backend
+        names = [os.path.basename(str(f)) for f in (*files, *([music_file] if music_file else []))]
+        raise ValueError(f"No codec backend can handle: {', '.join(names)}")
+
+
+# Default registry shared by every generator in the process
+CODECS = CodecRegistry([SoundfileBackend(), ScipyBackend(), WaveBackend(), FfmpegBackend()])
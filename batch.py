@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Batch Rendering
+
+Renders a matrix of scripts × (tone, gender, language, music) combinations.
+The batch is planned before anything is synthesized:
+
+- the voice catalog is fetched once and a voice is selected once per
+  distinct (tone, gender, language)
+- items that only differ by music share one TTS synthesis
+- every music bed used by the batch is decoded once, up front
+
+Synthesis groups then run concurrently under a limit, and results are
+yielded one by one as items finish (not in request order).
+"""
+
+import time
+import uuid
+import queue
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_BATCH_CONCURRENCY = 4
+MAX_BATCH_ITEMS = 200
+
+DEFAULT_COMBINATION = {
+    'tone': 'professional',
+    'gender': 'neutral',
+    'language': 'english',
+    'background_music': 'none',
+}
+
+
+def _is_value(value):
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _check_values(name, values):
+    # A bare string would otherwise be expanded character by character
+    if values is not None and not (isinstance(values, list) and all(_is_value(value) for value in values)):
+        raise ValueError(f"{name} must be a list of non-empty strings")
+
+
+def expand_combinations(combinations=None, tones=None, genders=None, languages=None, background_music=None):
+    """
+    Normalize the requested combinations.
+
+    Either pass explicit ``combinations`` (dicts with any of tone, gender, language,
+    background_music), or lists of values whose cartesian product is used. Missing
+    fields take the single-render defaults.
+
+    Returns:
+        list of dict: Distinct combinations in request order
+
+    Raises:
+        ValueError: If the lists aren't lists of non-empty strings, or a combination isn't a
+            dict of them
+    """
+    if combinations is not None:
+        if not isinstance(combinations, list) or not all(isinstance(combo, dict) for combo in combinations):
+            raise ValueError("combinations must be a list of objects")
+        if not all(value is None or _is_value(value) for combo in combinations for value in combo.values()):
+            raise ValueError("combination values must be non-empty strings")
+    for name, values in (('tones', tones), ('genders', genders), ('languages', languages),
+                         ('background_music', background_music)):
+        _check_values(name, values)
+
+    if combinations:
+        expanded = [{**DEFAULT_COMBINATION, **{k: v for k, v in combo.items() if v is not None}}
+                    for combo in combinations]
+    else:
+        expanded = [
+            {'tone': tone, 'gender': gender, 'language': language, 'background_music': music}
+            for tone, gender, language, music in itertools.product(
+                tones or [DEFAULT_COMBINATION['tone']],
+                genders or [DEFAULT_COMBINATION['gender']],
+                languages or [DEFAULT_COMBINATION['language']],
+                background_music or [DEFAULT_COMBINATION['background_music']],
+            )
+        ]
+
+    unknown = {key for combo in expanded for key in combo} - set(DEFAULT_COMBINATION)
+    if unknown:
+        raise ValueError(f"Unknown combination fields: {', '.join(sorted(unknown))}")
+
+    distinct = []
+    for combo in expanded:
+        if combo not in distinct:
+            distinct.append(combo)
+    return distinct
+
+
+class BatchPlan:
+    def __init__(self, batch_id, items, voices, groups, music_styles):
+        self.batch_id = batch_id
+        # One dict per output: index, script_index, script and the combination fields
+        self.items = items
+        # (tone, gender, language) → voice_id
+        self.voices = voices
+        # (script_index, voice_id, tone, language) → items sharing that synthesis
+        self.groups = groups
+        self.music_styles = music_styles
+
+    def summary(self):
+        return {
+            'batch_id': self.batch_id,
+            'items': len(self.items),
+            'voice_selections': len(self.voices),
+            'syntheses': len(self.groups),
+            'music_styles': sorted(self.music_styles),
+        }
+
+
+def plan_batch(generator, scripts, combinations):
+    """
+    Expand scripts × combinations into items and resolve everything they share.
+
+    Raises:
+        ValueError: For an empty or oversized batch, or if no voice can be selected
+    """
+    if not scripts:
+        raise ValueError("A batch needs at least one script")
+    if not combinations:
+        raise ValueError("A batch needs at least one combination")
+    if len(scripts) * len(combinations) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Batch too large: {len(scripts) * len(combinations)} items (limit {MAX_BATCH_ITEMS})")
+
+    # One catalog fetch for the whole batch; selections below reuse it
+    generator.get_voices()
+
+    voices = {}
+    for combo in combinations:
+        key = (combo['tone'], combo['gender'], combo['language'])
+        if key not in voices:
+            voices[key] = generator.select_voice(tone=combo['tone'], gender=combo['gender'], language=combo['language'])
+
+    items = []
+    groups = {}
+    for script_index, script in enumerate(scripts):
+        for combo in combinations:
+            voice_id = voices[(combo['tone'], combo['gender'], combo['language'])]
+            item = {'index': len(items), 'script_index': script_index, 'script': script, 'voice_id': voice_id, **combo}
+            items.append(item)
+            groups.setdefault((script_index, voice_id, combo['tone'], combo['language']), []).append(item)
+
+    music_styles = {combo['background_music'] for combo in combinations if combo['background_music'] not in (None, 'none')}
+    return BatchPlan(uuid.uuid4().hex[:8], items, voices, groups, music_styles)
+
+
+def run_batch(generator, plan, max_concurrency=DEFAULT_BATCH_CONCURRENCY, chunked=False, renditions=None):
+    """
+    Execute a plan and yield one result dict per item as soon as it finishes.
+
+    Results carry the item fields plus ``status`` ('succeeded' or 'failed'), ``filename``,
+    ``filepath`` (and ``files`` with renditions) or ``error``, and ``elapsed`` seconds.
+    Closing the iterator early cancels synthesis groups that haven't started.
+    """
+    from speech_generator import DEFAULT_TTS_FORMAT, DEFAULT_STREAM_FORMAT, _no_progress
+
+    # Decode each music bed once, at the rate the speech will arrive in
+    sample_rate = int((DEFAULT_STREAM_FORMAT if chunked else DEFAULT_TTS_FORMAT).split("_")[1])
+    for style in plan.music_styles:
+        generator._load_music_samples(style, sample_rate)
+
+    results = queue.Queue()
+    started = time.time()
+
+    def render_group(group):
+        first = group[0]
+        try:
+            encoded, samples, speech_rate = generator._synthesize_for_render(
+                first['script'], first['voice_id'], 0.5, 0.5, first['tone'], first['gender'], None,
+                first['language'], chunked, DEFAULT_BATCH_CONCURRENCY, _no_progress
+            )
+        except Exception as e:
+            for item in group:
+                results.put(_result(item, started, error=f"Synthesis failed: {e}"))
+            return
+
+        for item in group:
+            try:
+                files = _render_item(generator, plan, item, encoded, samples, speech_rate, renditions)
+                results.put(_result(item, started, files=files))
+            except Exception as e:
+                results.put(_result(item, started, error=str(e)))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix='batch')
+    try:
+        for group in plan.groups.values():
+            executor.submit(render_group, group)
+        for _ in range(len(plan.items)):
+            yield results.get()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_item(generator, plan, item, encoded, samples, sample_rate, renditions):
+    """Mix and encode one item from already synthesized speech; returns [(path, rendition or None)]."""
+    import os
+    from mixing import RenderedAudio, mix_buffer, mix_stream, output_path_for
+    from audio_analysis import AudioAnalyzer, write_sidecar
+
+    base = generator.generate_output_filename(
+        tone=item['tone'],
+        gender=item['gender'],
+        language=item['language'],
+        background_music=item['background_music']
+    )
+    # Items with the same combination would share a timestamped name
+    root, extension = os.path.splitext(base)
+    output_file = f"{root}_{plan.batch_id}_{item['index']:03d}{extension}"
+
+    style = item['background_music']
+    music = None
+    if style and style != 'none':
+        music = lambda rate: generator._load_music_samples(style, rate)
+
+    speech = samples if samples is not None else encoded
+    if renditions:
+        mixed, mixed_rate = mix_buffer(speech, music=music, sample_rate=sample_rate)
+        return generator._encode_renditions(mixed, mixed_rate, renditions, output_file)
+
+    if music is None and samples is None:
+        # Plain TTS output, nothing to mix or re-encode
+        return [(RenderedAudio(encoded, 'mp3').save(output_file), None)]
+
+    analyzer = AudioAnalyzer()
+    format, _, _ = mix_stream(speech, output_file, format='mp3', music=music, sample_rate=sample_rate,
+                              analyzer=analyzer)
+    path = output_path_for(output_file, format)
+    write_sidecar(path, analyzer.result())
+    return [(path, None)]
+
+
+def _result(item, started, files=None, error=None):
+    from pathlib import Path
+
+    result = {key: value for key, value in item.items() if key != 'script'}
+    result['elapsed'] = round(time.time() - started, 3)
+    if error:
+        result.update({'status': 'failed', 'error': error})
+        return result
+
+    result['status'] = 'succeeded'
+    result['filename'] = Path(files[0][0]).name
+    result['filepath'] = f"outputs/{result['filename']}"
+    if files[0][1] is not None:
+        result['files'] = [
+            {'filename': Path(path).name, 'filepath': f"outputs/{Path(path).name}", **rendition.to_dict()}
+            for path, rendition in files
+        ]
+    return result
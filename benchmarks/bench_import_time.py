@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Import-Time Report and Cold-Start Budget
+
+Imports each module in a fresh interpreter with ``-X importtime`` and reports
+its cumulative import cost together with the most expensive modules it pulled
+in. Exits with status 1 if any module goes over its budget, so it can run as
+a regression check in CI:
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --budget-ms 150 --top 15 speech_generator
+
+A second check starts the speech generator CLI with ``--show-options`` and
+holds the whole process (interpreter startup included) to its own budget.
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules a CLI call or batch worker imports before doing any work
+DEFAULT_MODULES = ['speech_generator', 'llm', 'mixing', 'time_stretch', 'pipeline', 'batch']
+DEFAULT_BUDGET_MS = 200
+DEFAULT_CLI_BUDGET_MS = 600
+
+# Heavy dependencies that must stay out of a cold import (they are loaded through lazy_imports)
+LAZY_MODULES = ('numpy', 'librosa', 'soundfile', 'scipy', 'pydub', 'requests', 'google.genai')
+
+
+def measure_import(module, runs):
+    """
+    Import ``module`` in ``runs`` fresh interpreters and keep the fastest run.
+
+    Returns:
+        tuple: (total microseconds, {module imported by it: (self us, cumulative us)})
+    """
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+        # Entries are printed children first, nested ones indented; a top-level entry closes its subtree
+        timings = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            if name.startswith('  '):
+                timings[name.strip()] = (int(self_us), int(cumulative_us))
+            elif name.strip() == module:
+                total = int(cumulative_us)
+                break
+            else:
+                # Interpreter startup (site, encodings, ...), not part of this import
+                timings = {}
+        if best is None or total < best[0]:
+            best = (total, timings)
+    return best
+
+
+def measure_cli(runs):
+    """Wall time in ms of ``speech_generator.py --show-options`` (fastest of ``runs``)."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'speech_generator.py', '--show-options'],
+                       cwd=ROOT, capture_output=True, check=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-module import time and enforce a cold-start budget")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import (default: CLI modules)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Maximum cumulative import time per module (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--cli-budget-ms", type=float, default=DEFAULT_CLI_BUDGET_MS,
+                        help=f"Maximum wall time of the --show-options CLI call (default: {DEFAULT_CLI_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the fastest counts (default: 3)")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest imported modules to list (default: 8)")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        total, timings = measure_import(module, args.runs)
+        over = total / 1000 > args.budget_ms
+        print(f"{'❌' if over else '✅'} {module}: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+        heaviest = sorted(((self_us, name) for name, (self_us, _) in timings.items()), reverse=True)
+        for self_us, name in heaviest[:args.top]:
+            print(f"     {self_us / 1000:7.1f} ms  {name}")
+
+        eager = [name for name in LAZY_MODULES if name in timings]
+        if eager:
+            print(f"     ⚠️  imported eagerly: {', '.join(eager)}")
+        if over:
+            failures.append(f"{module} imports in {total / 1000:.1f} ms")
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)}")
+
+    cli_ms = measure_cli(args.runs)
+    over = cli_ms > args.cli_budget_ms
+    print(f"{'❌' if over else '✅'} speech_generator.py --show-options: {cli_ms:.0f} ms wall "
+          f"(budget {args.cli_budget_ms:.0f} ms)")
+    if over:
+        failures.append(f"--show-options takes {cli_ms:.0f} ms")
+
+    if failures:
+        print(f"\n❌ Cold-start budget exceeded: {'; '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ All modules within the cold-start budget")
+
+
+if __name__ == "__main__":
+    main()
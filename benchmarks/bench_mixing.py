@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Mixing Backend Benchmark
+
+Generates synthetic speech and music locally (no API calls, no music files)
+at several durations and sample rates, then measures every codec backend:
+
+- stage timings on whole signals: decode, resample, mix, encode
+- the real end-to-end backend.mix() call, with peak RSS and peak Python
+  allocations (tracemalloc)
+
+Each case runs in two fresh (spawned) child processes: one for the stage
+timings, one for the end-to-end mix, so peak RSS belongs to backend.mix()
+alone and not to the whole-signal buffers the stage timings build. On Linux
+the peak is the process's VmHWM, reset right before the first mix call, so
+it doesn't include the interpreter's start-up peak either; elsewhere it falls
+back to ru_maxrss. Results are written as JSON; with --baseline, cases that got slower
+or hungrier than the stored numbers by more than --threshold are flagged
+and the script exits with status 1.
+
+A reference baseline is committed in benchmarks/baselines/bench_mixing.json;
+its "meta" block records the machine it was measured on. Timings only compare
+on similar hardware: on another machine, save a local baseline first
+(--save-baseline) and compare later runs against that.
+
+Usage:
+    python benchmarks/bench_mixing.py [--durations 15 60 300] [--sample-rates 24000 44100]
+        [--backends soundfile scipy wave] [--output results.json]
+        [--baseline benchmarks/baselines/bench_mixing.json] [--save-baseline]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import argparse
+import resource
+import tracemalloc
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import soundfile as sf
+
+from audio_codecs import CODECS, detect_capabilities
+from mixing import BlockMixer, DEFAULT_BLOCK_FRAMES
+
+
+DEFAULT_DURATIONS = (15, 60, 300)
+DEFAULT_SAMPLE_RATES = (24000, 44100)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "bench_mixing.json"
+DEFAULT_THRESHOLD = 0.25
+
+# Music beds ship as 44.1 kHz files, so other speech rates exercise the resampler
+MUSIC_SAMPLE_RATE = 44100
+MUSIC_SECONDS = 30
+
+# Metrics compared against the baseline (lower is better), each with the smallest
+# absolute increase that counts: short cases run in milliseconds, where a 25% change is noise
+REGRESSION_METRICS = {"total_s": 0.05, "peak_alloc_mb": 5.0, "peak_rss_mb": 10.0}
+
+
+def synthetic_speech(seconds, sample_rate, seed=0):
+    """Noise-excited formant-ish bursts with pauses: roughly speech-shaped level and spectrum."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    t = np.arange(n, dtype=np.float32) / sample_rate
+    carrier = (np.sin(2 * np.pi * 140 * t) + 0.5 * np.sin(2 * np.pi * 720 * t)
+               + 0.3 * rng.standard_normal(n).astype(np.float32))
+    # ~4 syllables per second, with a pause every couple of seconds
+    envelope = np.clip(np.sin(2 * np.pi * 2 * t), 0, None) * (np.sin(2 * np.pi * 0.4 * t) > -0.6)
+    return (0.3 * carrier * envelope).astype(np.float32)
+
+
+def synthetic_music(seconds, sample_rate):
+    """A slowly pulsing major chord."""
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    chord = sum(np.sin(2 * np.pi * f * t) for f in (261.63, 329.63, 392.0))
+    return (0.2 * chord * (0.75 + 0.25 * np.sin(2 * np.pi * 0.5 * t))).astype(np.float32)
+
+
+def _resample(samples, orig_sr, target_sr):
+    if orig_sr == target_sr:
+        return samples
+    try:
+        import librosa
+        return librosa.resample(samples, orig_sr=orig_sr, target_sr=target_sr)
+    except ImportError:
+        from scipy import signal
+        return signal.resample_poly(samples, target_sr, orig_sr).astype(np.float32)
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def stage_timings(backend, speech_file, music_file, output_format):
+    """Time decode/resample/mix/encode separately on whole signals; None for stages a backend doesn't have."""
+    if backend == "soundfile":
+        (speech, sample_rate), decode = _timed(lambda: sf.read(speech_file, dtype="float32"))
+        music, music_sr = sf.read(music_file, dtype="float32")
+        # Warm-up so one-time import/JIT cost isn't billed to the resample stage
+        _resample(np.zeros(4096, dtype=np.float32), music_sr, sample_rate)
+        music, resample = _timed(_resample, music, music_sr, sample_rate)
+
+        def mix():
+            mixer = BlockMixer(music)
+            out = np.empty(DEFAULT_BLOCK_FRAMES, dtype=np.float32)
+            mixed = np.empty(len(speech), dtype=np.float32)
+            for start in range(0, len(speech), DEFAULT_BLOCK_FRAMES):
+                block = mixer.mix(speech[start:start + DEFAULT_BLOCK_FRAMES], out=out)
+                mixed[start:start + len(block)] = block
+            return mixed
+
+        mixed, mix_time = _timed(mix)
+        _, encode = _timed(lambda: sf.write(io.BytesIO(), mixed, sample_rate, format=output_format.upper()))
+
+    elif backend == "scipy":
+        from scipy.io import wavfile
+        from scipy import signal
+
+        (sample_rate, speech), decode = _timed(wavfile.read, speech_file)
+        music_sr, music = wavfile.read(music_file)
+        music, resample = _timed(lambda: signal.resample(music, int(len(music) * sample_rate / music_sr)))
+
+        def mix():
+            length = min(len(speech), len(music))
+            mixed = speech[:length].astype(np.float32) * 0.9 + music[:length].astype(np.float32) * 0.1
+            peak = np.max(np.abs(mixed))
+            if peak > 1.0:
+                mixed = mixed / peak
+            return (mixed * 32767).astype(np.int16)
+
+        mixed, mix_time = _timed(mix)
+        _, encode = _timed(wavfile.write, io.BytesIO(), sample_rate, mixed)
+
+    elif backend == "wave":
+        import wave
+
+        def decode_wav(path):
+            with wave.open(path, "rb") as w:
+                return np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16), w.getparams()
+
+        (speech, params), decode = _timed(decode_wav, speech_file)
+        music, _ = decode_wav(music_file)
+        resample = None  # the wave backend mixes at whatever rate the files have
+
+        def mix():
+            length = min(len(speech), len(music))
+            return (0.9 * speech[:length] + 0.1 * music[:length]).astype(np.int16)
+
+        mixed, mix_time = _timed(mix)
+
+        def encode():
+            with wave.open(io.BytesIO(), "wb") as out:
+                out.setparams(params)
+                out.writeframes(mixed.tobytes())
+
+        _, encode = _timed(encode)
+
+    else:
+        # Subprocess backends (ffmpeg) only have an end-to-end number
+        return {"decode_s": None, "resample_s": None, "mix_s": None, "encode_s": None}
+
+    return {"decode_s": decode, "resample_s": resample, "mix_s": mix_time, "encode_s": encode}
+
+
+def run_stages(backend, speech_file, music_file, output_format, results):
+    """Child process body: stage timings on whole signals."""
+    results.put(stage_timings(backend, speech_file, music_file, output_format))
+
+
+def _proc_status_bytes(field):
+    """A kB field of /proc/self/status in bytes, or None where there is no procfs."""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark (Linux); returns the current RSS in bytes."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+    current = _proc_status_bytes("VmRSS")
+    return current if current is not None else _maxrss_bytes()
+
+
+def _peak_rss():
+    peak = _proc_status_bytes("VmHWM")
+    return peak if peak is not None else _maxrss_bytes()
+
+
+def _maxrss_bytes():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def run_mix(backend, speech_file, music_file, output_format, repeat, results):
+    """Child process body: the real backend.mix() with memory tracking, and nothing else."""
+    case = {}
+    codec = CODECS.select(backend)
+    output_file = os.path.join(os.path.dirname(speech_file), f"mixed_{backend}.{output_format}")
+    rss_before = _reset_peak_rss()
+
+    totals = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ok = codec.mix(speech_file, music_file, output_file)
+        totals.append(time.perf_counter() - start)
+
+    # Separate run for allocations: tracemalloc slows everything down
+    tracemalloc.start()
+    ok = codec.mix(speech_file, music_file, output_file) and ok
+    peak_alloc = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    rss_after = _peak_rss()
+    case.update({
+        "ok": bool(ok),
+        "total_s": min(totals),
+        "peak_alloc_mb": peak_alloc / 1e6,
+        "peak_rss_mb": rss_after / 1e6,
+        "rss_growth_mb": (rss_after - rss_before) / 1e6,
+    })
+    results.put(case)
+
+
+def _in_child(target, *args):
+    """Run ``target(*args, results)`` in a fresh spawned process (nothing inherited from this one)."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=target, args=(*args, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def measure(backend, duration, sample_rate, output_format, repeat, scratch):
+    speech_file = os.path.join(scratch, f"speech_{duration}_{sample_rate}.wav")
+    music_file = os.path.join(scratch, "music.wav")
+    if not os.path.exists(speech_file):
+        sf.write(speech_file, synthetic_speech(duration, sample_rate), sample_rate, subtype="PCM_16")
+    if not os.path.exists(music_file):
+        sf.write(music_file, synthetic_music(MUSIC_SECONDS, MUSIC_SAMPLE_RATE), MUSIC_SAMPLE_RATE, subtype="PCM_16")
+
+    case = _in_child(run_stages, backend, speech_file, music_file, output_format)
+    case.update(_in_child(run_mix, backend, speech_file, music_file, output_format, repeat))
+    case.update({"backend": backend, "duration_s": duration, "sample_rate": sample_rate, "format": output_format})
+    return case
+
+
+def case_key(case):
+    return f"{case['backend']}/{case['duration_s']}s/{case['sample_rate']}Hz/{case['format']}"
+
+
+def find_regressions(results, baseline, threshold):
+    """Cases whose metrics exceed the baseline by more than ``threshold`` (a fraction) and the metric's noise floor."""
+    previous = {case_key(case): case for case in baseline.get("results", [])}
+    regressions = []
+    for case in results:
+        old = previous.get(case_key(case))
+        if not old:
+            continue
+        for metric, floor in REGRESSION_METRICS.items():
+            if (old.get(metric) and case.get(metric) is not None
+                    and case[metric] > old[metric] * (1 + threshold) and case[metric] - old[metric] > floor):
+                regressions.append({
+                    "case": case_key(case),
+                    "metric": metric,
+                    "baseline": old[metric],
+                    "current": case[metric],
+                    "change": case[metric] / old[metric] - 1,
+                })
+    return regressions
+
+
+def _fmt(value, unit=""):
+    return "-" if value is None else f"{value:.3f}{unit}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the decode/resample/mix/encode path of each codec backend")
+    parser.add_argument("--durations", type=float, nargs="+", default=DEFAULT_DURATIONS, help="Speech lengths in seconds")
+    parser.add_argument("--sample-rates", type=int, nargs="+", default=DEFAULT_SAMPLE_RATES, help="Speech sample rates")
+    parser.add_argument("--backends", nargs="+", default=None,
+                        help="Backends to measure (default: every available one, ffmpeg included if installed)")
+    parser.add_argument("--format", default="wav", help="Output format; wav keeps every backend comparable (default: wav)")
+    parser.add_argument("--repeat", type=int, default=3, help="End-to-end runs per case; the fastest counts (default: 3)")
+    parser.add_argument("--output", default="bench_mixing_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Stored results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown/growth before a case is flagged (default: {DEFAULT_THRESHOLD:.0%})")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store these results as the new baseline")
+    args = parser.parse_args()
+
+    backends = args.backends or CODECS.available()
+    durations = [int(d) if float(d).is_integer() else d for d in args.durations]
+
+    results = []
+    print(f"{'case':<34}{'decode':>9}{'resample':>10}{'mix':>9}{'encode':>9}{'total':>9}{'alloc MB':>10}{'RSS MB':>9}")
+    with tempfile.TemporaryDirectory(prefix="bench-mixing-") as scratch:
+        for backend in backends:
+            for sample_rate in args.sample_rates:
+                for duration in durations:
+                    case = measure(backend, duration, sample_rate, args.format, args.repeat, scratch)
+                    results.append(case)
+                    print(f"{case_key(case):<34}{_fmt(case['decode_s']):>9}{_fmt(case['resample_s']):>10}"
+                          f"{_fmt(case['mix_s']):>9}{_fmt(case['encode_s']):>9}{_fmt(case['total_s']):>9}"
+                          f"{case['peak_alloc_mb']:>10.1f}{case['peak_rss_mb']:>9.1f}"
+                          f"{'' if case['ok'] else '  ❌ mix failed'}")
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "soundfile": sf.__version__,
+            "ffmpeg": detect_capabilities()["ffmpeg"],
+            "block_frames": DEFAULT_BLOCK_FRAMES,
+            "threshold": args.threshold,
+        },
+        "results": results,
+    }
+
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            report["regressions"] = find_regressions(results, json.load(f), args.threshold)
+    else:
+        report["regressions"] = []
+        print(f"\nℹ️  No baseline at {baseline_path} (run with --save-baseline to create one)")
+    if baseline_path.exists() and not args.save_baseline:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline_meta = json.load(f).get("meta", {})
+        if (baseline_meta.get("machine"), baseline_meta.get("cpu_count")) != (platform.machine(), os.cpu_count()):
+            print(f"ℹ️  Baseline measured on {baseline_meta.get('platform')} "
+                  f"({baseline_meta.get('cpu_count')} CPUs); timings may not compare")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📁 Results written to {args.output}")
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to {baseline_path}")
+
+    if report["regressions"]:
+        print(f"\n❌ {len(report['regressions'])} regression(s) beyond {args.threshold:.0%}:")
+        for regression in report["regressions"]:
+            print(f"  {regression['case']} {regression['metric']}: "
+                  f"{regression['baseline']:.3f} → {regression['current']:.3f} ({regression['change']:+.0%})")
+        sys.exit(1)
+    if baseline_path.exists() and not args.save_baseline:
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tone Analyzer Microbenchmark
+
+Compares the compiled ToneAnalyzer against the original list-scanning
+implementation of analyze_tone_sentiment on realistic tone phrases, and
+checks that both produce identical scores.
+
+Usage:
+    python benchmarks/bench_tone_analyzer.py [--rounds 200]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tone_analyzer import ToneAnalyzer, TONE_KEYWORDS, SEMANTIC_MATCHES
+
+
+TONE_PHRASES = [
+    "warm and welcoming",
+    "authoritative and clear",
+    "relaxed and conversational",
+    "expressive and theatrical",
+    "soothing and peaceful",
+    "upbeat, energetic and fun",
+    "confident but friendly",
+    "serious corporate voiceover",
+    "calm, reassuring and trustworthy",
+    "excited sports announcer",
+    "gentle bedtime story narrator",
+    "bold, powerful movie trailer",
+    "friendly neighbourhood coffee shop",
+    "polished luxury brand",
+    "playful and quirky",
+    "hushed late-night radio",
+    "inspiring and motivating",
+    "no-nonsense professional",
+    "cozy holiday vibes",
+    "intense dramatic reveal",
+]
+
+
+def legacy_scores(tone_description):
+    """The original per-call scoring loop, kept verbatim for comparison."""
+    tone_scores = {}
+    for tone_category, keywords in TONE_KEYWORDS.items():
+        score = 0
+        input_words = tone_description.split()
+        for word in input_words:
+            if word in keywords:
+                score += 3
+        for keyword in keywords:
+            if keyword in tone_description or tone_description in keyword:
+                score += 2
+        # The original rebuilt this dict literal on every iteration
+        semantic_matches = {tone: list(words) for tone, words in SEMANTIC_MATCHES.items()}
+        for word in input_words:
+            if word in semantic_matches.get(tone_category, []):
+                score += 1
+        tone_scores[tone_category] = score
+    return tuple(tone_scores.values())
+
+
+def time_it(function, phrases, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for phrase in phrases:
+            function(phrase)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled tone analyzer against the legacy scan")
+    parser.add_argument("--rounds", type=int, default=200, help="Passes over the phrase list (default: 200)")
+    args = parser.parse_args()
+
+    phrases = [phrase.lower().strip() for phrase in TONE_PHRASES]
+
+    # Exact-equivalence check before timing anything
+    analyzer = ToneAnalyzer(TONE_KEYWORDS, SEMANTIC_MATCHES)
+    mismatches = [phrase for phrase in phrases if analyzer.scores(phrase) != legacy_scores(phrase)]
+    if mismatches:
+        print(f"❌ Score mismatch for: {mismatches}")
+        sys.exit(1)
+    print(f"✅ Scores identical for {len(phrases)} phrases")
+
+    calls = args.rounds * len(phrases)
+    legacy_time = time_it(legacy_scores, phrases, args.rounds)
+
+    # Uncached: measures the automaton itself
+    uncached = ToneAnalyzer(TONE_KEYWORDS, SEMANTIC_MATCHES, cache_size=0)
+    compiled_time = time_it(uncached.scores, phrases, args.rounds)
+
+    # Cached: repeated tone strings from the frontend
+    cached = ToneAnalyzer(TONE_KEYWORDS, SEMANTIC_MATCHES)
+    cached_time = time_it(cached.scores, phrases, args.rounds)
+
+    print(f"\n{'implementation':<22}{'total (s)':>12}{'per call (µs)':>16}{'speedup':>10}")
+    for name, elapsed in [("legacy scan", legacy_time), ("compiled", compiled_time), ("compiled + memo", cached_time)]:
+        print(f"{name:<22}{elapsed:>12.4f}{elapsed / calls * 1e6:>16.1f}{legacy_time / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Session
+
+A requests.Session wrapper with a bounded keep-alive connection pool, connect
+and read timeouts, and retries with jittered exponential backoff that honor
+the server's Retry-After header.
+
+Non-idempotent requests (POST, PATCH) are only retried after failures that
+prove the request never reached the server (connection refused, connect
+timeout): a read timeout on a TTS POST may come after ElevenLabs has accepted
+and billed it, and sending it again would bill the characters twice.
+
+One instance is meant to be shared by every thread of the process: the
+underlying urllib3 connection pool is thread-safe, and the session carries no
+per-request state (no cookies or auth are stored on it).
+"""
+
+import time
+import random
+import datetime
+from email.utils import parsedate_to_datetime
+
+from lazy_imports import lazy_module
+
+requests = lazy_module('requests')
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+# Transient statuses worth another attempt: rate limiting and server-side failures
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that can be sent twice without a second side effect (RFC 9110)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+
+def is_connect_error(error):
+    """True if ``error`` means the request was never sent (no connection was made)."""
+    import urllib3
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+
+
+class RetryingSession:
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX):
+        """
+        Create a pooled session.
+
+        Args:
+            pool_size (int): Keep-alive connections kept per host. Threads beyond this wait
+                for a free connection instead of opening throwaway ones.
+            connect_timeout (float): Seconds to wait for the TCP/TLS connection
+            read_timeout (float): Seconds to wait between bytes of the response
+            max_retries (int): Extra attempts after a connection error, timeout or retryable status
+            backoff_base (float): First backoff window in seconds; doubles on every retry
+            backoff_max (float): Upper bound for a single wait, including Retry-After
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        # Retries are handled here (so Retry-After and jitter apply), not by urllib3
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, retrying transient failures.
+
+        Returns the final response (which may still carry an error status once the
+        retries are used up); raises requests exceptions for connection errors and
+        timeouts that outlast the retries. ``retry_statuses`` overrides the set of
+        statuses retried here (e.g. to leave 429s to a caller-side scheduler).
+
+        Non-idempotent methods are retried on connect errors only, never after a read
+        timeout or a dropped connection, unless the caller passes ``retry_unsafe=True``.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        retry_statuses = kwargs.pop("retry_statuses", RETRY_STATUS_CODES)
+        retry_unsafe = kwargs.pop("retry_unsafe", False) or method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries or not (retry_unsafe or is_connect_error(e)):
+                    raise
+                delay = self.backoff_delay(attempt)
+                print(f"⚠️  {method} {url} failed ({e.__class__.__name__}), retrying in {delay:.1f}s...")
+            else:
+                if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                    return response
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff_delay(attempt)
+                print(f"⚠️  {method} {url} returned {response.status_code}, retrying in {delay:.1f}s...")
+                # Give the connection back to the pool before sleeping
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff: uniform in [0, base * 2^attempt], capped."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def retry_after(self, response):
+        """Seconds requested by a Retry-After header (delta-seconds or HTTP date), capped; None if absent."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+            seconds = (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return min(self.backoff_max, max(0.0, seconds))
+
+    def close(self):
+        self.session.close()
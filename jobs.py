@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Render Jobs
+
+Runs long renders in a bounded worker pool so request threads return
+immediately with a job id. Every job keeps an ordered list of progress
+events (voice selection, synthesis, mixing, encoding, ...) that clients can
+poll or follow as a server-sent events stream.
+"""
+
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_QUEUED = 32
+DEFAULT_RETENTION_SECONDS = 60 * 60
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+
+class JobQueueFull(Exception):
+    """Raised when the worker pool and its queue are both full."""
+
+
+class Job:
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.events = []
+        self._condition = threading.Condition()
+        with self._condition:
+            self._add_event(QUEUED, {})
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def progress(self, stage, **info):
+        """Record that the job reached ``stage``; passed to the work function as its progress callback."""
+        with self._condition:
+            self.stage = stage
+            self._add_event(stage, info)
+
+    def wait_for_events(self, after, timeout=None):
+        """
+        Return events with index >= ``after``, blocking up to ``timeout`` seconds
+        until there is at least one (or the job has finished).
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: len(self.events) > after or self.finished, timeout=timeout)
+            return self.events[after:]
+
+    def to_dict(self):
+        with self._condition:
+            return {
+                'job_id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'stage': self.stage,
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at,
+                'events': list(self.events),
+            }
+
+    def _set_status(self, status, result=None, error=None):
+        with self._condition:
+            self.status = status
+            self.stage = status
+            self.result = result
+            self.error = error
+            if status in FINISHED_STATES:
+                self.finished_at = time.time()
+            self._add_event(status, {'result': result} if result is not None else ({'error': error} if error else {}))
+
+    def _add_event(self, stage, info):
+        # Caller holds the condition
+        self.events.append({'id': len(self.events), 'stage': stage, 'time': time.time(), **info})
+        self._condition.notify_all()
+
+
+class JobManager:
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_queued=DEFAULT_MAX_QUEUED,
+                 retention_seconds=DEFAULT_RETENTION_SECONDS):
+        """
+        Create a job manager.
+
+        Args:
+            max_workers (int): Renders running at the same time
+            max_queued (int): Jobs allowed to wait for a worker before submissions are rejected
+            retention_seconds (float): How long finished jobs stay queryable
+        """
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='render-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, function, *args, **kwargs):
+        """
+        Queue ``function(*args, progress=job.progress, **kwargs)`` and return its Job.
+
+        The function's return value becomes the job result; an exception marks the job failed.
+        Raises JobQueueFull if too many jobs are already waiting or running.
+        """
+        with self._lock:
+            self._prune()
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self.max_workers + self.max_queued:
+                raise JobQueueFull(f"Render queue is full ({active} jobs pending)")
+            job = Job(kind)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, function, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'max_workers': self.max_workers, 'max_queued': self.max_queued, 'jobs': counts}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, function, args, kwargs):
+        job._set_status(RUNNING)
+        try:
+            result = function(*args, progress=job.progress, **kwargs)
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}")
+            job._set_status(FAILED, error=str(e))
+        else:
+            job._set_status(SUCCEEDED, result=result)
+
+    def _prune(self):
+        # Caller holds the lock
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
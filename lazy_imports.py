@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports
+
+The heavy third-party modules (numpy, requests, pydub, the Gemini SDK) are
+bound at module level through lazy_module(), which defers the actual import
+to the first attribute access. Importing speech_generator or llm therefore
+costs only our own code; CLI calls such as ``--show-options`` and short-lived
+batch workers never pay for modules they do not use, while long-running
+servers load them up front in warmup.py.
+
+Run ``python benchmarks/bench_import_time.py`` for the measured per-module
+import costs and the cold-start budget.
+"""
+
+import importlib
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module, imported on first attribute access."""
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+        self.__lock = threading.Lock()
+
+    def _load(self):
+        if self.__module is None:
+            with self.__lock:
+                if self.__module is None:
+                    self.__module = importlib.import_module(self.__name)
+        return self.__module
+
+    @property
+    def loaded(self):
+        return self.__module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self.__name}' ({state})>"
+
+
+def lazy_module(name):
+    """
+    Bind a module without importing it yet.
+
+    Args:
+        name (str): Absolute module name, e.g. 'numpy' or 'google.genai'
+
+    Returns:
+        LazyModule: Forwards attribute access to the module, importing it the first time
+    """
+    return LazyModule(name)
+
+
+_optional = {}
+_optional_lock = threading.Lock()
+
+
+def optional_import(name, fallback=None):
+    """
+    Import an optional dependency on first use, warning once if it is missing.
+
+    Args:
+        name (str): Module to import
+        fallback (str, optional): What happens instead, printed with the warning
+
+    Returns:
+        module or None: None if the module is not installed
+    """
+    with _optional_lock:
+        if name not in _optional:
+            try:
+                _optional[name] = importlib.import_module(name)
+            except ImportError as e:
+                print(f"⚠️  {name} import failed: {e}")
+                if fallback:
+                    print(f"⚠️  {fallback}")
+                _optional[name] = None
+        return _optional[name]
@@ -1,17 +1,27 @@
-from google import genai
 from dotenv import load_dotenv
 import os
+import time
+import threading
+
+from script_cache import ScriptCache, DEFAULT_CACHE_PATH, DEFAULT_TTL_SECONDS, DEFAULT_MAX_ENTRIES
+from lazy_imports import lazy_module
+
+# The SDK takes most of a second to import; only script generation needs it
+genai = lazy_module('google.genai')
 
 load_dotenv()
 
-class ScriptGenerator:
-    def __init__(self, inputs: dict, model="gemini-2.5-flash"):
-        self.client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = model
-        self.inputs = inputs
-    
-    def generate_script(self):
-        prompt_template = """
+# Fields PROMPT_TEMPLATE needs from the caller
+SCRIPT_FIELDS = [
+    'product_name', 'product_details', 'company_context',
+    'target_audience', 'distribution_method', 'desired_length',
+    'example_output', 'language'
+]
+
+# Bump whenever PROMPT_TEMPLATE changes so cached scripts from the old template aren't served
+PROMPT_TEMPLATE_VERSION = "1"
+
+PROMPT_TEMPLATE = """
         You are an expert creative copywriter specializing in high-conversion *audio advertisements*. 
         Your task is to write a compelling, natural-sounding script for an audio ad.
 
@@ -55,9 +65,158 @@ class ScriptGenerator:
         - Audio, music, or tone cues (e.g., “[Music fades in]”, “(cheerful tone)”)
         """
 
-        prompt = prompt_template.format(**self.inputs)
+# One Gemini client per API key for the whole process: building a client sets up
+# its transport and connection pool, which shouldn't happen on every request
+_clients = {}
+_clients_lock = threading.Lock()
+
+_script_cache = None
+_script_cache_lock = threading.Lock()
+
+
+def get_client(api_key=None):
+    """Return the process-wide Gemini client for ``api_key`` (defaults to GEMINI_API_KEY)."""
+    api_key = api_key or os.getenv('GEMINI_API_KEY')
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = genai.Client(api_key=api_key)
+        return client
+
+
+def get_script_cache():
+    """
+    Return the process-wide script cache, configured from the environment on first use:
+    SCRIPT_CACHE_TTL (seconds), SCRIPT_CACHE_SIZE (entries) and SCRIPT_CACHE_PATH
+    (JSON file; empty keeps the cache in memory only).
+    """
+    global _script_cache
+    with _script_cache_lock:
+        if _script_cache is None:
+            _script_cache = ScriptCache(
+                ttl=float(os.getenv('SCRIPT_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+                max_entries=int(os.getenv('SCRIPT_CACHE_SIZE', DEFAULT_MAX_ENTRIES)),
+                path=os.getenv('SCRIPT_CACHE_PATH', str(DEFAULT_CACHE_PATH)) or None
+            )
+        return _script_cache
+
+
+class ScriptGenerator:
+    def __init__(self, inputs: dict, model="gemini-2.5-flash", client=None, cache="default"):
+        """
+        Args:
+            inputs (dict): Values for the prompt template fields
+            model (str): Gemini model name
+            client (genai.Client, optional): Client to use instead of the shared one
+            cache (ScriptCache, optional): Script cache; "default" uses the shared one, None disables caching
+        """
+        self.client = client or get_client()
+        self.model = model
+        self.inputs = inputs
+        self.cache = get_script_cache() if cache == "default" else cache
+        # Whether the last generate_script/stream_script call was answered from the cache
+        self.cached = False
+        # Filled in when stream_script finishes: the assembled script and timing/usage details
+        self.metadata = None
+    
+    def build_prompt(self):
+        return PROMPT_TEMPLATE.format(**self.inputs)
+    
+    def generate_script(self):
+        prompt = self.build_prompt()
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ScriptCache.make_key(prompt, self.model, PROMPT_TEMPLATE_VERSION)
+            script = self.cache.get(cache_key)
+            self.cached = script is not None
+            if self.cached:
+                return script
+        
         response = self.client.models.generate_content(
             model=self.model,
             contents=prompt
         )
-        return response.text
\ No newline at end of file
+        if self.cache is not None and response.text:
+            self.cache.put(cache_key, response.text)
+        return response.text
+    
+    async def generate_script_async(self):
+        """generate_script for asyncio code, through the client's async API (client.aio)."""
+        prompt = self.build_prompt()
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ScriptCache.make_key(prompt, self.model, PROMPT_TEMPLATE_VERSION)
+            script = self.cache.get(cache_key)
+            self.cached = script is not None
+            if self.cached:
+                return script
+        
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt
+        )
+        if self.cache is not None and response.text:
+            self.cache.put(cache_key, response.text)
+        return response.text
+    
+    def stream_script(self):
+        """
+        Generate the script with the model's streaming API.
+        
+        Yields text fragments as they arrive. Once the generator is exhausted,
+        ``self.metadata`` holds the assembled script, the model, whether it came from
+        the cache, time to first token, total time and token usage (when reported).
+        A cached script is yielded as a single fragment.
+        """
+        prompt = self.build_prompt()
+        started = time.perf_counter()
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ScriptCache.make_key(prompt, self.model, PROMPT_TEMPLATE_VERSION)
+            script = self.cache.get(cache_key)
+            self.cached = script is not None
+            if self.cached:
+                self.metadata = self._stream_metadata(script, started, started, None)
+                yield script
+                return
+        
+        fragments = []
+        first_token_at = None
+        usage = None
+        for chunk in self.client.models.generate_content_stream(model=self.model, contents=prompt):
+            # The last chunks carry the token counts
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            text = chunk.text
+            if not text:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            fragments.append(text)
+            yield text
+        
+        script = "".join(fragments)
+        if self.cache is not None and script:
+            self.cache.put(cache_key, script)
+        self.metadata = self._stream_metadata(script, started, first_token_at, usage)
+    
+    def _stream_metadata(self, script, started, first_token_at, usage):
+        metadata = {
+            "script": script,
+            "model": self.model,
+            "prompt_template_version": PROMPT_TEMPLATE_VERSION,
+            "cached": self.cached,
+            "characters": len(script),
+            "words": len(script.split()),
+            "time_to_first_token": round(first_token_at - started, 3) if first_token_at else None,
+            "elapsed": round(time.perf_counter() - started, 3),
+        }
+        if usage is not None:
+            metadata["usage"] = {
+                "prompt_tokens": getattr(usage, "prompt_token_count", None),
+                "output_tokens": getattr(usage, "candidates_token_count", None),
+                "total_tokens": getattr(usage, "total_token_count", None),
+            }
+        return metadata
\ No newline at end of file
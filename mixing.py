@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Block Mixing
+
+Helpers for mixing narration against a looping music bed one block at a
+time, plus the PCM/WAV plumbing needed to stream the result while it is
+still being synthesized.
+
+Renders stay in memory: TTS bytes are decoded to NumPy arrays, mixed and
+encoded back to bytes without touching the disk. Decoders that only accept
+a path get a private scratch directory per call.
+
+``mix_stream`` decodes, mixes and encodes a whole render in fixed-size
+blocks through preallocated buffers, so its memory use does not grow with
+the length of the ad.
+"""
+
+import io
+import os
+import struct
+import tempfile
+
+from lazy_imports import lazy_module
+
+np = lazy_module('numpy')
+
+
+# Narration sits on top, the music bed stays well underneath it
+SPEECH_GAIN = 0.9
+MUSIC_GAIN = 0.1
+
+# Placeholder RIFF/data sizes for a WAV stream whose final length is unknown;
+# players treat it as "read until the connection closes"
+_STREAMING_WAV_SIZE = 0xFFFFFFFF
+
+
+# Frames decoded, mixed and encoded per step by mix_stream
+DEFAULT_BLOCK_FRAMES = 64 * 1024
+
+# File extension → MIME type of rendered audio
+AUDIO_MIMETYPES = {
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'flac': 'audio/flac',
+    'ogg': 'audio/ogg',
+}
+
+
+class RenderedAudio:
+    def __init__(self, data, format, sample_rate=None, duration=None, analysis=None):
+        """
+        Encoded audio produced by a render, held in memory.
+
+        Args:
+            data (bytes): Encoded file contents
+            format (str): Container of ``data`` ('mp3', 'wav', ...), which can differ from
+                the requested one when the encoder fell back to WAV
+            sample_rate (int, optional): Sample rate, when known
+            duration (float, optional): Length in seconds, when known
+            analysis (dict, optional): Peaks/loudness analysis computed while mixing
+                (see audio_analysis), saved as a sidecar next to the file
+        """
+        self.data = data
+        self.format = format
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.analysis = analysis
+
+    @property
+    def mimetype(self):
+        return AUDIO_MIMETYPES.get(self.format, 'application/octet-stream')
+
+    def save(self, path):
+        """
+        Write the audio to ``path`` and return the path actually written.
+
+        The extension is replaced when it doesn't match the audio format, so a WAV
+        fallback never ends up in a file named .mp3. The analysis, if any, is written
+        to ``<path>.analysis.json``.
+        """
+        path = output_path_for(path, self.format)
+        with open(path, 'wb') as f:
+            f.write(self.data)
+        if self.analysis is not None:
+            from audio_analysis import write_sidecar
+            write_sidecar(path, self.analysis)
+        return path
+
+
+def output_path_for(path, format):
+    """``path`` with its extension replaced by ``format`` when they differ."""
+    root, extension = os.path.splitext(str(path))
+    if extension.lstrip('.').lower() != format:
+        return f"{root}.{format}"
+    return str(path)
+
+
+class BlockMixer:
+    def __init__(self, music=None, speech_gain=SPEECH_GAIN, music_gain=MUSIC_GAIN):
+        """
+        Mix speech blocks with a music bed that loops for as long as the speech lasts.
+
+        Args:
+            music (np.ndarray, optional): Mono float32 music bed at the speech sample rate
+            speech_gain (float): Gain applied to the narration
+            music_gain (float): Gain applied to the music bed
+        """
+        self.music = music if music is not None and len(music) else None
+        self.speech_gain = speech_gain
+        self.music_gain = music_gain
+        self.position = 0
+        self._scratch = np.empty(0, dtype=np.float32)
+
+    def mix(self, speech_block, out=None):
+        """
+        Mix the next block of speech; the music position carries over between calls.
+
+        The music is read by wrapping the position around the bed length, so no
+        tiled copy of the music is ever built. Returns ``out`` (allocated if None).
+        """
+        n = len(speech_block)
+        if out is None:
+            out = np.empty(n, dtype=np.float32)
+        else:
+            out = out[:n]
+        np.multiply(speech_block, self.speech_gain, out=out, casting='unsafe')
+
+        if self.music is not None:
+            if len(self._scratch) < n:
+                self._scratch = np.empty(n, dtype=np.float32)
+            music_length = len(self.music)
+            filled = 0
+            while filled < n:
+                start = (self.position + filled) % music_length
+                take = min(n - filled, music_length - start)
+                scratch = self._scratch[:take]
+                np.multiply(self.music[start:start + take], self.music_gain, out=scratch, casting='unsafe')
+                np.add(out[filled:filled + take], scratch, out=out[filled:filled + take])
+                filled += take
+
+        self.position += n
+        # With gains summing to <= 1 this only catches out-of-range input samples
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+
+def pcm16_to_float32(data):
+    """Little-endian 16-bit PCM bytes → float32 samples in [-1, 1]."""
+    samples = np.frombuffer(data, dtype='<i2').astype(np.float32)
+    samples *= 1.0 / 32768.0
+    return samples
+
+
+def float32_to_pcm16(samples):
+    """Float32 samples in [-1, 1] → little-endian 16-bit PCM bytes."""
+    return (samples * 32767).astype('<i2').tobytes()
+
+
+def wav_header(sample_rate, channels=1, bits_per_sample=16, data_size=None):
+    """
+    Canonical 44-byte PCM WAV header.
+
+    Pass ``data_size=None`` for a stream of unknown length; the sizes are then set
+    to the maximum value and can be patched later with ``finalize_wav_file``.
+    """
+    block_align = channels * bits_per_sample // 8
+    byte_rate = sample_rate * block_align
+    if data_size is None:
+        riff_size = data_size = _STREAMING_WAV_SIZE
+    else:
+        riff_size = 36 + data_size
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def finalize_wav_file(path):
+    """Patch the size fields of a WAV file that was written with a streaming header."""
+    with open(path, "r+b") as f:
+        f.seek(0, 2)
+        data_size = f.tell() - 44
+        f.seek(4)
+        f.write(struct.pack("<I", 36 + data_size))
+        f.seek(40)
+        f.write(struct.pack("<I", data_size))
+
+
+def crossfade_join(segments, sample_rate, crossfade_ms=30):
+    """
+    Concatenate mono float32 segments, overlapping neighbours with a short linear crossfade.
+
+    The fade is shortened automatically for segments shorter than the crossfade.
+    """
+    segments = [segment for segment in segments if len(segment)]
+    if not segments:
+        return np.zeros(0, dtype=np.float32)
+
+    fade = int(sample_rate * crossfade_ms / 1000)
+    overlaps = [min(fade, len(a), len(b)) for a, b in zip(segments, segments[1:])]
+    total = sum(len(segment) for segment in segments) - sum(overlaps)
+
+    out = np.zeros(total, dtype=np.float32)
+    position = 0
+    for i, segment in enumerate(segments):
+        segment = segment.astype(np.float32, copy=False)
+        overlap_in = overlaps[i - 1] if i > 0 else 0
+        if overlap_in:
+            ramp = np.linspace(0.0, 1.0, overlap_in, dtype=np.float32)
+            # Fade out what is already there and fade in the new segment over the same samples
+            out[position:position + overlap_in] *= ramp[::-1]
+            out[position:position + overlap_in] += segment[:overlap_in] * ramp
+        out[position + overlap_in:position + len(segment)] = segment[overlap_in:]
+        position += len(segment) - (overlaps[i] if i < len(overlaps) else 0)
+    return out
+
+
+def encode_audio(samples, sample_rate, format='mp3'):
+    """
+    Encode mono float32 samples with soundfile and return the file bytes.
+
+    Falls back to 16-bit WAV when the installed libsndfile cannot write the format.
+    """
+    return encode_audio_with_format(samples, sample_rate, format)[0]
+
+
+def encode_audio_with_format(samples, sample_rate, format='mp3'):
+    """Like ``encode_audio``, but returns ``(bytes, format)`` so callers know whether the WAV fallback was used."""
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    try:
+        sf.write(buffer, samples, sample_rate, format=format.upper())
+        return buffer.getvalue(), format.lower()
+    except Exception as e:
+        print(f"⚠️  {format.upper()} encoding failed ({e}), using WAV instead")
+        buffer = io.BytesIO()
+        sf.write(buffer, samples, sample_rate, format='WAV', subtype='PCM_16')
+        return buffer.getvalue(), 'wav'
+
+
+def decode_audio(data, sample_rate=None):
+    """
+    Decode encoded audio bytes (MP3, WAV, ...) to mono float32 samples.
+
+    soundfile decodes straight from memory. Builds of libsndfile without MP3
+    support fall back to librosa, which needs a file: it gets one inside a
+    scratch directory private to this call, removed afterwards.
+
+    Args:
+        data (bytes): Encoded audio
+        sample_rate (int, optional): Resample to this rate; keep the native rate if None
+
+    Returns:
+        tuple: (samples, sample_rate)
+    """
+    import soundfile as sf
+
+    try:
+        samples, native_rate = sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+        samples = samples[:, 0] if samples.shape[1] == 1 else samples.mean(axis=1)
+    except Exception:
+        import librosa
+
+        with tempfile.TemporaryDirectory(prefix='render-') as scratch:
+            path = os.path.join(scratch, 'audio')
+            with open(path, 'wb') as f:
+                f.write(data)
+            samples, native_rate = librosa.load(path, sr=None, mono=True)
+
+    if sample_rate and sample_rate != native_rate:
+        import librosa
+
+        samples = librosa.resample(samples, orig_sr=native_rate, target_sr=sample_rate)
+        native_rate = sample_rate
+    return np.ascontiguousarray(samples, dtype=np.float32), native_rate
+
+
+def mix_stream(speech, output, format='mp3', music=None, sample_rate=None, block_frames=DEFAULT_BLOCK_FRAMES,
+               analyzer=None):
+    """
+    Mix speech with a looping music bed and encode the result, one block at a time.
+
+    Speech is decoded ``block_frames`` at a time into a preallocated buffer, mixed in
+    place by a BlockMixer (the music is read by modular indexing, never tiled) and
+    handed straight to the encoder, so peak memory is a few blocks regardless of the
+    length of the render. The music bed itself is typically a memory-mapped array
+    from the music bed cache.
+
+    Args:
+        speech: Encoded audio as a path, bytes or binary file object, or mono float32
+            samples (np.ndarray, requires ``sample_rate``)
+        output: Path or writable binary file object for the encoded result
+        format (str): Output container ('mp3', 'wav', 'flac', ...); falls back to WAV when
+            libsndfile cannot write it, in which case a path output gets a .wav extension
+        music: Mono float32 music bed, a callable ``music(sample_rate)`` returning one
+            (or None), or None for no music (speech passes through at unity gain)
+        sample_rate (int, optional): Sample rate of array input
+        block_frames (int): Frames per block
+        analyzer (AudioAnalyzer, optional): Started at the mix sample rate and fed every
+            mixed block before it is encoded
+
+    Returns:
+        tuple: (format written, sample rate, frames written)
+    """
+    import contextlib
+    import soundfile as sf
+
+    with contextlib.ExitStack() as stack:
+        blocks, sample_rate, _ = _open_speech(sf, speech, sample_rate, block_frames, stack)
+        mixer = _make_mixer(music, sample_rate)
+
+        writer, format = _open_writer(sf, output, format, sample_rate)
+        stack.enter_context(writer)
+        if analyzer is not None:
+            analyzer.start(sample_rate)
+
+        out = np.empty(block_frames, dtype=np.float32)
+        frames = 0
+        for block in blocks:
+            mixed = mixer.mix(block, out=out)
+            if analyzer is not None:
+                analyzer.feed(mixed)
+            writer.write(mixed)
+            frames += len(mixed)
+
+    return format, sample_rate, frames
+
+
+def mix_buffer(speech, music=None, sample_rate=None, block_frames=DEFAULT_BLOCK_FRAMES):
+    """
+    Mix speech with a looping music bed into one float32 buffer, block by block.
+
+    Used when the same mix feeds several encoders (see ``encode_renditions``): the
+    output buffer is allocated once at the speech length and every block is mixed
+    straight into it, with no intermediate full-length copies.
+
+    Arguments are as in ``mix_stream``.
+
+    Returns:
+        tuple: (mixed mono float32 samples, sample rate)
+    """
+    import contextlib
+    import soundfile as sf
+
+    with contextlib.ExitStack() as stack:
+        blocks, sample_rate, frames_hint = _open_speech(sf, speech, sample_rate, block_frames, stack)
+        mixer = _make_mixer(music, sample_rate)
+
+        mixed = np.empty(max(frames_hint, 0), dtype=np.float32)
+        frames = 0
+        for block in blocks:
+            n = len(block)
+            if frames + n > len(mixed):
+                # Compressed input can decode to more frames than the header promised
+                grown = np.empty(max(frames + n, len(mixed) * 2), dtype=np.float32)
+                grown[:frames] = mixed[:frames]
+                mixed = grown
+            mixer.mix(block, out=mixed[frames:frames + n])
+            frames += n
+
+    return mixed[:frames], sample_rate
+
+
+def _open_speech(sf, speech, sample_rate, block_frames, stack):
+    """Block iterator over speech input; returns (blocks, sample rate, expected frames or 0)."""
+    if isinstance(speech, np.ndarray):
+        if not sample_rate:
+            raise ValueError("sample_rate is required for array input")
+        return _array_blocks(speech, block_frames), sample_rate, len(speech)
+
+    if isinstance(speech, (bytes, bytearray)):
+        speech = io.BytesIO(speech)
+    try:
+        reader = stack.enter_context(sf.SoundFile(speech))
+        return _reader_blocks(reader, block_frames), reader.samplerate, reader.frames
+    except Exception:
+        # libsndfile without MP3 support: decode in full once, then continue in blocks
+        samples, sample_rate = decode_audio(_read_all(speech))
+        return _array_blocks(samples, block_frames), sample_rate, len(samples)
+
+
+def _make_mixer(music, sample_rate):
+    if callable(music):
+        music = music(sample_rate)
+    if music is None:
+        # No bed: speech passes through at unity gain
+        return BlockMixer(None, speech_gain=1.0)
+    return BlockMixer(music)
+
+
+def _array_blocks(samples, block_frames):
+    for start in range(0, len(samples), block_frames):
+        yield samples[start:start + block_frames]
+
+
+def _reader_blocks(reader, block_frames):
+    buffer = np.empty((block_frames, reader.channels), dtype=np.float32)
+    mono = np.empty(block_frames, dtype=np.float32)
+    while True:
+        block = reader.read(block_frames, dtype='float32', always_2d=True, out=buffer)
+        n = len(block)
+        if not n:
+            return
+        if reader.channels == 1:
+            yield block[:, 0]
+        else:
+            yield np.mean(block, axis=1, out=mono[:n])
+        if n < block_frames:
+            return
+
+
+def _read_all(source):
+    if hasattr(source, 'read'):
+        source.seek(0)
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _open_writer(sf, output, format, sample_rate, channels=1, **options):
+    """
+    Open an incremental encoder, falling back to 16-bit WAV if ``format`` isn't writable.
+
+    ``options`` are extra SoundFile arguments (e.g. compression_level) for the requested format.
+    """
+    try:
+        target = output_path_for(output, format.lower()) if isinstance(output, (str, os.PathLike)) else output
+        writer = sf.SoundFile(target, 'w', samplerate=sample_rate, channels=channels, format=format.upper(), **options)
+        return writer, format.lower()
+    except Exception as e:
+        print(f"⚠️  {format.upper()} encoding failed ({e}), using WAV instead")
+        if isinstance(output, (str, os.PathLike)):
+            output = output_path_for(output, 'wav')
+        else:
+            output.seek(0)
+            output.truncate()
+        writer = sf.SoundFile(output, 'w', samplerate=sample_rate, channels=channels, format='WAV', subtype='PCM_16')
+        return writer, 'wav'
+
+
+def mp3_bitrate_range(sample_rate):
+    """(lowest, highest) MP3 kbps for ``sample_rate``: MPEG-1 at 32 kHz and up, MPEG-2 at 16-24 kHz, MPEG-2.5 below."""
+    if sample_rate >= 32000:
+        return 32, 320
+    if sample_rate >= 16000:
+        return 8, 160
+    return 8, 64
+
+
+class Rendition:
+    CODECS = ('mp3', 'wav', 'flac', 'ogg')
+
+    def __init__(self, codec='mp3', bitrate=None, sample_rate=None, channels=1):
+        """
+        One delivery format of a render.
+
+        Args:
+            codec (str): 'mp3', 'wav', 'flac' or 'ogg' (Vorbis)
+            bitrate (int, optional): Target kbps for MP3, within the range of the MPEG version
+                the output rate implies (see mp3_bitrate_range). Without an explicit sample
+                rate it is clamped to that range once the mix rate is known
+                (see for_sample_rate). Ignored by lossless codecs.
+            sample_rate (int, optional): Resample to this rate; keep the mix rate if None
+            channels (int): 1 (mono) or 2 (the mono mix on both channels)
+        """
+        codec = str(codec).lower()
+        if codec not in self.CODECS:
+            raise ValueError(f"Unsupported rendition codec: {codec} (choose from {', '.join(self.CODECS)})")
+        if channels not in (1, 2):
+            raise ValueError(f"Rendition channels must be 1 or 2, got {channels}")
+        if bitrate is not None and int(bitrate) <= 0:
+            raise ValueError(f"Rendition bitrate must be positive, got {bitrate}")
+        if sample_rate is not None and not 8000 <= int(sample_rate) <= 192000:
+            raise ValueError(f"Rendition sample rate out of range: {sample_rate}")
+        if codec == 'mp3' and bitrate is not None and sample_rate is not None:
+            low, high = mp3_bitrate_range(int(sample_rate))
+            if not low <= int(bitrate) <= high:
+                raise ValueError(f"MP3 bitrate at {sample_rate}Hz must be between {low} and {high} kbps, got {bitrate}")
+        self.codec = codec
+        self.bitrate = int(bitrate) if bitrate is not None else None
+        self.sample_rate = int(sample_rate) if sample_rate is not None else None
+        self.channels = channels
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build a rendition from a codec name ("wav") or a dict like {"codec": "mp3", "bitrate": 64}."""
+        if isinstance(spec, Rendition):
+            return spec
+        if isinstance(spec, str):
+            return cls(spec)
+        if isinstance(spec, dict):
+            unknown = set(spec) - {'codec', 'bitrate', 'sample_rate', 'channels'}
+            if unknown:
+                raise ValueError(f"Unknown rendition fields: {', '.join(sorted(unknown))}")
+            return cls(**spec)
+        raise ValueError(f"Invalid rendition: {spec!r}")
+
+    @property
+    def label(self):
+        """Short file name suffix, e.g. "mp3_64k_22050hz" or "wav_stereo"."""
+        parts = [self.codec]
+        if self.bitrate and self.codec == 'mp3':
+            parts.append(f"{self.bitrate}k")
+        if self.sample_rate:
+            parts.append(f"{self.sample_rate}hz")
+        if self.channels == 2:
+            parts.append("stereo")
+        return "_".join(parts)
+
+    def to_dict(self):
+        return {'codec': self.codec, 'bitrate': self.bitrate, 'sample_rate': self.sample_rate, 'channels': self.channels}
+
+    def for_sample_rate(self, sample_rate):
+        """
+        This rendition as encoded from a mix at ``sample_rate``: an MP3 bitrate outside the
+        range of the output rate is clamped, so labels and reports show what the file has.
+        """
+        if self.codec != 'mp3' or not self.bitrate:
+            return self
+        low, high = mp3_bitrate_range(self.sample_rate or sample_rate)
+        bitrate = min(max(self.bitrate, low), high)
+        if bitrate == self.bitrate:
+            return self
+        return Rendition(self.codec, bitrate=bitrate, sample_rate=self.sample_rate, channels=self.channels)
+
+    def writer_options(self, sample_rate):
+        """SoundFile arguments that realize the bitrate (libsndfile MP3 maps compression level to bitrate)."""
+        if self.codec != 'mp3' or not self.bitrate:
+            return {}
+        # libsndfile's MP3 bitrate range depends on the MPEG version implied by the sample rate
+        low, high = mp3_bitrate_range(sample_rate)
+        level = (high - min(max(self.bitrate, low), high)) / (high - low)
+        return {'compression_level': min(level, 0.99), 'bitrate_mode': 'CONSTANT'}
+
+
+def encode_rendition(samples, sample_rate, rendition, output, block_frames=DEFAULT_BLOCK_FRAMES, analyzer=None):
+    """
+    Encode a mono float32 mix as one rendition, block by block.
+
+    Args:
+        output: Path (its extension follows the codec) or writable binary file object
+        analyzer (AudioAnalyzer, optional): Started at the rendition's sample rate and fed
+            every block as encoded (after resampling)
+
+    Returns:
+        str: Format actually written (WAV if the codec isn't available)
+    """
+    import soundfile as sf
+
+    target_rate = rendition.sample_rate or sample_rate
+    if target_rate != sample_rate:
+        samples = _resample(samples, sample_rate, target_rate)
+
+    options = rendition.writer_options(target_rate)
+    if analyzer is not None:
+        analyzer.start(target_rate)
+    writer, format = _open_writer(sf, output, rendition.codec, target_rate, channels=rendition.channels, **options)
+    with writer:
+        if rendition.channels == 1:
+            for start in range(0, len(samples), block_frames):
+                block = samples[start:start + block_frames]
+                if analyzer is not None:
+                    analyzer.feed(block)
+                writer.write(block)
+        else:
+            stereo = np.empty((block_frames, 2), dtype=np.float32)
+            for start in range(0, len(samples), block_frames):
+                block = samples[start:start + block_frames]
+                if analyzer is not None:
+                    analyzer.feed(block)
+                out = stereo[:len(block)]
+                out[:, 0] = block
+                out[:, 1] = block
+                writer.write(out)
+    return format
+
+
+def encode_renditions(samples, sample_rate, renditions, outputs, max_workers=None, analyzers=None):
+    """
+    Encode one mix into several renditions in parallel threads.
+
+    libsndfile runs outside the GIL, so the encoders overlap; they all read the
+    same (read-only) mixed buffer.
+
+    Args:
+        renditions (list of Rendition): Target formats
+        outputs (list): Path or file object for each rendition
+        analyzers (list, optional): AudioAnalyzer (or None) for each rendition, fed what
+            that rendition encodes
+
+    Returns:
+        list of str: Format actually written for each rendition, in order
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    analyzers = analyzers or [None] * len(renditions)
+    if len(renditions) == 1:
+        return [encode_rendition(samples, sample_rate, renditions[0], outputs[0], analyzer=analyzers[0])]
+    with ThreadPoolExecutor(max_workers=max_workers or len(renditions), thread_name_prefix='encoder') as executor:
+        futures = [executor.submit(encode_rendition, samples, sample_rate, rendition, output, analyzer=analyzer)
+                   for rendition, output, analyzer in zip(renditions, outputs, analyzers)]
+        return [future.result() for future in futures]
+
+
+def _resample(samples, orig_sr, target_sr):
+    try:
+        import librosa
+        return librosa.resample(samples, orig_sr=orig_sr, target_sr=target_sr).astype(np.float32, copy=False)
+    except ImportError:
+        from scipy import signal
+        return signal.resample_poly(samples, target_sr, orig_sr).astype(np.float32)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Music Bed Cache
+
+Keeps background music beds decoded as mono float32 PCM, one copy per
+target sample rate, so a mix never pays for MP3 decoding and resampling.
+
+Decoded beds are stored as .npy files and opened memory-mapped (read-only):
+every worker process maps the same file, so the pages are shared by the OS
+instead of being decoded and held once per process. Each file name embeds a
+hash of the source path and a signature of the source file (size,
+modification time), so editing or replacing a music file invalidates its
+decoded copies automatically, and beds with the same name in different
+directories never share or evict each other's copies.
+"""
+
+import os
+import hashlib
+import threading
+from pathlib import Path
+
+from lazy_imports import lazy_module
+
+np = lazy_module('numpy')
+
+
+DEFAULT_CACHE_DIR = Path(".cache") / "music"
+
+# Sample rates warmed at startup: regular renders (mp3_44100) and streaming renders (pcm_24000)
+DEFAULT_WARM_SAMPLE_RATES = (44100, 24000)
+
+
+def _decode_with_librosa(path, sample_rate):
+    import librosa
+
+    samples, _ = librosa.load(path, sr=sample_rate, mono=True)
+    return samples
+
+
+class MusicBedCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, decode=_decode_with_librosa):
+        """
+        Create (or reopen) a music bed cache directory.
+
+        Args:
+            cache_dir (str, optional): Directory for decoded .npy beds; None keeps them in memory only
+            decode (callable): ``decode(path, sample_rate)`` returning mono float samples
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._decode = decode
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        # (source path, sample rate) → (source signature, samples)
+        self._beds = {}
+        self.hits = 0
+        self.loads = 0
+        self.decodes = 0
+
+    def get(self, music_file, sample_rate):
+        """
+        Return the decoded bed for ``music_file`` at ``sample_rate`` (treat it as read-only).
+
+        Served from memory while the source file is unchanged, otherwise mapped from the
+        .npy cache, otherwise decoded and written to the cache first.
+
+        Raises:
+            OSError: If the source file does not exist
+        """
+        path = os.path.abspath(music_file)
+        key = (path, int(sample_rate))
+        signature = self._signature(path)
+
+        with self._lock:
+            entry = self._beds.get(key)
+            if entry and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One decode per bed even when several renders ask for it at once
+        with key_lock:
+            with self._lock:
+                entry = self._beds.get(key)
+                if entry and entry[0] == signature:
+                    self.hits += 1
+                    return entry[1]
+
+            samples = self._load(path, key[1], signature)
+            with self._lock:
+                self._beds[key] = (signature, samples)
+            return samples
+
+    def warm(self, music_files, sample_rates=DEFAULT_WARM_SAMPLE_RATES):
+        """Decode (or map) every music file at every sample rate; missing files are skipped."""
+        warmed = 0
+        for music_file in music_files:
+            if not music_file or not os.path.exists(music_file):
+                continue
+            for sample_rate in sample_rates:
+                try:
+                    self.get(music_file, sample_rate)
+                    warmed += 1
+                except Exception as e:
+                    print(f"⚠️  Could not warm music bed {music_file} at {sample_rate}Hz: {e}")
+        return warmed
+
+    def invalidate(self):
+        """Forget the in-memory beds; the .npy files are revalidated on the next lookup."""
+        with self._lock:
+            self._beds.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "beds": len(self._beds),
+                "hits": self.hits,
+                "loads": self.loads,
+                "decodes": self.decodes,
+                "bytes": sum(entry[1].nbytes for entry in self._beds.values()),
+            }
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def _source_prefix(path, sample_rate):
+        # Identifies the source file regardless of its version
+        source = hashlib.sha256(path.encode("utf-8")).hexdigest()[:12]
+        return f"{Path(path).stem}_{sample_rate}_{source}"
+
+    def _cache_path(self, path, sample_rate, signature):
+        digest = hashlib.sha256(f"{path}|{signature[0]}|{signature[1]}".encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{self._source_prefix(path, sample_rate)}_{digest}.npy"
+
+    def _load(self, path, sample_rate, signature):
+        cache_path = self._cache_path(path, sample_rate, signature) if self.cache_dir else None
+
+        if cache_path is not None:
+            try:
+                samples = np.load(cache_path, mmap_mode="r")
+                with self._lock:
+                    self.loads += 1
+                return samples
+            except (OSError, ValueError):
+                pass  # not cached yet, or a truncated file from a crashed writer
+
+        samples = np.ascontiguousarray(self._decode(path, sample_rate), dtype=np.float32)
+        with self._lock:
+            self.decodes += 1
+        print(f"🎵 Decoded music bed {Path(path).name} at {sample_rate}Hz ({len(samples) / sample_rate:.1f}s)")
+
+        if cache_path is None:
+            return samples
+        try:
+            self._write(cache_path, samples)
+            self._remove_stale(path, sample_rate, cache_path)
+            return np.load(cache_path, mmap_mode="r")
+        except OSError as e:
+            print(f"⚠️  Could not write music bed cache: {e}")
+            return samples
+
+    @staticmethod
+    def _write(cache_path, samples):
+        # Atomic so other processes never map a half-written file
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, samples)
+        os.replace(tmp_path, cache_path)
+
+    def _remove_stale(self, path, sample_rate, current):
+        # Decoded copies of older versions of the same source file
+        for stale in self.cache_dir.glob(f"{self._source_prefix(path, sample_rate)}_*.npy"):
+            if stale != current:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
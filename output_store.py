@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Output Store
+
+Index of the rendered files in ``outputs/``, kept in an embedded SQLite
+database (``outputs/index.sqlite3``). Each render is recorded with its
+parameters, size, duration and content hash, under an ID of its own:
+
+- Identical outputs are stored once. A render whose bytes hash to an existing
+  file is pointed at that file and its own copy is removed.
+- ``/api/audio`` resolves names through the index, and listings page through
+  it with a keyset cursor, so nothing ever scans the directory.
+- A background sweeper enforces an age limit and a size quota, deleting the
+  oldest renders first. A file (and its analysis sidecar) is removed once no
+  render references it.
+
+The database runs in WAL mode, so the workers of a multi-process server can
+share it.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+
+DEFAULT_OUTPUT_DIR = Path("outputs")
+INDEX_FILENAME = "index.sqlite3"
+
+# Retention: no age limit and no quota unless configured
+DEFAULT_MAX_AGE_SECONDS = None
+DEFAULT_MAX_BYTES = None
+DEFAULT_SWEEP_INTERVAL = 600
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Render parameters kept in their own columns so listings can filter on them
+FILTER_COLUMNS = ('tone', 'gender', 'language', 'background_music')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL,
+    format TEXT,
+    tone TEXT,
+    gender TEXT,
+    language TEXT,
+    background_music TEXT,
+    params TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS renders_created ON renders (created_at, id);
+CREATE INDEX IF NOT EXISTS renders_hash ON renders (content_hash);
+CREATE INDEX IF NOT EXISTS renders_filename ON renders (filename);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY);
+"""
+
+# Files in the output directory that are not renders
+_IGNORED_SUFFIXES = ('.analysis.json', '.tmp', '.sqlite3', '.sqlite3-wal', '.sqlite3-shm')
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _sidecar_duration(path):
+    """Duration from the file's analysis sidecar, if it has one (no decoding)."""
+    from audio_analysis import sidecar_path
+
+    try:
+        with open(sidecar_path(path)) as f:
+            return json.load(f).get('duration')
+    except (OSError, ValueError):
+        return None
+
+
+class OutputStore:
+    def __init__(self, directory=DEFAULT_OUTPUT_DIR, index_path=None, max_age=DEFAULT_MAX_AGE_SECONDS,
+                 max_bytes=DEFAULT_MAX_BYTES, sweep_interval=DEFAULT_SWEEP_INTERVAL):
+        """
+        Open (or create) the index of an output directory.
+
+        A new index is filled once from the files already in the directory.
+
+        Args:
+            directory (str): Directory holding the rendered files
+            index_path (str, optional): SQLite database; defaults to <directory>/index.sqlite3
+            max_age (float, optional): Seconds a render is kept; None keeps renders forever
+            max_bytes (int, optional): Size quota for the directory; the oldest renders are removed beyond it
+            sweep_interval (float): Seconds between background retention sweeps
+        """
+        self.directory = Path(directory).resolve()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = Path(index_path) if index_path else self.directory / INDEX_FILENAME
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.deduplicated = 0
+        self.swept = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+
+        self._db = sqlite3.connect(str(self.index_path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+            # Only the first process to open a new index imports the existing files
+            first_open = self._db.execute("INSERT OR IGNORE INTO meta (key) VALUES ('imported')").rowcount == 1
+        if first_open:
+            imported = self.import_existing()
+            if imported:
+                print(f"🗂️  Indexed {imported} existing outputs in {self.index_path}")
+
+    def add(self, path, params=None, duration=None, created_at=None, deduplicate=True):
+        """
+        Record a finished render.
+
+        If a file with identical content is already indexed, the render is recorded
+        against that file and ``path`` (with its sidecar) is deleted.
+
+        Args:
+            path (str): Rendered file inside the output directory
+            params (dict, optional): Render parameters (tone, gender, language, background_music, ...)
+            duration (float, optional): Length in seconds; read from the analysis sidecar if omitted
+            deduplicate (bool): Replace the file by an identical indexed one; off for files whose
+                name was already handed out
+
+        Returns:
+            dict: The render record (id, filename, size, duration, format, params, created_at, ...)
+        """
+        path = Path(path)
+        params = dict(params or {})
+        content_hash = _file_hash(path)
+        size = path.stat().st_size
+        if duration is None:
+            duration = _sidecar_duration(str(path))
+        record = {
+            'id': uuid.uuid4().hex,
+            'filename': path.name,
+            'content_hash': content_hash,
+            'size': size,
+            'duration': round(duration, 3) if duration is not None else None,
+            'format': path.suffix.lstrip('.').lower() or None,
+            **{column: params.get(column) for column in FILTER_COLUMNS},
+            'params': json.dumps(params, sort_keys=True, default=str),
+            'created_at': created_at if created_at is not None else time.time(),
+        }
+
+        duplicate = None
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT DISTINCT filename FROM renders WHERE content_hash = ? AND filename != ?",
+                    (content_hash, path.name)
+                ) if deduplicate else []
+                for row in rows:
+                    if (self.directory / row['filename']).exists():
+                        duplicate = row['filename']
+                        break
+                if duplicate:
+                    record['filename'] = duplicate
+                    self.deduplicated += 1
+                columns = ', '.join(record)
+                self._db.execute(f"INSERT INTO renders ({columns}) VALUES ({', '.join('?' * len(record))})",
+                                 tuple(record.values()))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+        if duplicate:
+            self._remove_file(path.name)
+        return self._to_dict(record)
+
+    def import_existing(self):
+        """Index the files already in the directory (used once, when the index is created)."""
+        imported = 0
+        for entry in sorted(os.scandir(self.directory), key=lambda entry: entry.stat().st_mtime):
+            if not entry.is_file() or entry.name.startswith('.') or entry.name.endswith(_IGNORED_SUFFIXES):
+                continue
+            self.add(entry.path, created_at=entry.stat().st_mtime)
+            imported += 1
+        return imported
+
+    def resolve(self, name):
+        """
+        Path of an indexed file, looked up by render ID or filename.
+
+        Returns:
+            Path or None: None if the name is not indexed or its file is gone
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT filename FROM renders WHERE id = ? OR filename = ? LIMIT 1", (name, name)
+            ).fetchone()
+        if row is None:
+            return None
+        path = self.directory / row['filename']
+        return path if path.exists() else None
+
+    def get(self, render_id):
+        """The render record with this ID, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM renders WHERE id = ?", (render_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit=DEFAULT_PAGE_SIZE, cursor=None, **filters):
+        """
+        One page of renders, newest first.
+
+        Args:
+            limit (int): Page size (at most MAX_PAGE_SIZE)
+            cursor (str, optional): ``next_cursor`` of the previous page
+            **filters: Exact matches on tone, gender, language or background_music
+
+        Returns:
+            tuple: (list of render dicts, next cursor or None on the last page)
+
+        Raises:
+            ValueError: On an invalid cursor or filter
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses, args = [], []
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Unknown filter: {column}")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if cursor:
+            try:
+                created_at, render_id = cursor.split('_', 1)
+                created_at = float(created_at)
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            args += [created_at, created_at, render_id]
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM renders {where} ORDER BY created_at DESC, id DESC LIMIT ?", (*args, limit + 1)
+            ).fetchall()
+
+        renders = [self._to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last['created_at']!r}_{last['id']}"
+        return renders, next_cursor
+
+    def sweep(self):
+        """
+        Apply the retention rules once: drop renders older than max_age, then the
+        oldest renders until the directory fits max_bytes. Files no longer referenced
+        by any render are deleted with their sidecars.
+
+        Returns:
+            dict: renders and files removed, bytes freed
+        """
+        removed = {}
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self.max_age is not None:
+                    cutoff = time.time() - self.max_age
+                    removed.update((row['id'], row['filename']) for row in self._db.execute(
+                        "SELECT id, filename FROM renders WHERE created_at < ?", (cutoff,)
+                    ))
+                    self._db.execute("DELETE FROM renders WHERE created_at < ?", (cutoff,))
+
+                if self.max_bytes is not None:
+                    # Deduplicated files count once, and only free their space with their last render
+                    files = {row['filename']: [row['size'], row['refs']] for row in self._db.execute(
+                        "SELECT filename, MAX(size) AS size, COUNT(*) AS refs FROM renders GROUP BY filename"
+                    )}
+                    total = sum(size for size, _ in files.values())
+                    if total > self.max_bytes:
+                        over_quota = []
+                        for row in self._db.execute("SELECT id, filename FROM renders ORDER BY created_at, id"):
+                            if total <= self.max_bytes:
+                                break
+                            over_quota.append(row['id'])
+                            removed[row['id']] = row['filename']
+                            entry = files[row['filename']]
+                            entry[1] -= 1
+                            if not entry[1]:
+                                total -= entry[0]
+                        self._db.executemany("DELETE FROM renders WHERE id = ?", [(i,) for i in over_quota])
+
+                orphaned = [
+                    filename for filename in set(removed.values())
+                    if self._db.execute("SELECT 1 FROM renders WHERE filename = ?", (filename,)).fetchone() is None
+                ]
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+        freed = sum(self._remove_file(filename) for filename in orphaned)
+        self.swept += len(removed)
+        if removed:
+            print(f"🧹 Output sweep: removed {len(removed)} renders, {len(orphaned)} files ({freed} bytes)")
+        return {'renders': len(removed), 'files': len(orphaned), 'bytes': freed}
+
+    def start_sweeper(self):
+        """Sweep every sweep_interval seconds in a daemon thread (no-op without retention rules)."""
+        if self._sweeper is None and (self.max_age is not None or self.max_bytes is not None):
+            self._sweeper = threading.Thread(target=self._sweep_loop, name='output-sweeper', daemon=True)
+            self._sweeper.start()
+        return self
+
+    def _sweep_loop(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️  Output sweep failed: {e}")
+            if self._stop.wait(self.sweep_interval):
+                return
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._db.close()
+
+    def stats(self):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) AS renders, COUNT(DISTINCT filename) AS files FROM renders"
+            ).fetchone()
+            size = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM renders GROUP BY filename)"
+            ).fetchone()[0]
+        return {
+            'renders': row['renders'],
+            'files': row['files'],
+            'bytes': size,
+            'deduplicated': self.deduplicated,
+            'swept': self.swept,
+            'max_age': self.max_age,
+            'max_bytes': self.max_bytes,
+        }
+
+    def _remove_file(self, filename):
+        """Delete a file and its analysis sidecar; returns the bytes freed."""
+        from audio_analysis import sidecar_path
+
+        path = self.directory / filename
+        freed = 0
+        for target in (path, Path(sidecar_path(str(path)))):
+            try:
+                freed += target.stat().st_size
+                target.unlink()
+            except FileNotFoundError:
+                # Another worker swept it first
+                pass
+        return freed
+
+    @staticmethod
+    def _to_dict(record):
+        record = dict(record)
+        record['params'] = json.loads(record['params'])
+        record['filepath'] = f"outputs/{record['filename']}"
+        return record
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_output_store():
+    """
+    The process-wide store for ``outputs/``, configured from the environment:
+    OUTPUT_MAX_AGE_DAYS, OUTPUT_MAX_BYTES and OUTPUT_SWEEP_INTERVAL (seconds).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            max_age = os.getenv('OUTPUT_MAX_AGE_DAYS')
+            max_bytes = os.getenv('OUTPUT_MAX_BYTES')
+            _store = OutputStore(
+                max_age=float(max_age) * 86400 if max_age else DEFAULT_MAX_AGE_SECONDS,
+                max_bytes=int(max_bytes) if max_bytes else DEFAULT_MAX_BYTES,
+                sweep_interval=float(os.getenv('OUTPUT_SWEEP_INTERVAL', DEFAULT_SWEEP_INTERVAL))
+            )
+        return _store
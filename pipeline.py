@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Script-to-Speech Pipeline
+
+Generates an ad script and its audio in one pass. Instead of waiting for the
+whole script before starting TTS, the LLM output is streamed and cut into
+complete sentences (text_chunker.SentenceSplitter); each sentence is sent to
+synthesis as soon as it is complete. Voice selection and music bed
+preparation start immediately, in parallel with the LLM.
+
+End-to-end latency approaches max(LLM, TTS) instead of LLM + TTS. The
+sentence clips are joined with short crossfades and mixed with the music bed
+exactly like chunked renders.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AdCancelled(Exception):
+    """Raised by generate_ad once its cancel event is set (e.g. the client went away)."""
+
+
+def _no_events(event, **info):
+    """Default event callback: nobody is listening."""
+
+
+def generate_ad(script_generator, speech_generator, tone=None, gender=None, background_music=None,
+                language=None, output_file=None, format='mp3', stability=0.5, similarity_boost=0.5,
+                max_concurrency=None, on_event=None, target_duration=None, max_stretch=None, cancel_event=None):
+    """
+    Stream a script from the LLM and synthesize it sentence by sentence while it is written.
+
+    Args:
+        script_generator (ScriptGenerator): Prepared with the ad inputs
+        speech_generator (ElevenLabsSpeechGenerator): Used for voice selection, TTS and mixing
+        output_file (str, optional): Where to save the ad; defaults to a timestamped file in outputs/
+        format (str): Container to encode to ('mp3', 'wav', 'flac', ...)
+        max_concurrency (int, optional): Sentences synthesized at once (the TTS scheduler still
+            applies); defaults to the chunked synthesis concurrency
+        on_event (callable, optional): Called as on_event(event, **info) for token, sentence,
+            voice_selected, synthesized, script_done, time_stretch, mixing and done
+        target_duration (float, optional): Stretch the joined speech to exactly this many seconds
+        max_stretch (float, optional): Largest allowed tempo change for target_duration
+        cancel_event (threading.Event, optional): Once set, the LLM stream is abandoned, sentences
+            not yet sent to TTS are skipped and nothing is mixed or saved
+        (other arguments as in ElevenLabsSpeechGenerator.generate_speech)
+
+    Returns:
+        dict: script, script metadata, voice_id, filepath, sentences and timings
+
+    Raises:
+        AdCancelled: If ``cancel_event`` was set before the ad was saved
+    """
+    from io import BytesIO
+    from text_chunker import SentenceSplitter
+    from mixing import RenderedAudio, mix_stream, pcm16_to_float32, crossfade_join
+    from audio_analysis import AudioAnalyzer
+    from speech_generator import DEFAULT_STREAM_FORMAT, DEFAULT_CHUNK_CONCURRENCY, DEFAULT_CROSSFADE_MS
+
+    emit = on_event or _no_events
+    started = time.perf_counter()
+    sample_rate = int(DEFAULT_STREAM_FORMAT.split("_", 1)[1])
+    lang_code = speech_generator.language_codes.get((language or '').lower(), language)
+    splitter = SentenceSplitter(lang_code)
+    timings = {}
+
+    def elapsed():
+        return round(time.perf_counter() - started, 3)
+
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise AdCancelled("Ad generation was cancelled")
+
+    def select_voice():
+        voice_id = speech_generator.select_voice(tone=tone, gender=gender, language=language)
+        emit('voice_selected', voice_id=voice_id)
+        return voice_id
+
+    def prepare_music():
+        if background_music and background_music != 'none':
+            return speech_generator._load_music_samples(background_music, sample_rate)
+        return None
+
+    def synthesize(index, sentence, previous):
+        check_cancelled()
+        data = speech_generator.build_tts_request(sentence, stability, similarity_boost, tone=tone, language=language)
+        if previous:
+            data["previous_text"] = previous
+        pcm = speech_generator.synthesize(voice.result(), data, DEFAULT_STREAM_FORMAT)
+        if index == 0:
+            timings['first_audio'] = elapsed()
+        emit('synthesized', index=index, bytes=len(pcm))
+        return pcm
+
+    workers = max_concurrency or DEFAULT_CHUNK_CONCURRENCY
+    # Two extra threads for voice selection and music preparation
+    with ThreadPoolExecutor(max_workers=workers + 2, thread_name_prefix='pipeline') as executor:
+        voice = executor.submit(select_voice)
+        music = executor.submit(prepare_music)
+
+        sentences = []
+        clips = []
+
+        def submit(sentence):
+            if not sentences:
+                timings['first_sentence'] = elapsed()
+            previous = sentences[-1] if sentences else None
+            emit('sentence', index=len(sentences), text=sentence)
+            clips.append(executor.submit(synthesize, len(sentences), sentence, previous))
+            sentences.append(sentence)
+
+        try:
+            for text in script_generator.stream_script():
+                check_cancelled()
+                emit('token', text=text)
+                for sentence in splitter.feed(text):
+                    submit(sentence)
+            remainder = splitter.flush()
+            if remainder:
+                submit(remainder)
+        except BaseException:
+            for clip in clips:
+                clip.cancel()
+            raise
+
+        metadata = script_generator.metadata or {}
+        timings['script'] = elapsed()
+        emit('script_done', **metadata)
+        if not sentences:
+            raise ValueError("The model returned an empty script")
+
+        pcm_clips = [clip.result() for clip in clips]
+        timings['speech'] = elapsed()
+        music_samples = music.result()
+
+    check_cancelled()
+    speech = crossfade_join([pcm16_to_float32(pcm) for pcm in pcm_clips], sample_rate,
+                            crossfade_ms=DEFAULT_CROSSFADE_MS)
+    if target_duration:
+        stretch = {'max_stretch': max_stretch} if max_stretch is not None else {}
+        speech, sample_rate = speech_generator.fit_speech_to_duration(
+            speech, sample_rate, target_duration, progress=emit, **stretch
+        )
+    if music_samples is not None:
+        emit('mixing', background_music=background_music)
+    output = BytesIO()
+    analyzer = AudioAnalyzer()
+    encoded_format, sample_rate, frames = mix_stream(
+        speech, output, format=format,
+        music=(lambda rate: music_samples) if music_samples is not None else None,
+        sample_rate=sample_rate, analyzer=analyzer
+    )
+    audio = RenderedAudio(output.getvalue(), encoded_format, sample_rate=sample_rate, duration=frames / sample_rate,
+                          analysis=analyzer.result())
+
+    if output_file is None:
+        output_file = speech_generator.generate_output_filename(
+            tone=tone, gender=gender, language=language, background_music=background_music
+        )
+    filepath = audio.save(output_file)
+    timings['total'] = elapsed()
+    print(f"✅ Ad rendered in {timings['total']:.2f}s "
+          f"(script {timings['script']:.2f}s, {len(sentences)} sentences): {filepath}")
+
+    result = {
+        'script': metadata.get('script', ' '.join(sentences)),
+        'metadata': metadata,
+        'voice_id': voice.result(),
+        'filepath': filepath,
+        'sentences': len(sentences),
+        'duration': round(audio.duration, 3),
+        'timings': timings,
+    }
+    emit('done', **result)
+    return result
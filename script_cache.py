@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Script Cache
+
+Caches generated ad scripts keyed on everything that determines the LLM
+output: the rendered prompt, the model name and the prompt template version
+(bump the version whenever the template changes, so old scripts stop being
+served). Repeated or retried requests with the same inputs are answered from
+memory instead of calling Gemini again.
+
+Entries expire after a TTL, and the least recently used ones are evicted
+beyond a size bound. The cache can be persisted to a JSON file (written
+atomically) so it survives restarts.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_PATH = Path(".cache") / "scripts.json"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ScriptCache:
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        """
+        Create a script cache, loading the persisted entries if ``path`` exists.
+
+        Args:
+            ttl (float): Seconds a script is served after it was generated
+            max_entries (int): Least recently used scripts are evicted beyond this
+            path (str, optional): JSON file the cache is persisted to; None keeps it in memory only
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # key → (created timestamp, script), least recently used first
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    @staticmethod
+    def make_key(prompt, model, template_version):
+        """Stable hash of the rendered prompt, model and prompt template version."""
+        payload = json.dumps({"prompt": prompt, "model": model, "template_version": template_version},
+                             sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached script, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, script):
+        """Store a script and evict the least recently used entries beyond the size bound."""
+        with self._lock:
+            self._entries[key] = (time.time(), script)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._save()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "persisted": self.path is not None,
+            }
+
+    def _load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable script cache {self.path}: {e}")
+            return
+
+        now = time.time()
+        loaded = {}
+        try:
+            # Persisted oldest first, so insertion order restores the LRU order
+            for key, created, script in entries[-self.max_entries:]:
+                if now - created <= self.ttl:
+                    loaded[key] = (created, script)
+        except (TypeError, ValueError) as e:
+            # Valid JSON of the wrong shape (another file, an older format)
+            print(f"⚠️  Ignoring unreadable script cache {self.path}: {e}")
+            return
+        self._entries.update(loaded)
+
+    def _save(self):
+        if self.path is None:
+            return
+        # Snapshot under the save lock so a slower writer never replaces a newer file
+        with self._save_lock:
+            with self._lock:
+                entries = list(self._entries.items())
+            self._write(entries)
+
+    def _write(self, entries):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([[key, created, script] for key, (created, script) in entries], f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not persist script cache: {e}")
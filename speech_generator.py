@@ -8,27 +8,112 @@ A simple Python script to convert text to speech using the ElevenLabs API.
 import os
 import sys
 import argparse
-import requests
 import json
 import datetime
+import uuid
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 
+from http_session import (
+    RetryingSession, DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_MAX_RETRIES,
+    RETRY_STATUS_CODES
+)
+from voice_catalog import VoiceCatalog, DEFAULT_TTL_SECONDS
+from voice_index import VoiceIndex
+from tone_analyzer import TONE_ANALYZER, TONE_CATEGORIES, TONE_KEYWORDS
+from tts_cache import TTSCache, DEFAULT_CACHE_DIR as DEFAULT_TTS_CACHE_DIR, DEFAULT_MAX_BYTES as DEFAULT_TTS_CACHE_MAX_BYTES
+from music_cache import MusicBedCache, DEFAULT_CACHE_DIR as DEFAULT_MUSIC_CACHE_DIR, DEFAULT_WARM_SAMPLE_RATES
+from audio_codecs import CODECS
+from tts_scheduler import TTSScheduler, DEFAULT_MAX_CONCURRENCY as DEFAULT_TTS_MAX_CONCURRENCY
+from time_stretch import DEFAULT_MAX_STRETCH, MAX_STRETCH_LIMIT
+from lazy_imports import lazy_module, optional_import
+
+requests = lazy_module('requests')
+
 load_dotenv()
 
-try:
-    from pydub import AudioSegment
-    from pydub.effects import normalize
-    AUDIO_MIXING_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️  pydub import failed: {e}")
-    print("⚠️  Background music will use simple audio generation instead")
-    AUDIO_MIXING_AVAILABLE = False
+# Output format of regular (non-streaming) TTS requests; part of the TTS cache key
+DEFAULT_TTS_FORMAT = "mp3_44100_128"
+
+# Streaming renders request raw PCM so blocks can be mixed without an MP3 decoder
+DEFAULT_STREAM_FORMAT = "pcm_24000"
+DEFAULT_STREAM_CHUNK_SIZE = 8192
+
+# Chunked (parallel) synthesis of long scripts
+DEFAULT_CHUNK_CONCURRENCY = 4
+DEFAULT_CROSSFADE_MS = 30
+
+# TTS requests leave 429s to the scheduler, which pauses the whole queue instead
+TTS_RETRY_STATUS_CODES = RETRY_STATUS_CODES - {429}
+
+
+def _no_progress(stage, **info):
+    """Default progress callback: renders outside a job don't report stages."""
+
+
+class SpeechStream:
+    """
+    Iterator over a streamed render that releases its TTS request on close().
+
+    A generator's ``finally`` only runs once it has been started, so a stream closed
+    (or dropped) before its first chunk would otherwise keep its scheduler slot and
+    HTTP response forever.
+    """
+
+    def __init__(self, blocks, release):
+        self._blocks = blocks
+        self._release = release
+        # Set once the last block was produced (the TTS stream ended without error)
+        self.completed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._blocks)
+
+    def close(self):
+        """Stop the stream; safe to call more than once, started or not."""
+        try:
+            self._blocks.close()
+        finally:
+            self._release()
+
+    def __del__(self):
+        self.close()
 
 
 class ElevenLabsSpeechGenerator:
-    def __init__(self, api_key=None):
-        """Initialize the speech generator with API key."""
+    def __init__(self, api_key=None, voice_catalog_ttl=DEFAULT_TTL_SECONDS, voice_catalog_path="auto",
+                 refresh_voices_in_background=True, http_pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, tts_cache_dir=DEFAULT_TTS_CACHE_DIR,
+                 tts_cache_max_bytes=DEFAULT_TTS_CACHE_MAX_BYTES, music_cache_dir=DEFAULT_MUSIC_CACHE_DIR,
+                 codec_backend=None, tts_max_concurrency=None, tts_chars_per_minute=None):
+        """
+        Initialize the speech generator with API key.
+        
+        Args:
+            api_key (str, optional): ElevenLabs API key (defaults to ELEVENLABS_API_KEY)
+            voice_catalog_ttl (float): Seconds before the cached voice catalog is revalidated
+            voice_catalog_path (str, optional): Snapshot file for the voice catalog. "auto" picks a
+                per-API-key file under .cache/, None keeps the catalog in memory only
+            refresh_voices_in_background (bool): Serve a stale catalog while refreshing it in the background
+            http_pool_size (int): Keep-alive connections shared by all threads using this generator
+            connect_timeout (float): Seconds to wait for a connection to the API
+            read_timeout (float): Seconds to wait for API response data
+            max_retries (int): Retries for connection errors, timeouts, 429 and 5xx responses
+            tts_cache_dir (str, optional): Directory for cached TTS audio; None disables the cache
+            tts_cache_max_bytes (int): Size quota of the TTS cache
+            music_cache_dir (str, optional): Directory for decoded music beds (.npy); None keeps them in memory only
+            codec_backend (str, optional): Codec backend for file-based mixing and conversion
+                ('soundfile', 'scipy', 'wave', 'ffmpeg'); None picks the best in-process one
+            tts_max_concurrency (int, optional): TTS requests in flight at once (defaults to
+                TTS_MAX_CONCURRENCY, else 4); lowered automatically when the API reports a smaller limit
+            tts_chars_per_minute (int, optional): Character quota per minute for TTS requests
+                (defaults to TTS_CHARS_PER_MINUTE, else unlimited)
+        """
         self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
         if not self.api_key:
             raise ValueError("API key is required. Set ELEVENLABS_API_KEY environment variable or pass it as argument.")
@@ -39,15 +124,51 @@ class ElevenLabsSpeechGenerator:
             "Content-Type": "application/json"
         }
         
+        # Pooled keep-alive session with timeouts and retries, safe to share across threads
+        self.http = RetryingSession(
+            pool_size=http_pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            max_retries=max_retries
+        )
+        
+        # Cached voice catalog shared by list_voices, generate_speech and the CLI
+        if voice_catalog_path == "auto":
+            voice_catalog_path = VoiceCatalog.snapshot_path_for(self.api_key)
+        self.voice_catalog = VoiceCatalog(
+            self._fetch_voices,
+            ttl=voice_catalog_ttl,
+            snapshot_path=voice_catalog_path,
+            refresh_in_background=refresh_voices_in_background
+        )
+        
+        # Content-addressed cache of synthesized audio
+        self.tts_cache = TTSCache(tts_cache_dir, max_bytes=tts_cache_max_bytes) if tts_cache_dir else None
+        
+        # Background music decoded once per sample rate, shared between processes via mmap
+        self.music_cache = MusicBedCache(music_cache_dir)
+        
+        # Decode/encode/mix backends; capabilities are probed once per process
+        self.codecs = CODECS
+        self.codec_backend = codec_backend or os.getenv('AUDIO_CODEC_BACKEND') or None
+        
+        # Every TTS request waits here for a concurrency slot and character budget
+        chars_per_minute = tts_chars_per_minute or os.getenv('TTS_CHARS_PER_MINUTE')
+        self.tts_scheduler = TTSScheduler(
+            max_concurrency=tts_max_concurrency or int(os.getenv('TTS_MAX_CONCURRENCY', DEFAULT_TTS_MAX_CONCURRENCY)),
+            chars_per_minute=int(chars_per_minute) if chars_per_minute else None
+        )
+        
+        # Tone keyword matcher, compiled once at import
+        self.tone_analyzer = TONE_ANALYZER
+        
+        # Voice feature index, rebuilt whenever the catalog version changes
+        self._voice_index = None
+        self._voice_index_lock = threading.Lock()
+        
         # Voice characteristics mapping
         self.voice_characteristics = {
-            'tone': {
-                'friendly': ['warm', 'cheerful', 'upbeat', 'kind', 'welcoming', 'pleasant', 'nice', 'gentle', 'sweet', 'caring', 'supportive', 'encouraging', 'positive', 'optimistic', 'happy', 'joyful', 'lively', 'vibrant', 'energetic', 'enthusiastic', 'excited', 'animated', 'bubbly', 'sunny', 'bright', 'cheery', 'upbeat', 'lively', 'spirited', 'vivacious', 'radiant', 'glowing', 'beaming', 'smiling', 'grinning', 'chirpy', 'perky', 'peppy', 'zippy', 'snappy', 'bouncy', 'springy', 'elastic', 'flexible', 'adaptable', 'versatile', 'accommodating', 'helpful', 'assisting', 'supportive', 'encouraging', 'motivating', 'inspiring', 'uplifting', 'heartwarming', 'touching', 'moving', 'emotional', 'sentimental', 'tender', 'soft', 'mild', 'gentle', 'smooth', 'easy', 'comfortable', 'cozy', 'snug', 'warm', 'toasty', 'inviting', 'welcoming', 'hospitable', 'gracious', 'courteous', 'polite', 'respectful', 'considerate', 'thoughtful', 'mindful', 'attentive', 'caring', 'loving', 'affectionate', 'fond', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'committed', 'dedicated', 'passionate', 'fervent', 'ardent', 'zealous', 'eager', 'keen', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'professional': ['formal', 'authoritative', 'clear', 'business', 'corporate', 'executive', 'managerial', 'administrative', 'official', 'ceremonial', 'ritual', 'traditional', 'conventional', 'standard', 'normal', 'regular', 'typical', 'usual', 'common', 'ordinary', 'everyday', 'routine', 'systematic', 'methodical', 'organized', 'structured', 'disciplined', 'controlled', 'regulated', 'governed', 'managed', 'supervised', 'overseen', 'monitored', 'tracked', 'measured', 'evaluated', 'assessed', 'analyzed', 'examined', 'studied', 'researched', 'investigated', 'explored', 'discovered', 'found', 'identified', 'recognized', 'acknowledged', 'accepted', 'approved', 'endorsed', 'supported', 'backed', 'sponsored', 'funded', 'financed', 'invested', 'committed', 'dedicated', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'casual': ['relaxed', 'conversational', 'informal', 'easy', 'comfortable', 'cozy', 'snug', 'warm', 'toasty', 'inviting', 'welcoming', 'hospitable', 'gracious', 'courteous', 'polite', 'respectful', 'considerate', 'thoughtful', 'mindful', 'attentive', 'caring', 'loving', 'affectionate', 'fond', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'committed', 'dedicated', 'passionate', 'fervent', 'ardent', 'zealous', 'eager', 'keen', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'dramatic': ['expressive', 'theatrical', 'powerful', 'intense', 'passionate', 'emotional', 'moving', 'touching', 'stirring', 'inspiring', 'uplifting', 'motivating', 'encouraging', 'supportive', 'helpful', 'assisting', 'accommodating', 'versatile', 'adaptable', 'flexible', 'elastic', 'springy', 'bouncy', 'snappy', 'zippy', 'peppy', 'perky', 'chirpy', 'grinning', 'smiling', 'beaming', 'glowing', 'radiant', 'vivacious', 'spirited', 'lively', 'bubbly', 'animated', 'excited', 'enthusiastic', 'eager', 'keen', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'calm': ['soothing', 'gentle', 'peaceful', 'tranquil', 'serene', 'quiet', 'still', 'silent', 'hushed', 'muted', 'soft', 'mild', 'tender', 'delicate', 'fragile', 'sensitive', 'vulnerable', 'open', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized']
-            },
+            'tone': TONE_KEYWORDS,
             'gender': {
                 'male': ['masculine', 'deep', 'male', 'man', 'guy', 'masculine', 'baritone', 'bass', 'husky', 'gruff', 'deep voice', 'male voice', 'man\'s voice', 'guy\'s voice'],
                 'female': ['feminine', 'soft', 'female', 'woman', 'lady', 'girl', 'soprano', 'alto', 'sweet', 'gentle', 'female voice', 'woman\'s voice', 'lady\'s voice', 'girl\'s voice'],
@@ -129,49 +250,14 @@ class ElevenLabsSpeechGenerator:
         tone_description = tone_description.lower().strip()
         
         # Direct matches first
-        if tone_description in ['friendly', 'professional', 'casual', 'dramatic', 'calm']:
+        if tone_description in TONE_CATEGORIES:
             return tone_description
         
-        # Calculate similarity scores for each tone category
-        tone_scores = {}
-        
-        for tone_category, keywords in self.voice_characteristics['tone'].items():
-            score = 0
-            
-            # Split the input into words
-            input_words = tone_description.split()
-            
-            # Check for exact word matches
-            for word in input_words:
-                if word in keywords:
-                    score += 3  # High score for exact matches
-            
-            # Check for partial matches (substring matching)
-            for keyword in keywords:
-                if keyword in tone_description or tone_description in keyword:
-                    score += 2  # Medium score for partial matches
-            
-            # Check for semantic similarity (basic word relationships)
-            semantic_matches = {
-                'friendly': ['nice', 'kind', 'warm', 'welcoming', 'pleasant', 'cheerful', 'happy', 'joyful', 'upbeat', 'positive', 'optimistic', 'encouraging', 'supportive', 'caring', 'loving', 'sweet', 'gentle', 'soft', 'tender', 'mild', 'easy', 'comfortable', 'cozy', 'inviting', 'gracious', 'polite', 'respectful', 'considerate', 'thoughtful', 'attentive', 'helpful', 'assisting', 'accommodating', 'versatile', 'adaptable', 'flexible', 'motivating', 'inspiring', 'uplifting', 'heartwarming', 'touching', 'moving', 'emotional', 'sentimental', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'committed', 'dedicated', 'passionate', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'confident', 'assured', 'certain', 'sure', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'professional': ['formal', 'business', 'corporate', 'executive', 'managerial', 'administrative', 'official', 'ceremonial', 'traditional', 'conventional', 'standard', 'normal', 'regular', 'typical', 'usual', 'common', 'ordinary', 'routine', 'systematic', 'methodical', 'organized', 'structured', 'disciplined', 'controlled', 'regulated', 'governed', 'managed', 'supervised', 'monitored', 'tracked', 'measured', 'evaluated', 'assessed', 'analyzed', 'examined', 'studied', 'researched', 'investigated', 'explored', 'discovered', 'found', 'identified', 'recognized', 'acknowledged', 'accepted', 'approved', 'endorsed', 'supported', 'backed', 'sponsored', 'funded', 'financed', 'invested', 'committed', 'dedicated', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'casual': ['relaxed', 'conversational', 'informal', 'easy', 'comfortable', 'cozy', 'snug', 'warm', 'toasty', 'inviting', 'welcoming', 'hospitable', 'gracious', 'courteous', 'polite', 'respectful', 'considerate', 'thoughtful', 'mindful', 'attentive', 'caring', 'loving', 'affectionate', 'fond', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'committed', 'dedicated', 'passionate', 'fervent', 'ardent', 'zealous', 'eager', 'keen', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'dramatic': ['expressive', 'theatrical', 'powerful', 'intense', 'passionate', 'emotional', 'moving', 'touching', 'stirring', 'inspiring', 'uplifting', 'motivating', 'encouraging', 'supportive', 'helpful', 'assisting', 'accommodating', 'versatile', 'adaptable', 'flexible', 'elastic', 'springy', 'bouncy', 'snappy', 'zippy', 'peppy', 'perky', 'chirpy', 'grinning', 'smiling', 'beaming', 'glowing', 'radiant', 'vivacious', 'spirited', 'lively', 'bubbly', 'animated', 'excited', 'enthusiastic', 'eager', 'keen', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
-                'calm': ['soothing', 'gentle', 'peaceful', 'tranquil', 'serene', 'quiet', 'still', 'silent', 'hushed', 'muted', 'soft', 'mild', 'tender', 'delicate', 'fragile', 'sensitive', 'vulnerable', 'open', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized']
-            }
-            
-            for word in input_words:
-                if word in semantic_matches.get(tone_category, []):
-                    score += 1  # Lower score for semantic matches
-            
-            tone_scores[tone_category] = score
-        
-        # Find the tone with the highest score
-        best_tone = max(tone_scores, key=tone_scores.get)
-        best_score = tone_scores[best_tone]
+        # Score every tone category with the precompiled keyword matcher
+        best_tone, best_score = self.tone_analyzer.analyze(tone_description)
         
         # Only return a tone if we have a reasonable confidence (score > 0)
-        if best_score > 0:
+        if best_tone:
             print(f"🎭 Analyzed tone: '{tone_description}' → '{best_tone}' (confidence: {best_score})")
             return best_tone
         else:
@@ -179,14 +265,56 @@ class ElevenLabsSpeechGenerator:
             return None
 
     def get_voices(self):
-        """Get list of available voices."""
+        """Get list of available voices from the cached voice catalog."""
+        return self.voice_catalog.get_voices()
+
+    def refresh_voices(self):
+        """Force a re-download of the voice catalog, bypassing the cache validators."""
+        self.voice_catalog.refresh(force=True)
+        return self.voice_catalog.get_voices()
+
+    def get_cache_stats(self):
+        """Statistics for the voice catalog, TTS and music bed caches, and the TTS scheduler."""
+        voices = self.voice_catalog.get_voices()
+        return {
+            "voice_catalog": {
+                "version": self.voice_catalog.version,
+                "voices": len(voices),
+                "fresh": self.voice_catalog.is_fresh(),
+            },
+            "tts_cache": self.tts_cache.stats() if self.tts_cache else None,
+            "music_cache": self.music_cache.stats(),
+            "tts_scheduler": self.tts_scheduler.stats(),
+        }
+
+    def warm_music_cache(self, sample_rates=DEFAULT_WARM_SAMPLE_RATES):
+        """Decode every background music style ahead of the first render; returns the number of beds ready."""
+        warmed = self.music_cache.warm(self.background_music_files.values(), sample_rates=sample_rates)
+        print(f"🎵 Music bed cache warm: {warmed} beds")
+        return warmed
+
+    def _fetch_voices(self, etag=None, last_modified=None):
+        """
+        Fetch the voice catalog from the API with a conditional request.
+        
+        Returns (voices, etag, last_modified); voices is None when the server
+        answers 304 Not Modified.
+        """
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        
         try:
-            response = requests.get(f"{self.base_url}/voices", headers=self.headers)
+            response = self.http.get(f"{self.base_url}/voices", headers=headers)
+            if response.status_code == 304:
+                return None, response.headers.get("ETag"), response.headers.get("Last-Modified")
             response.raise_for_status()
-            return response.json()["voices"]
+            return response.json()["voices"], response.headers.get("ETag"), response.headers.get("Last-Modified")
         except requests.exceptions.RequestException as e:
             print(f"Error fetching voices: {e}")
-            return []
+            raise
 
     def list_voices(self, tone=None, gender=None, language=None):
         """List all available voices with optional filtering."""
@@ -208,224 +336,78 @@ class ElevenLabsSpeechGenerator:
             print(f"Labels: {voice.get('labels', {})}")
             print("-" * 60)
     
-    def filter_voices(self, voices, tone=None, gender=None, language=None):
-        """Filter voices based on tone, gender, and language criteria."""
-        filtered = voices
+    def get_voice_index(self, voices=None):
+        """
+        Return the feature index for the current voice catalog version.
         
-        if tone:
-            tone_keywords = self.voice_characteristics['tone'].get(tone.lower(), [])
-            if tone_keywords:
-                filtered = [v for v in filtered if any(
-                    keyword.lower() in v.get('description', '').lower() or
-                    keyword.lower() in v.get('name', '').lower() or
-                    any(keyword.lower() in str(label).lower() for label in v.get('labels', {}).values())
-                    for keyword in tone_keywords
-                )]
+        The index is rebuilt only when the catalog version changes. If ``voices``
+        contains voices that are not part of the catalog, a throwaway index is
+        built for just those voices.
         
-        if gender:
-            gender_keywords = self.voice_characteristics['gender'].get(gender.lower(), [])
-            if gender_keywords:
-                filtered = [v for v in filtered if any(
-                    keyword.lower() in v.get('description', '').lower() or
-                    keyword.lower() in v.get('name', '').lower() or
-                    any(keyword.lower() in str(label).lower() for label in v.get('labels', {}).values())
-                    for keyword in gender_keywords
-                )]
+        Returns:
+            tuple: (VoiceIndex, rows) where rows are the index rows of ``voices``
+        """
+        catalog_voices = self.get_voices()
+        version = self.voice_catalog.version
+        with self._voice_index_lock:
+            index = self._voice_index
+            if index is None or index.version != version or index.size != len(catalog_voices):
+                index = VoiceIndex(catalog_voices, self.voice_characteristics, self.language_codes, version=version)
+                self._voice_index = index
         
-        if language:
-            lang_code = self.language_codes.get(language.lower())
-            if lang_code:
-                filtered = [v for v in filtered if 
-                    lang_code in v.get('labels', {}).get('language', '').lower() or
-                    language.lower() in v.get('description', '').lower() or
-                    language.lower() in v.get('name', '').lower()
-                ]
-        
-        return filtered
+        if voices is None:
+            return index, list(range(index.size))
+        
+        rows = index.rows_for(voices)
+        if rows is None:
+            index = VoiceIndex(voices, self.voice_characteristics, self.language_codes)
+            rows = list(range(index.size))
+        return index, rows
+
+    def filter_voices(self, voices, tone=None, gender=None, language=None):
+        """Filter voices based on tone, gender, and language criteria."""
+        index, rows = self.get_voice_index(voices)
+        return [index.voices[row] for row in index.filter_rows(rows, tone, gender, language)]
     
     def score_voice(self, voice, tone=None, gender=None, language=None):
         """Score a voice based on how well it matches the desired characteristics."""
-        score = 0
-        voice_text = f"{voice.get('name', '')} {voice.get('description', '')} {str(voice.get('labels', {}))}".lower()
-        
-        # Score based on tone
-        if tone:
-            tone_keywords = self.voice_characteristics['tone'].get(tone.lower(), [])
-            for keyword in tone_keywords:
-                if keyword.lower() in voice_text:
-                    score += 3
-            # Bonus for exact tone matches in name
-            if tone.lower() in voice.get('name', '').lower():
-                score += 5
-        
-        # Score based on gender - higher priority for logic
-        if gender:
-            gender_keywords = self.voice_characteristics['gender'].get(gender.lower(), [])
-            gender_matches = 0
-            gender_score = 0
-            
-            # Check for gender keywords in description
-            for keyword in gender_keywords:
-                if keyword.lower() in voice_text:
-                    gender_score += 5  # Increased from 3 to 5
-                    gender_matches += 1
-            
-            # Bonus for exact gender matches in name
-            if gender.lower() in voice.get('name', '').lower():
-                gender_score += 10  # Increased from 5 to 10
-                gender_matches += 1
-            
-            # Additional scoring for common male/female indicators
-            if gender.lower() == 'male':
-                # Look for common male voice indicators
-                male_indicators = ['adam', 'alex', 'andrew', 'anthony', 'brian', 'chris', 'daniel', 'david', 'eric', 'james', 'john', 'kevin', 'michael', 'paul', 'robert', 'steven', 'thomas', 'william', 'carlos', 'jose', 'antonio', 'francisco', 'manuel', 'david', 'juan', 'rafael', 'pedro', 'alejandro', 'miguel', 'jorge', 'fernando', 'sergio', 'alberto', 'pablo', 'mario', 'luis', 'diego', 'andres', 'javier', 'ricardo', 'roberto', 'eduardo', 'oscar', 'arturo', 'ramon', 'enrique', 'guillermo', 'salvador', 'victor', 'hugo', 'ignacio', 'adrian', 'sebastian', 'gabriel', 'emilio', 'raul', 'cesar', 'ruben', 'daniel', 'joaquin', 'alvaro', 'gonzalo', 'felix', 'marcos', 'nacho', 'israel', 'jordi', 'xavier', 'xavi']
-                for indicator in male_indicators:
-                    if indicator in voice.get('name', '').lower():
-                        gender_score += 8  # Increased from 2 to 8
-                        gender_matches += 1
-                        break
-            elif gender.lower() == 'female':
-                # Look for common female voice indicators
-                female_indicators = ['sarah', 'emma', 'olivia', 'ava', 'isabella', 'sophia', 'charlotte', 'mia', 'amelia', 'harper', 'evelyn', 'abigail', 'emily', 'elizabeth', 'sofia', 'avery', 'ella', 'madison', 'scarlett', 'victoria', 'alice', 'maria', 'carmen', 'ana', 'lucia', 'elena', 'patricia', 'monica', 'isabel', 'cristina', 'laura', 'andrea', 'natalia', 'paula', 'sandra', 'raquel', 'beatriz', 'dolores', 'pilar', 'teresa', 'mercedes']
-                for indicator in female_indicators:
-                    if indicator in voice.get('name', '').lower():
-                        gender_score += 8  # Increased from 2 to 8
-                        gender_matches += 1
-                        break
-            
-            # Penalty for wrong gender indicators
-            if gender.lower() == 'male':
-                # Penalize female indicators
-                female_penalty_words = ['woman', 'female', 'lady', 'girl', 'soprano', 'alto', 'sweet', 'gentle']
-                for word in female_penalty_words:
-                    if word in voice_text:
-                        gender_score -= 5
-            elif gender.lower() == 'female':
-                # Penalize male indicators
-                male_penalty_words = ['man', 'male', 'guy', 'baritone', 'bass', 'husky', 'gruff']
-                for word in male_penalty_words:
-                    if word in voice_text:
-                        gender_score -= 5
-            
-            score += gender_score
-        
-        # Score based on language
-        if language:
-            lang_code = self.language_codes.get(language.lower())
-            language_score = 0
-            
-            # Check for language code in voice labels
-            if lang_code and lang_code in voice_text:
-                language_score += 5  
-            
-            # Check for language name in voice text
-            if language.lower() in voice_text:
-                language_score += 8  
-            
-            # Check for language-specific keywords
-            if language.lower() == 'spanish':
-                spanish_keywords = ['español', 'espanol', 'castellano', 'hispano', 'latino', 'mexicano', 'argentino', 'colombiano', 'española', 'espanola']
-                for keyword in spanish_keywords:
-                    if keyword in voice_text:
-                        language_score += 6
-                        break
-            elif language.lower() == 'french':
-                french_keywords = ['français', 'francais', 'francophone', 'française', 'francaise']
-                for keyword in french_keywords:
-                    if keyword in voice_text:
-                        language_score += 6
-                        break
-            elif language.lower() == 'german':
-                german_keywords = ['deutsch', 'deutsche', 'german', 'germanic']
-                for keyword in german_keywords:
-                    if keyword in voice_text:
-                        language_score += 6
-                        break
-            
-            score += language_score
-        
-        # Bonus for high-quality voices
-        category = voice.get('category', '').lower()
-        if category in ['premade', 'cloned', 'professional']:
-            score += 2
-        
-        # Bonus for voices with good descriptions
-        if len(voice.get('description', '')) > 20:
-            score += 1
-            
-        return score
+        index, rows = self.get_voice_index([voice])
+        return index.scores(rows, tone, gender, language)[0]
     
     def select_best_voice(self, voices, tone=None, gender=None, language=None):
         """Intelligently select the best voice based on tone, gender, and language."""
         if not voices:
             return None
         
-        # Score all voices
-        scored_voices = []
-        for voice in voices:
-            score = self.score_voice(voice, tone, gender, language)
-            scored_voices.append((voice, score))
-        
-        # Sort by score (highest first)
-        scored_voices.sort(key=lambda x: x[1], reverse=True)
+        # Score all voices (highest first, ties keep catalog order)
+        index, rows = self.get_voice_index(voices)
+        scored_rows = index.rank_rows(rows, tone, gender, language)
         
         # Show top 3 candidates for debugging
         print(f"Evaluating {len(voices)} voices...")
         print("Top 3 voice candidates:")
-        for i, (voice, score) in enumerate(scored_voices[:3]):
+        for i, (row, score) in enumerate(scored_rows[:3]):
+            voice = index.voices[row]
             print(f"  {i+1}. {voice['name']} - Score: {score} - {voice.get('description', 'No description')[:50]}...")
         
         # Filter voices based on gender and language requirements
-        filtered_voices = []
-        for voice, score in scored_voices:
-            voice_text = f"{voice.get('name', '')} {voice.get('description', '')} {str(voice.get('labels', {}))}".lower()
-            
-            # Check gender match
-            gender_match = True
-            if gender:
-                if gender.lower() == 'male':
-                    male_indicators = ['adam', 'alex', 'andrew', 'anthony', 'brian', 'chris', 'daniel', 'david', 'eric', 'james', 'john', 'kevin', 'michael', 'paul', 'robert', 'steven', 'thomas', 'william', 'carlos', 'jose', 'antonio', 'francisco', 'manuel', 'juan', 'rafael', 'pedro', 'alejandro', 'miguel', 'jorge', 'fernando', 'sergio', 'alberto', 'pablo', 'mario', 'luis', 'diego', 'andres', 'javier', 'ricardo', 'roberto', 'eduardo', 'oscar', 'arturo', 'ramon', 'enrique', 'guillermo', 'salvador', 'victor', 'hugo', 'ignacio', 'adrian', 'sebastian', 'gabriel', 'emilio', 'raul', 'cesar', 'ruben', 'daniel', 'joaquin', 'alvaro', 'gonzalo', 'felix', 'marcos', 'nacho', 'israel', 'jordi', 'xavier', 'xavi', 'masculine', 'male', 'man', 'guy', 'baritone', 'bass', 'husky', 'gruff']
-                    gender_match = any(indicator in voice_text for indicator in male_indicators)
-                elif gender.lower() == 'female':
-                    female_indicators = ['sarah', 'emma', 'olivia', 'ava', 'isabella', 'sophia', 'charlotte', 'mia', 'amelia', 'harper', 'evelyn', 'abigail', 'emily', 'elizabeth', 'sofia', 'avery', 'ella', 'madison', 'scarlett', 'victoria', 'alice', 'maria', 'carmen', 'ana', 'lucia', 'elena', 'patricia', 'monica', 'isabel', 'cristina', 'laura', 'andrea', 'natalia', 'paula', 'sandra', 'raquel', 'beatriz', 'dolores', 'pilar', 'teresa', 'mercedes', 'feminine', 'female', 'woman', 'lady', 'girl', 'soprano', 'alto', 'sweet', 'gentle']
-                    gender_match = any(indicator in voice_text for indicator in female_indicators)
-                else:  # neutral
-                    gender_match = True
-            
-            # Check language match
-            language_match = True
-            if language:
-                lang_code = self.language_codes.get(language.lower())
-                language_indicators = [language.lower()]
-                if lang_code:
-                    language_indicators.append(lang_code)
-                
-                # Add language-specific keywords
-                if language.lower() == 'spanish':
-                    language_indicators.extend(['español', 'espanol', 'castellano', 'hispano', 'latino', 'mexicano', 'argentino', 'colombiano'])
-                elif language.lower() == 'french':
-                    language_indicators.extend(['français', 'francais', 'francophone'])
-                elif language.lower() == 'german':
-                    language_indicators.extend(['deutsch', 'deutsche', 'german'])
-                
-                language_match = any(indicator in voice_text for indicator in language_indicators)
-            
-            if gender_match and language_match:
-                filtered_voices.append((voice, score))
-        
-        # Use filtered voices if available, otherwise use all voices
-        if filtered_voices:
-            scored_voices = filtered_voices
-            filter_msg = []
-            if gender:
-                filter_msg.append(f"'{gender}' gender")
-            if language:
-                filter_msg.append(f"'{language}' language")
-            print(f"🎯 Filtered to {len(filtered_voices)} voices that match {', '.join(filter_msg)}")
+        candidate_mask = index.candidate_mask(gender, language)
+        if candidate_mask is not None:
+            filtered_rows = [(row, score) for row, score in scored_rows if candidate_mask[row]]
+            
+            # Use filtered voices if available, otherwise use all voices
+            if filtered_rows:
+                scored_rows = filtered_rows
+                filter_msg = []
+                if gender:
+                    filter_msg.append(f"'{gender}' gender")
+                if language:
+                    filter_msg.append(f"'{language}' language")
+                print(f"🎯 Filtered to {len(filtered_rows)} voices that match {', '.join(filter_msg)}")
         
         # Return the best voice
-        best_voice = scored_voices[0][0]
-        best_score = scored_voices[0][1]
+        best_voice = index.voices[scored_rows[0][0]]
+        best_score = scored_rows[0][1]
         
         print(f"\n🎯 Selected voice: {best_voice['name']} (ID: {best_voice['voice_id']})")
         print(f"📊 Match score: {best_score}")
@@ -433,60 +415,36 @@ class ElevenLabsSpeechGenerator:
         
         return best_voice['voice_id']
 
-    def generate_speech(self, text, voice_id=None, output_file="output.mp3", stability=0.5, similarity_boost=0.5, 
-                       tone=None, gender=None, background_music=None, language=None):
-        """
-        Generate speech from text with enhanced voice characteristics.
+    def select_voice(self, tone=None, gender=None, language=None):
+        """Auto-select the best voice ID for the requested tone, gender and language."""
+        print("🔍 No voice ID provided. Auto-selecting best voice based on your criteria...")
+        voices = self.get_voices()
+        if not voices:
+            raise ValueError("No voices available. Please check your API key and connection.")
         
-        Args:
-            text (str): Text to convert to speech
-            voice_id (str, optional): ID of the voice to use. If None, will auto-select based on tone, gender, and language
-            output_file (str): Output filename
-            stability (float): Voice stability (0.0 to 1.0)
-            similarity_boost (float): Voice similarity boost (0.0 to 1.0)
-            tone (str): Voice tone (friendly, professional, casual, dramatic, calm)
-            gender (str): Voice gender (male, female, neutral)
-            background_music (str): Background music style (none, ambient, upbeat, classical, electronic, acoustic)
-            language (str): Language for the speech
-        """
-        # Generate output filename in outputs folder if using default
-        if output_file == "output.mp3":
-            output_file = self.generate_output_filename(
-                tone=tone,
-                gender=gender,
-                language=language,
-                background_music=background_music
-            )
+        # Analyze tone if provided (support natural language descriptions)
+        analyzed_tone = None
+        if tone:
+            analyzed_tone = self.analyze_tone_sentiment(tone)
+            if not analyzed_tone:
+                print("⚠️  Using default tone settings.")
         
-        # Auto-select voice if not provided
-        if voice_id is None:
-            print("🔍 No voice ID provided. Auto-selecting best voice based on your criteria...")
-            voices = self.get_voices()
-            if not voices:
-                raise ValueError("No voices available. Please check your API key and connection.")
-            
-            # Analyze tone if provided (support natural language descriptions)
-            analyzed_tone = None
-            if tone:
-                analyzed_tone = self.analyze_tone_sentiment(tone)
-                if not analyzed_tone:
-                    print("⚠️  Using default tone settings.")
-            
-            # Filter voices based on criteria
-            filtered_voices = self.filter_voices(voices, analyzed_tone, gender, language)
-            
-            if not filtered_voices:
-                print("⚠️  No voices match your criteria. Using any available voice...")
-                filtered_voices = voices
-            
-            # Select the best voice
-            voice_id = self.select_best_voice(filtered_voices, analyzed_tone, gender, language)
-            
-            if not voice_id:
-                raise ValueError("Could not select a voice. Please try with --list-voices to see available options.")
+        # Filter voices based on criteria
+        filtered_voices = self.filter_voices(voices, analyzed_tone, gender, language)
         
-        url = f"{self.base_url}/text-to-speech/{voice_id}"
+        if not filtered_voices:
+            print("⚠️  No voices match your criteria. Using any available voice...")
+            filtered_voices = voices
         
+        # Select the best voice
+        voice_id = self.select_best_voice(filtered_voices, analyzed_tone, gender, language)
+        
+        if not voice_id:
+            raise ValueError("Could not select a voice. Please try with --list-voices to see available options.")
+        return voice_id
+
+    def build_tts_request(self, text, stability=0.5, similarity_boost=0.5, tone=None, language=None):
+        """Build the text-to-speech request body, with voice settings adjusted for the tone."""
         # Adjust voice settings based on tone
         adjusted_stability = stability
         adjusted_similarity = similarity_boost
@@ -520,49 +478,180 @@ class ElevenLabsSpeechGenerator:
         elif language and language.lower() not in self.language_codes:
             print(f"⚠️  Warning: Language '{language}' not recognized. Using English model.")
         
+        return data
+
+    def synthesize(self, voice_id, data, output_format=DEFAULT_TTS_FORMAT):
+        """
+        Return raw TTS audio for a prepared request body (see build_tts_request).
+        
+        Identical requests are answered from the TTS cache without calling the API.
+        """
+        cache_key = None
+        if self.tts_cache:
+            cache_key = self._tts_cache_key(voice_id, data, output_format)
+            audio = self.tts_cache.get(cache_key)
+            if audio is not None:
+                print(f"♻️  Using cached speech audio ({len(audio)} bytes, no API call)")
+                return audio
+        
+        response, slot = self._post_tts(f"{self.base_url}/text-to-speech/{voice_id}", data, output_format)
+        slot.release()
+        response.raise_for_status()
+        
+        if self.tts_cache:
+            self.tts_cache.put(cache_key, response.content)
+        return response.content
+
+    def _post_tts(self, url, data, output_format, stream=False):
+        """
+        Send a TTS request once the scheduler grants it a slot.
+        
+        A 429 isn't retried by the session: the scheduler pauses every waiting request for
+        the Retry-After period and this one is retried at the front of the queue.
+        
+        Returns:
+            tuple: (response, slot); release the slot once the response body has been read
+        """
+        ticket = None
+        attempt = 0
+        while True:
+            slot = self.tts_scheduler.acquire(len(data["text"]), ticket=ticket)
+            ticket = slot.ticket
+            try:
+                response = self.http.post(
+                    url,
+                    headers=self.headers,
+                    params={"output_format": output_format},
+                    json=data,
+                    stream=stream,
+                    retry_statuses=TTS_RETRY_STATUS_CODES
+                )
+            except Exception:
+                slot.release()
+                raise
+            self.tts_scheduler.observe(response, slot)
+            if response.status_code != 429 or attempt >= self.http.max_retries:
+                return response, slot
+            print(f"⚠️  TTS request throttled (429), waiting for the scheduler to resume...")
+            response.close()
+            slot.release()
+            attempt += 1
+
+    @staticmethod
+    def _tts_cache_key(voice_id, data, output_format):
+        return TTSCache.make_key(
+            data["text"], voice_id, data.get("model_id"), data.get("voice_settings"),
+            language=data.get("language"), output_format=output_format,
+            context={key: data[key] for key in ("previous_text", "next_text") if key in data}
+        )
+
+    def synthesize_chunked(self, voice_id, data, language=None, max_concurrency=DEFAULT_CHUNK_CONCURRENCY,
+                           output_format=DEFAULT_STREAM_FORMAT, crossfade_ms=DEFAULT_CROSSFADE_MS,
+                           encode_format='mp3'):
+        """
+        Synthesize a long script as sentence chunks in parallel and join them.
+        
+        The text of the prepared request is split at sentence/clause boundaries
+        (language-aware, see text_chunker), every chunk is sent with its neighbours
+        as previous_text/next_text so prosody stays continuous, and up to
+        ``max_concurrency`` chunks are synthesized at once. The raw PCM results are
+        joined with short crossfades and encoded.
+        
+        Returns:
+            bytes: Encoded audio (MP3 by default)
+        """
+        from mixing import encode_audio
+        
+        samples, sample_rate = self.synthesize_chunked_samples(
+            voice_id, data, language=language, max_concurrency=max_concurrency,
+            output_format=output_format, crossfade_ms=crossfade_ms
+        )
+        return encode_audio(samples, sample_rate, format=encode_format)
+
+    def synthesize_chunked_samples(self, voice_id, data, language=None, max_concurrency=DEFAULT_CHUNK_CONCURRENCY,
+                                   output_format=DEFAULT_STREAM_FORMAT, crossfade_ms=DEFAULT_CROSSFADE_MS):
+        """
+        Chunked synthesis (see synthesize_chunked) that stops before encoding.
+        
+        Returns:
+            tuple: (mono float32 samples, sample rate)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from text_chunker import chunk_text
+        from mixing import pcm16_to_float32, crossfade_join
+        
+        if not output_format.startswith("pcm_"):
+            raise ValueError(f"Chunked synthesis joins raw PCM; unsupported output format: {output_format}")
+        sample_rate = int(output_format.split("_", 1)[1])
+        
+        lang_code = self.language_codes.get((language or '').lower(), language)
+        chunks = chunk_text(data["text"], lang_code)
+        print(f"✂️  Split script into {len(chunks)} chunks (up to {max_concurrency} in parallel)")
+        
+        requests_data = []
+        for i, chunk in enumerate(chunks):
+            chunk_data = dict(data, text=chunk)
+            if i > 0:
+                chunk_data["previous_text"] = chunks[i - 1]
+            if i + 1 < len(chunks):
+                chunk_data["next_text"] = chunks[i + 1]
+            requests_data.append(chunk_data)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(chunks)))) as executor:
+            pcm_chunks = list(executor.map(lambda chunk_data: self.synthesize(voice_id, chunk_data, output_format), requests_data))
+        
+        joined = crossfade_join([pcm16_to_float32(pcm) for pcm in pcm_chunks], sample_rate, crossfade_ms=crossfade_ms)
+        return joined, sample_rate
+
+    def generate_speech(self, text, voice_id=None, output_file="output.mp3", stability=0.5, similarity_boost=0.5, 
+                       tone=None, gender=None, background_music=None, language=None, chunked=False,
+                       max_concurrency=DEFAULT_CHUNK_CONCURRENCY, progress_callback=None, target_duration=None,
+                       max_stretch=DEFAULT_MAX_STRETCH):
+        """
+        Generate speech from text with enhanced voice characteristics and save it.
+        
+        The render itself happens in memory (see generate_speech_audio); only the
+        finished file is written.
+        
+        Args:
+            text (str): Text to convert to speech
+            voice_id (str, optional): ID of the voice to use. If None, will auto-select based on tone, gender, and language
+            output_file (str): Output filename
+            stability (float): Voice stability (0.0 to 1.0)
+            similarity_boost (float): Voice similarity boost (0.0 to 1.0)
+            tone (str): Voice tone (friendly, professional, casual, dramatic, calm)
+            gender (str): Voice gender (male, female, neutral)
+            background_music (str): Background music style (none, ambient, upbeat, classical, electronic, acoustic)
+            language (str): Language for the speech
+            chunked (bool): Split the script into sentence chunks and synthesize them in parallel
+            max_concurrency (int): Maximum chunks synthesized at once in chunked mode
+            progress_callback (callable, optional): Called as progress_callback(stage, **info) when the
+                render enters each stage (voice_selection, synthesis, time_stretch, mixing, encoding)
+            target_duration (float, optional): Stretch the speech to exactly this many seconds
+                (e.g. a 15/30/60 s slot) instead of re-synthesizing it; see time_stretch.fit_to_duration
+            max_stretch (float): Largest allowed tempo change for target_duration (0.15 = ±15%)
+        
+        Returns:
+            str: Path of the written file (its extension follows the actual audio format),
+            or None if the API request failed
+        """
+        # Generate output filename in outputs folder if using default
+        if output_file == "output.mp3":
+            output_file = self.generate_output_filename(
+                tone=tone,
+                gender=gender,
+                language=language,
+                background_music=background_music
+            )
+        
         try:
-            print(f"Generating speech for text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
-            print(f"Using voice ID: {voice_id}")
-            if tone:
-                print(f"Tone: {tone.title()}")
-            if gender:
-                print(f"Gender: {gender.title()}")
-            if language:
-                print(f"Language: {language.title()}")
-            if background_music:
-                print(f"Background music: {background_music.title()}")
-            print("Processing...")
-            
-            response = requests.post(url, headers=self.headers, json=data)
-            response.raise_for_status()
-            
-            # Save the audio file
-            temp_output = "temp_speech.mp3" if background_music and background_music != 'none' else output_file
-            with open(temp_output, 'wb') as f:
-                f.write(response.content)
-            
-            print(f"✅ Speech generated successfully!")
-            print(f"📁 Temporary output file: {temp_output}")
-            print(f"📊 File size: {len(response.content)} bytes")
-            
-            # Add background music if requested
-            if background_music and background_music != 'none':
-                print(f"\n🎵 Adding background music ({background_music})...")
-                if self.add_background_music(temp_output, background_music, output_file):
-                    # Clean up temp file
-                    try:
-                        os.remove(temp_output)
-                        print(f"🎵 Final output with background music: {output_file}")
-                    except:
-                        pass
-                else:
-                    # If background music failed, just rename temp file to output
-                    try:
-                        os.rename(temp_output, output_file)
-                        print(f"📁 Speech saved as: {output_file}")
-                    except:
-                        pass
-            
+            audio = self.generate_speech_audio(
+                text, voice_id=voice_id, stability=stability, similarity_boost=similarity_boost,
+                tone=tone, gender=gender, background_music=background_music, language=language,
+                chunked=chunked, max_concurrency=max_concurrency,
+                format=Path(output_file).suffix.lstrip('.') or 'mp3',
+                progress_callback=progress_callback, target_duration=target_duration, max_stretch=max_stretch
+            )
         except requests.exceptions.RequestException as e:
             print(f"Error generating speech: {e}")
             if hasattr(e, 'response') and e.response is not None:
@@ -571,6 +660,473 @@ class ElevenLabsSpeechGenerator:
                     print(f"Error details: {error_detail}")
                 except:
                     print(f"Response text: {e.response.text}")
+            return None
+        
+        output_file = audio.save(output_file)
+        print(f"📁 Speech saved as: {output_file}")
+        print(f"📊 File size: {len(audio.data)} bytes")
+        return output_file
+
+    def generate_speech_audio(self, text, voice_id=None, stability=0.5, similarity_boost=0.5, tone=None,
+                              gender=None, background_music=None, language=None, chunked=False,
+                              max_concurrency=DEFAULT_CHUNK_CONCURRENCY, format='mp3', progress_callback=None,
+                              target_duration=None, max_stretch=DEFAULT_MAX_STRETCH):
+        """
+        Render speech (and optional background music) entirely in memory.
+        
+        TTS bytes are re-encoded only when they need mixing or a different format.
+        They are then decoded, mixed against the cached music bed and encoded block
+        by block (see mixing.mix_stream); nothing is written to the working directory,
+        so concurrent renders cannot clobber each other.
+        
+        Args:
+            format (str): Container to encode to when the audio is re-encoded ('mp3', 'wav', 'flac', ...)
+            (other arguments as in generate_speech)
+        
+        Returns:
+            RenderedAudio: Encoded bytes plus their format, sample rate and duration
+        
+        Raises:
+            requests.exceptions.RequestException: If the TTS request failed
+        """
+        progress = progress_callback or _no_progress
+        encoded, samples, sample_rate = self._synthesize_for_render(
+            text, voice_id, stability, similarity_boost, tone, gender, background_music, language,
+            chunked, max_concurrency, progress, target_duration=target_duration, max_stretch=max_stretch
+        )
+        return self.render_synthesized(encoded, samples, sample_rate, background_music=background_music,
+                                       format=format, progress_callback=progress)
+
+    def render_synthesized(self, encoded, samples, sample_rate, background_music=None, format='mp3',
+                           progress_callback=None):
+        """
+        Mix and encode speech that has already been synthesized (the CPU-bound half of a render).
+        
+        Args:
+            encoded (bytes, optional): TTS audio as returned by the API
+            samples (np.ndarray, optional): Float32 speech samples instead of ``encoded``
+            sample_rate (int, optional): Sample rate of ``samples``
+            (other arguments as in generate_speech_audio)
+        
+        Returns:
+            RenderedAudio
+        """
+        from io import BytesIO
+        from mixing import RenderedAudio, mix_stream
+        from audio_analysis import AudioAnalyzer
+        
+        progress = progress_callback or _no_progress
+        music = None
+        if background_music and background_music != 'none':
+            print(f"\n🎵 Adding background music ({background_music})...")
+            progress('mixing', background_music=background_music)
+            # Looked up once the speech sample rate is known; served by the music bed cache
+            music = lambda sample_rate: self._load_music_samples(background_music, sample_rate)
+        elif samples is None:
+            tts_container, tts_sample_rate = DEFAULT_TTS_FORMAT.split("_")[:2]
+            if format.lower() == tts_container:
+                # Nothing to re-encode: hand back the TTS bytes as they came
+                return RenderedAudio(encoded, tts_container, sample_rate=int(tts_sample_rate))
+        
+        # Decoding, mixing and encoding run interleaved, one block at a time
+        progress('encoding')
+        output = BytesIO()
+        analyzer = AudioAnalyzer()
+        try:
+            encoded_format, sample_rate, frames = mix_stream(
+                samples if samples is not None else encoded, output, format=format,
+                music=music, sample_rate=sample_rate, analyzer=analyzer
+            )
+        except Exception as e:
+            if music is None or encoded is None:
+                raise
+            print(f"⚠️  In-memory mixing failed ({e}), trying external mixers")
+            mixed_audio = self._mix_in_scratch_dir(encoded, background_music)
+            if mixed_audio is None:
+                raise
+            return mixed_audio
+        
+        return RenderedAudio(output.getvalue(), encoded_format, sample_rate=sample_rate, duration=frames / sample_rate,
+                             analysis=analyzer.result())
+
+    def _synthesize_for_render(self, text, voice_id, stability, similarity_boost, tone, gender, background_music,
+                               language, chunked, max_concurrency, progress, target_duration=None,
+                               max_stretch=DEFAULT_MAX_STRETCH):
+        """
+        Voice selection and synthesis shared by the render entry points.
+        
+        With a target_duration the speech is decoded and time-stretched to it; the music
+        bed then follows, since the mixer loops or trims it to the speech length.
+        
+        Returns:
+            tuple: (encoded TTS bytes or None, float32 samples or None, sample rate or None);
+            chunked synthesis and time stretching yield samples, a single request yields encoded bytes
+        """
+        # Auto-select voice if not provided
+        if voice_id is None:
+            progress('voice_selection')
+            voice_id = self.select_voice(tone=tone, gender=gender, language=language)
+        
+        data = self.build_tts_request(text, stability, similarity_boost, tone=tone, language=language)
+        
+        progress('synthesis', voice_id=voice_id, chunked=chunked)
+        print(f"Generating speech for text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+        print(f"Using voice ID: {voice_id}")
+        if tone:
+            print(f"Tone: {tone.title()}")
+        if gender:
+            print(f"Gender: {gender.title()}")
+        if language:
+            print(f"Language: {language.title()}")
+        if background_music:
+            print(f"Background music: {background_music.title()}")
+        print("Processing...")
+        
+        samples = sample_rate = encoded = None
+        if chunked:
+            samples, sample_rate = self.synthesize_chunked_samples(
+                voice_id, data, language=language, max_concurrency=max_concurrency
+            )
+        else:
+            encoded = self.synthesize(voice_id, data)
+        print(f"✅ Speech generated successfully!")
+        
+        if target_duration:
+            samples, sample_rate = self.fit_speech_to_duration(
+                encoded if samples is None else samples, sample_rate, target_duration, max_stretch, progress
+            )
+            encoded = None
+        return encoded, samples, sample_rate
+
+    def fit_speech_to_duration(self, speech, sample_rate, target_duration, max_stretch=DEFAULT_MAX_STRETCH,
+                               progress=_no_progress):
+        """
+        Time-stretch speech to a slot length without re-synthesizing it.
+        
+        Args:
+            speech: Encoded audio bytes, or float32 samples at ``sample_rate``
+            target_duration (float): Slot length in seconds
+            max_stretch (float): Largest allowed tempo change (0.15 = ±15%)
+        
+        Returns:
+            tuple: (float32 samples, sample rate)
+        """
+        from mixing import decode_audio
+        from time_stretch import fit_to_duration
+        
+        if isinstance(speech, (bytes, bytearray)):
+            speech, sample_rate = decode_audio(speech)
+        fitted, info = fit_to_duration(speech, sample_rate, target_duration, max_stretch=max_stretch)
+        progress('time_stretch', **info)
+        if info['fits']:
+            print(f"⏱️  Stretched speech {info['original_seconds']:.2f}s → {info['result_seconds']:.2f}s (rate {info['rate']})")
+        else:
+            print(f"⚠️  Speech is {info['original_seconds']:.2f}s and can't fit {info['target_seconds']:.2f}s "
+                  f"within ±{max_stretch:.0%}; ended at {info['result_seconds']:.2f}s")
+        return fitted, sample_rate
+
+    def generate_speech_renditions(self, text, renditions, output_file="output.mp3", voice_id=None, stability=0.5,
+                                   similarity_boost=0.5, tone=None, gender=None, background_music=None,
+                                   language=None, chunked=False, max_concurrency=DEFAULT_CHUNK_CONCURRENCY,
+                                   progress_callback=None, target_duration=None, max_stretch=DEFAULT_MAX_STRETCH):
+        """
+        Render once and write the result in several delivery formats.
+        
+        Speech is synthesized, decoded and mixed with the music bed a single time;
+        the mixed buffer is then fanned out to one encoder thread per rendition.
+        
+        Args:
+            renditions (list): Rendition objects, codec names or dicts
+                ({"codec": "mp3", "bitrate": 64, "sample_rate": 22050, "channels": 1})
+            output_file (str): Base path; each file gets a rendition suffix (e.g. _mp3_64k.mp3)
+            (other arguments as in generate_speech)
+        
+        Returns:
+            list of (str, Rendition): Written path and rendition, in request order,
+            or None if the API request failed
+        """
+        from mixing import Rendition, mix_buffer
+        
+        renditions = [Rendition.from_spec(spec) for spec in renditions]
+        progress = progress_callback or _no_progress
+        
+        if output_file == "output.mp3":
+            output_file = self.generate_output_filename(
+                tone=tone,
+                gender=gender,
+                language=language,
+                background_music=background_music
+            )
+        
+        try:
+            encoded, samples, sample_rate = self._synthesize_for_render(
+                text, voice_id, stability, similarity_boost, tone, gender, background_music, language,
+                chunked, max_concurrency, progress, target_duration=target_duration, max_stretch=max_stretch
+            )
+        except requests.exceptions.RequestException as e:
+            print(f"Error generating speech: {e}")
+            return None
+        
+        music = None
+        if background_music and background_music != 'none':
+            print(f"\n🎵 Adding background music ({background_music})...")
+            progress('mixing', background_music=background_music)
+            music = lambda sample_rate: self._load_music_samples(background_music, sample_rate)
+        
+        mixed, sample_rate = mix_buffer(samples if samples is not None else encoded, music=music, sample_rate=sample_rate)
+        
+        progress('encoding', renditions=len(renditions))
+        return self._encode_renditions(mixed, sample_rate, renditions, output_file)
+
+    def _encode_renditions(self, mixed, sample_rate, renditions, output_file):
+        """
+        Encode one mixed buffer to every rendition in parallel; returns [(path, rendition)].
+        
+        Renditions at the mix rate share the analysis of the mix as their sidecar; resampled
+        ones are analyzed while they are encoded, so frames and peaks match the file. The
+        returned renditions carry the effective MP3 bitrate (clamped to what the output rate
+        allows).
+        """
+        from mixing import encode_renditions, output_path_for
+        from audio_analysis import AudioAnalyzer, analyze, write_sidecar
+        
+        renditions = [rendition.for_sample_rate(sample_rate) for rendition in renditions]
+        root = os.path.splitext(str(output_file))[0]
+        # Renditions with identical labels would overwrite each other
+        labels = {}
+        paths = []
+        for rendition in renditions:
+            label = rendition.label
+            labels[label] = labels.get(label, 0) + 1
+            if labels[label] > 1:
+                label = f"{label}_{labels[label]}"
+            paths.append(f"{root}_{label}.{rendition.codec}")
+        
+        analyzers = [AudioAnalyzer() if rendition.sample_rate and rendition.sample_rate != sample_rate else None
+                     for rendition in renditions]
+        formats = encode_renditions(mixed, sample_rate, renditions, paths, analyzers=analyzers)
+        written = [(output_path_for(path, format), rendition) for path, format, rendition in zip(paths, formats, renditions)]
+        mix_analysis = analyze(mixed, sample_rate) if None in analyzers else None
+        for (path, _), analyzer in zip(written, analyzers):
+            write_sidecar(path, analyzer.result() if analyzer is not None else mix_analysis)
+            print(f"📁 Rendition saved as: {path}")
+        return written
+
+    def generate_batch(self, scripts, combinations=None, tones=None, genders=None, languages=None,
+                       background_music=None, max_concurrency=None, chunked=False, renditions=None):
+        """
+        Render every script in every tone/gender/language/music combination.
+        
+        The batch is planned first (one catalog fetch, one voice selection per distinct
+        tone/gender/language, one synthesis per script and voice, one decode per music
+        bed), then synthesis groups run concurrently. See batch.py.
+        
+        Args:
+            scripts (list of str): Scripts to render
+            combinations (list of dict, optional): Explicit {tone, gender, language, background_music} combinations
+            tones, genders, languages, background_music (list, optional): Values whose cartesian
+                product is used when ``combinations`` is not given
+            max_concurrency (int, optional): Synthesis groups running at once
+            chunked (bool): Use chunked synthesis for every item
+            renditions (list, optional): Delivery formats for every item (see generate_speech_renditions)
+        
+        Returns:
+            tuple: (BatchPlan, iterator of per-item result dicts in completion order)
+        """
+        from batch import expand_combinations, plan_batch, run_batch, DEFAULT_BATCH_CONCURRENCY
+        from mixing import Rendition
+        
+        combinations = expand_combinations(combinations, tones, genders, languages, background_music)
+        renditions = [Rendition.from_spec(spec) for spec in renditions] if renditions else None
+        plan = plan_batch(self, scripts, combinations)
+        print(f"📦 Batch {plan.batch_id}: {len(plan.items)} items, {len(plan.groups)} syntheses, "
+              f"{len(plan.voices)} voice selections")
+        return plan, run_batch(self, plan, max_concurrency=max_concurrency or DEFAULT_BATCH_CONCURRENCY,
+                               chunked=chunked, renditions=renditions)
+
+    def mix_background_music(self, samples, sample_rate, background_music_style):
+        """
+        Mix mono float32 speech with a background music bed, in memory.
+        
+        The bed loops for as long as the speech lasts (speech at 90%, music at 10%).
+        
+        Returns:
+            np.ndarray: Mixed float32 samples, or None if the music bed is unavailable
+        """
+        from mixing import BlockMixer
+        
+        music = self._load_music_samples(background_music_style, sample_rate)
+        if music is None:
+            print(f"⚠️  No background music file available for style: {background_music_style}")
+            return None
+        
+        print(f"🎵 Speech duration: {len(samples) / sample_rate:.2f}s, Music duration: {len(music) / sample_rate:.2f}s")
+        return BlockMixer(music).mix(samples)
+
+    def _mix_in_scratch_dir(self, speech_audio, background_music_style):
+        """
+        Mix encoded speech with the file-based mixers (ffmpeg, scipy, ...) in a private scratch directory.
+        
+        Returns:
+            RenderedAudio: The mixed WAV, or None if no mixer succeeded
+        """
+        import tempfile
+        from mixing import RenderedAudio
+        
+        music_file = self.get_background_music_file(background_music_style)
+        if speech_audio is None or not music_file:
+            return None
+        
+        with tempfile.TemporaryDirectory(prefix="render-") as scratch:
+            speech_file = os.path.join(scratch, "speech.mp3")
+            mixed_file = os.path.join(scratch, "mixed.wav")
+            with open(speech_file, 'wb') as f:
+                f.write(speech_audio)
+            if not self._mix_audio_files(speech_file, music_file, mixed_file):
+                return None
+            with open(mixed_file, 'rb') as f:
+                return RenderedAudio(f.read(), 'wav')
+
+    def generate_speech_stream(self, text, voice_id=None, stability=0.5, similarity_boost=0.5, tone=None,
+                               gender=None, background_music=None, language=None, output_file=None,
+                               output_format=DEFAULT_STREAM_FORMAT, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+        """
+        Stream speech as a mixed WAV while it is being synthesized.
+        
+        Uses the ElevenLabs streaming endpoint with raw PCM output, mixes every block
+        against the background music as soon as it arrives and yields WAV bytes, so the
+        first audio is available after the first chunk instead of after the whole render.
+        
+        Voice selection and the TTS request happen before this returns, so errors
+        (no voices, rejected request) raise here rather than in the middle of a stream.
+        The request holds a scheduler slot until the stream is exhausted or closed, so
+        always close() a stream that may not be read to the end.
+        
+        Args:
+            text (str): Text to convert to speech
+            voice_id (str, optional): Voice to use; auto-selected from tone, gender and language if None
+            output_file (str, optional): Also save the streamed WAV to this path; removed again if
+                the stream is closed early or the TTS stream fails
+            output_format (str): ElevenLabs PCM format, e.g. "pcm_24000" or "pcm_44100"
+            chunk_size (int): Bytes read from the API per block
+            (other arguments as in generate_speech)
+        
+        Returns:
+            SpeechStream: WAV header followed by mixed 16-bit PCM blocks
+        """
+        from mixing import BlockMixer, pcm16_to_float32, float32_to_pcm16, wav_header, finalize_wav_file
+        
+        if not output_format.startswith("pcm_"):
+            raise ValueError(f"Streaming mixes raw PCM; unsupported output format: {output_format}")
+        sample_rate = int(output_format.split("_", 1)[1])
+        
+        if voice_id is None:
+            voice_id = self.select_voice(tone=tone, gender=gender, language=language)
+        data = self.build_tts_request(text, stability, similarity_boost, tone=tone, language=language)
+        
+        music = None
+        if background_music and background_music != 'none':
+            music = self._load_music_samples(background_music, sample_rate)
+        mixer = BlockMixer(music)
+        
+        print(f"Streaming speech for text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+        print(f"Using voice ID: {voice_id}")
+        
+        cache_key = None
+        cached_audio = None
+        if self.tts_cache:
+            cache_key = self._tts_cache_key(voice_id, data, output_format)
+            cached_audio = self.tts_cache.get(cache_key)
+        
+        if cached_audio is not None:
+            print(f"♻️  Using cached speech audio ({len(cached_audio)} bytes, no API call)")
+            response = slot = None
+            chunks = (cached_audio[i:i + chunk_size] for i in range(0, len(cached_audio), chunk_size))
+        else:
+            # The slot stays taken until the stream is fully read (or closed)
+            response, slot = self._post_tts(f"{self.base_url}/text-to-speech/{voice_id}/stream", data,
+                                            output_format, stream=True)
+            try:
+                response.raise_for_status()
+            except Exception:
+                response.close()
+                slot.release()
+                raise
+            chunks = response.iter_content(chunk_size=chunk_size)
+        
+        released = threading.Lock() if response is not None else None
+        
+        def release():
+            # Runs from the generator's finally and from SpeechStream.close(); only once
+            if released is not None and released.acquire(blocking=False):
+                response.close()
+                slot.release()
+        
+        def stream():
+            output = open(output_file, 'wb') if output_file else None
+            remainder = b""
+            total_bytes = 0
+            # Raw PCM as received, kept so a complete stream can be cached
+            received = [] if response is not None and self.tts_cache else None
+            try:
+                header = wav_header(sample_rate)
+                if output:
+                    output.write(header)
+                yield header
+                
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if received is not None:
+                        received.append(chunk)
+                    # Samples are 2 bytes; keep an odd trailing byte for the next chunk
+                    chunk = remainder + chunk
+                    usable = len(chunk) - (len(chunk) % 2)
+                    remainder = chunk[usable:]
+                    if not usable:
+                        continue
+                    
+                    block = float32_to_pcm16(mixer.mix(pcm16_to_float32(chunk[:usable])))
+                    total_bytes += len(block)
+                    if output:
+                        output.write(block)
+                    yield block
+                
+                if received is not None:
+                    self.tts_cache.put(cache_key, b"".join(received))
+                speech_stream.completed = True
+            finally:
+                release()
+                if output:
+                    output.close()
+                    if speech_stream.completed:
+                        finalize_wav_file(output_file)
+                        print(f"📁 Streamed speech saved as: {output_file}")
+                    else:
+                        # A truncated file would look like a complete render under the announced name
+                        try:
+                            os.remove(output_file)
+                        except OSError:
+                            pass
+                if speech_stream.completed:
+                    print(f"✅ Streamed {total_bytes / (2 * sample_rate):.2f}s of audio")
+                else:
+                    print(f"⚠️  Stream stopped after {total_bytes / (2 * sample_rate):.2f}s"
+                          f"{'; partial file discarded' if output else ''}")
+        
+        speech_stream = SpeechStream(stream(), release)
+        return speech_stream
+
+    def _load_music_samples(self, style, sample_rate):
+        """Decode a background music bed to mono float32 at the given sample rate (None if unavailable)."""
+        music_file = self.get_background_music_file(style)
+        if not music_file:
+            return None
+        try:
+            return self.music_cache.get(music_file, sample_rate)
+        except Exception as e:
+            print(f"⚠️  Could not load background music ({style}): {e}")
+            return None
 
     def generate_from_file(self, input_file, voice_id=None, output_file=None, **kwargs):
         """Generate speech from a text file with enhanced options."""
@@ -586,7 +1142,7 @@ class ElevenLabsSpeechGenerator:
                 input_path = Path(input_file)
                 output_file = f"{input_path.stem}_speech.mp3"
             
-            self.generate_speech(text, voice_id, output_file, **kwargs)
+            return self.generate_speech(text, voice_id, output_file, **kwargs)
             
         except FileNotFoundError:
             print(f"Input file '{input_file}' not found.")
@@ -681,9 +1237,10 @@ class ElevenLabsSpeechGenerator:
             # Convert to 16-bit PCM
             audio_data = (audio_data * 32767).astype(np.int16)
             
-            if AUDIO_MIXING_AVAILABLE:
+            pydub = optional_import('pydub', "Background music will be saved as WAV instead")
+            if pydub is not None:
                 # Use pydub if available
-                audio_segment = AudioSegment(
+                audio_segment = pydub.AudioSegment(
                     audio_data.tobytes(),
                     frame_rate=sample_rate,
                     sample_width=2,  # 16-bit
@@ -705,166 +1262,46 @@ class ElevenLabsSpeechGenerator:
             return False
 
     def _convert_mp3_to_wav(self, mp3_file, wav_file):
-        """Convert MP3 to WAV using scipy."""
+        """Convert MP3 to WAV with the selected codec backend (in-process unless ffmpeg was chosen)."""
         try:
-            from scipy.io import wavfile
-            import subprocess
-            import os
-            
-            # Try to use ffmpeg if available
-            try:
-                subprocess.run(['ffmpeg', '-i', mp3_file, '-y', wav_file], 
-                             check=True, capture_output=True)
-                return True
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                # Fallback: try to read MP3 directly with scipy (may not work for all MP3s)
-                try:
-                    from scipy.io import wavfile
-                    rate, data = wavfile.read(mp3_file)
-                    wavfile.write(wav_file, rate, data)
-                    return True
-                except:
-                    print("❌ Could not convert MP3 to WAV. Please install ffmpeg for better MP3 support.")
-                    return False
-                    
+            backend = self.codecs.select(self.codec_backend, files=(mp3_file, wav_file))
+            return backend.convert(mp3_file, wav_file)
         except Exception as e:
             print(f"❌ Error converting MP3 to WAV: {e}")
             return False
 
-    def _mix_audio_files(self, speech_file, music_file, output_file):
-        """Mix speech and background music using multiple methods."""
-        # Try FFmpeg first (most reliable)
-        if self._mix_with_ffmpeg(speech_file, music_file, output_file):
-            return True
-        
-        # Fallback to scipy
-        if self._mix_with_scipy(speech_file, music_file, output_file):
-            return True
-        
-        # Fallback to pure Python
-        return self._mix_with_pure_python(speech_file, music_file, output_file)
-
-    def _mix_with_ffmpeg(self, speech_file, music_file, output_file):
-        """Mix audio using FFmpeg (most reliable method)."""
+    def _mix_audio_files(self, speech_file, music_file, output_file, progress_callback=None):
+        """Mix speech and background music with the codec backend chosen from the registry."""
         try:
-            import subprocess
-            import os
-            
-            # Check if ffmpeg is available
-            try:
-                subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                return False
-            
-            # Mix with FFmpeg
-            cmd = [
-                'ffmpeg', '-i', speech_file, '-i', music_file,
-                '-filter_complex', '[0]volume=0.9[speech];[1]volume=0.1[music];[speech][music]amix=inputs=2:duration=first',
-                '-y', output_file
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"🎵 Mixed audio using FFmpeg")
-                return True
-            else:
-                print(f"⚠️  FFmpeg failed: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            print(f"⚠️  FFmpeg error: {e}")
+            backend = self.codecs.select(self.codec_backend, files=(speech_file, output_file), music_file=music_file)
+        except ValueError as e:
+            print(f"❌ {e}")
             return False
-
-    def _mix_with_scipy(self, speech_file, music_file, output_file):
-        """Mix audio using scipy (fallback method)."""
-        try:
-            from scipy.io import wavfile
-            import numpy as np
-            
-            # Read the speech file
-            speech_rate, speech_data = wavfile.read(speech_file)
-            
-            # Read the background music file
-            music_rate, music_data = wavfile.read(music_file)
-            
-            # Ensure both files have the same sample rate
-            if speech_rate != music_rate:
-                print(f"⚠️  Sample rate mismatch: speech={speech_rate}Hz, music={music_rate}Hz")
-                # Resample music to match speech rate
-                from scipy import signal
-                music_data = signal.resample(music_data, int(len(music_data) * speech_rate / music_rate))
-                music_rate = speech_rate
-            
-            # Ensure both files have the same length
-            min_length = min(len(speech_data), len(music_data))
-            speech_data = speech_data[:min_length]
-            music_data = music_data[:min_length]
-            
-            # Normalize the data to prevent clipping
-            speech_data = speech_data.astype(np.float32)
-            music_data = music_data.astype(np.float32)
-            
-            # Mix the audio (speech at 90% volume, background at 10%)
-            speech_volume = speech_data * 0.9
-            music_volume = music_data * 0.1
-            
-            # Combine the audio
-            mixed_data = speech_volume + music_volume
-            
-            # Normalize to prevent clipping
-            max_val = np.max(np.abs(mixed_data))
-            if max_val > 1.0:
-                mixed_data = mixed_data / max_val
-            
-            # Convert back to 16-bit PCM
-            mixed_data = (mixed_data * 32767).astype(np.int16)
-            
-            # Save the mixed audio
-            wavfile.write(output_file, speech_rate, mixed_data)
-            print(f"🎵 Mixed audio using scipy")
-            return True
-            
-        except Exception as e:
-            print(f"⚠️  Scipy mixing error: {e}")
-            return False
-
-    def _mix_with_pure_python(self, speech_file, music_file, output_file):
-        """Mix audio using pure Python (last resort)."""
+        
+        if progress_callback:
+            progress_callback('encoding')
         try:
-            import wave
-            import numpy as np
-            
-            # Read speech file
-            with wave.open(speech_file, 'rb') as w1:
-                speech_data = np.frombuffer(w1.readframes(w1.getnframes()), dtype=np.int16)
-                speech_params = w1.getparams()
-            
-            # Read music file
-            with wave.open(music_file, 'rb') as w2:
-                music_data = np.frombuffer(w2.readframes(w2.getnframes()), dtype=np.int16)
-            
-            # Ensure same length
-            min_length = min(len(speech_data), len(music_data))
-            speech_data = speech_data[:min_length]
-            music_data = music_data[:min_length]
-            
-            # Mix with volume control
-            mixed = (0.9 * speech_data + 0.1 * music_data).astype(np.int16)
-            
-            # Write output
-            with wave.open(output_file, 'wb') as out:
-                out.setparams(speech_params)
-                out.writeframes(mixed.tobytes())
-            
-            print(f"🎵 Mixed audio using pure Python")
-            return True
-            
+            # Backends that decode in-process take the bed from the music cache
+            return backend.mix(speech_file, music_file, output_file,
+                               load_music=lambda sample_rate: self.music_cache.get(music_file, sample_rate))
         except Exception as e:
-            print(f"❌ Pure Python mixing error: {e}")
+            print(f"❌ {backend.name} mixing error: {e}")
             return False
 
-    def add_background_music(self, speech_file, background_music_style, output_file):
-        """Add background music to the speech file using pre-loaded files."""
+    def add_background_music(self, speech_file, background_music_style, output_file, progress_callback=None,
+                             renditions=None):
+        """
+        Add background music to the speech file using pre-loaded files.
+        
+        With ``renditions`` (Rendition objects, codec names or dicts), the speech is
+        decoded and mixed once and the mix is encoded to every rendition in parallel;
+        the return value is then the list of (path, Rendition) written (empty on failure).
+        """
+        if renditions:
+            return self._add_background_music_renditions(
+                speech_file, background_music_style, output_file, renditions, progress_callback
+            )
+        
         if background_music_style == 'none':
             # Just copy the speech file to output
             import shutil
@@ -879,92 +1316,34 @@ class ElevenLabsSpeechGenerator:
             return False
         
         try:
-            # Mix the audio files directly using librosa (no conversion needed)
-            success = self._mix_audio_with_librosa(speech_file, music_file, output_file)
-            return success
+            return self._mix_audio_files(speech_file, music_file, output_file, progress_callback=progress_callback)
             
         except Exception as e:
             print(f"❌ Error adding background music: {e}")
             return False
 
-    def _mix_audio_with_librosa(self, speech_file, music_file, output_file):
-        """Mix audio using librosa and soundfile for high-quality processing."""
+    def _add_background_music_renditions(self, speech_file, background_music_style, output_file, renditions,
+                                         progress_callback=None):
+        from mixing import Rendition, mix_buffer
+        
         try:
-            import librosa
-            import soundfile as sf
-            import numpy as np
-            
-            # Load audio files directly (librosa handles MP3 natively)
-            speech_audio, speech_sr = librosa.load(speech_file, sr=None)
-            music_audio, music_sr = librosa.load(music_file, sr=None)
-            
-            # Calculate durations for debugging
-            speech_duration = len(speech_audio) / speech_sr
-            music_duration = len(music_audio) / music_sr
-            print(f"🎵 Speech duration: {speech_duration:.2f}s, Music duration: {music_duration:.2f}s")
-            
-            # Resample music to match speech sample rate
-            if music_sr != speech_sr:
-                music_audio = librosa.resample(music_audio, orig_sr=music_sr, target_sr=speech_sr)
-                music_sr = speech_sr
-            
-            # Ensure music matches speech duration exactly
-            speech_length = len(speech_audio)
-            
-            if len(music_audio) < speech_length:
-                # If music is shorter than speech, loop it to match speech length
-                loops_needed = int(np.ceil(speech_length / len(music_audio)))
-                music_audio = np.tile(music_audio, loops_needed)
-            
-            # Trim music to exact speech length
-            music_audio = music_audio[:speech_length]
-            
-            # Ensure both arrays have exactly the same length
-            assert len(speech_audio) == len(music_audio), f"Length mismatch: speech={len(speech_audio)}, music={len(music_audio)}"
-            
-            # Confirm final duration matching
-            final_duration = len(speech_audio) / speech_sr
-            print(f"🎵 Final mixed duration: {final_duration:.2f}s (perfectly matched)")
-            
-            # Mix the audio (speech at 90% volume, background at 10%)
-            speech_volume = speech_audio * 0.9
-            music_volume = music_audio * 0.1
-            
-            # Combine the audio
-            mixed_audio = speech_volume + music_volume
-            
-            # Normalize to prevent clipping
-            max_val = np.max(np.abs(mixed_audio))
-            if max_val > 1.0:
-                mixed_audio = mixed_audio / max_val
-            
-            # Save the mixed audio directly as MP3 using soundfile
-            try:
-                # Convert to 16-bit PCM for MP3 export
-                mixed_audio_16bit = (mixed_audio * 32767).astype(np.int16)
-                
-                # Save directly as MP3 using soundfile
-                sf.write(output_file, mixed_audio_16bit, speech_sr, format='MP3', subtype='MPEG_LAYER_III')
-                print(f"🎵 Mixed audio using librosa and soundfile (direct MP3)")
-                return True
-                
-            except Exception as e:
-                print(f"⚠️  Direct MP3 save failed: {e}")
-                # Fallback: save as WAV
-                wav_output = output_file.replace('.mp3', '.wav')
-                mixed_audio_16bit = (mixed_audio * 32767).astype(np.int16)
-                sf.write(wav_output, mixed_audio_16bit, speech_sr)
-                print(f"🎵 Saved mixed audio as WAV file (fallback)")
-                return True
-            
-        except ImportError:
-            print("⚠️  librosa or soundfile not available, falling back to scipy")
-            return self._mix_audio_files(speech_file, music_file, output_file)
+            renditions = [Rendition.from_spec(spec) for spec in renditions]
+            music = None
+            if background_music_style != 'none':
+                music_file = self.get_background_music_file(background_music_style)
+                if not music_file:
+                    print(f"⚠️  No background music file available for style: {background_music_style}")
+                    return []
+                music = lambda sample_rate: self.music_cache.get(music_file, sample_rate)
+            
+            mixed, sample_rate = mix_buffer(speech_file, music=music)
+            if progress_callback:
+                progress_callback('encoding', renditions=len(renditions))
+            return self._encode_renditions(mixed, sample_rate, renditions, output_file)
         except Exception as e:
-            print(f"⚠️  librosa mixing error: {e}")
-            return self._mix_audio_files(speech_file, music_file, output_file)
+            print(f"❌ Error adding background music: {e}")
+            return []
 
-    
     def get_available_options(self):
         """Display available options for tone, gender, background music, and language."""
         print("\n🎭 Available Tones:")
@@ -987,7 +1366,8 @@ class ElevenLabsSpeechGenerator:
         print(f"  ... and {len(self.language_codes) - 20} more languages")
 
     @staticmethod
-    def generate_output_filename(tone=None, gender=None, language=None, background_music=None, default_name="output.mp3"):
+    def generate_output_filename(tone=None, gender=None, language=None, background_music=None, default_name="output.mp3",
+                                 extension="mp3"):
         """Generate a meaningful output filename based on parameters."""
         # Create outputs directory if it doesn't exist
         outputs_dir = Path("outputs")
@@ -1004,14 +1384,15 @@ class ElevenLabsSpeechGenerator:
         if background_music and background_music != 'none':
             parts.append(f"bg_{background_music}")
         
-        # Add timestamp to ensure uniqueness
+        # Timestamp for readability, random suffix for uniqueness (renders in the same second)
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique = uuid.uuid4().hex[:8]
         
         # Build filename
         if parts:
-            filename = f"speech_{'_'.join(parts)}_{timestamp}.mp3"
+            filename = f"speech_{'_'.join(parts)}_{timestamp}_{unique}.{extension}"
         else:
-            filename = f"speech_{timestamp}.mp3"
+            filename = f"speech_{timestamp}_{unique}.{extension}"
         
         return str(outputs_dir / filename)
 
@@ -1024,6 +1405,7 @@ def main():
     parser.add_argument("--voice-id", help="Voice ID to use (optional - will auto-select if not provided)")
     parser.add_argument("--output", "-o", default=None, help="Output audio file (default: auto-generated in outputs directory)")
     parser.add_argument("--list-voices", action="store_true", help="List available voices")
+    parser.add_argument("--refresh-voices", action="store_true", help="Re-download the cached voice catalog before running")
     parser.add_argument("--stability", type=float, default=0.5, help="Voice stability (0.0-1.0, default: 0.5)")
     parser.add_argument("--similarity-boost", type=float, default=0.5, help="Voice similarity boost (0.0-1.0, default: 0.5)")
     
@@ -1035,9 +1417,21 @@ def main():
     parser.add_argument("--background-music", choices=['none', 'ambient', 'upbeat', 'classical', 'electronic', 'acoustic'], 
                        help="Background music style")
     parser.add_argument("--language", help="Language for speech (e.g., english, spanish, french, etc.)")
+    parser.add_argument("--chunked", action="store_true", help="Synthesize long scripts as parallel sentence chunks")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_CHUNK_CONCURRENCY,
+                       help=f"Maximum chunks synthesized at once with --chunked (default: {DEFAULT_CHUNK_CONCURRENCY})")
+    parser.add_argument("--target-duration", type=float, default=None,
+                       help="Time-stretch the speech to exactly this many seconds (e.g. 15, 30, 60)")
+    parser.add_argument("--max-stretch", type=float, default=DEFAULT_MAX_STRETCH,
+                       help=f"Largest tempo change allowed by --target-duration, at most {MAX_STRETCH_LIMIT} "
+                            f"(default: {DEFAULT_MAX_STRETCH})")
+    parser.add_argument("--codec-backend", choices=['auto'] + CODECS.names(), default=None,
+                       help="Codec backend for file-based mixing (default: best in-process backend; ffmpeg only when chosen here)")
     parser.add_argument("--show-options", action="store_true", help="Show all available options for tone, gender, background music, and language")
     
     args = parser.parse_args()
+    if not 0 < args.max_stretch <= MAX_STRETCH_LIMIT:
+        parser.error(f"--max-stretch must be greater than 0 and at most {MAX_STRETCH_LIMIT}")
     
     try:
         if args.show_options:
@@ -1078,10 +1472,16 @@ def main():
                 'lithuanian': 'lt', 'romanian': 'ro', 'catalan': 'ca', 'basque': 'eu',
                 'galician': 'gl'
             }
+            # Only the style names are listed
+            generator.background_music_files = dict.fromkeys(generator.voice_characteristics['background_music'])
             generator.get_available_options()
             return
         
-        generator = ElevenLabsSpeechGenerator(api_key=args.api_key)
+        # Short-lived process: revalidate a stale catalog inline instead of in a thread that dies on exit
+        generator = ElevenLabsSpeechGenerator(api_key=args.api_key, refresh_voices_in_background=False,
+                                              codec_backend=args.codec_backend)
+        if args.refresh_voices:
+            generator.refresh_voices()
         
         # Analyze tone if provided (do this first)
         analyzed_tone = None
@@ -1123,7 +1523,11 @@ def main():
             'tone': analyzed_tone,
             'gender': args.gender,
             'background_music': args.background_music,
-            'language': args.language
+            'language': args.language,
+            'chunked': args.chunked,
+            'max_concurrency': args.max_concurrency,
+            'target_duration': args.target_duration,
+            'max_stretch': args.max_stretch
         }
         
         # Generate output filename if not provided
@@ -1141,52 +1545,27 @@ def main():
         
         print(f"📁 Output will be saved to: {args.output}")
         
-        # Generate speech first
-        temp_output = "temp_speech.mp3" if args.background_music and args.background_music != 'none' else args.output
-        
-        # If we're adding background music and pydub is not available, output as WAV
-        if args.background_music and args.background_music != 'none' and not AUDIO_MIXING_AVAILABLE:
-            if not args.output.endswith('.wav'):
-                args.output = args.output.replace('.mp3', '.wav')
-        
+        written = None
         if args.file:
-            generator.generate_from_file(
+            written = generator.generate_from_file(
                 args.file, 
                 args.voice_id, 
-                temp_output,
+                args.output,
                 **enhanced_params
             )
         elif args.text:
-            generator.generate_speech(
+            written = generator.generate_speech(
                 args.text, 
                 args.voice_id, 
-                temp_output,
+                args.output,
                 **enhanced_params
             )
         
-        # Add background music if requested
-        if args.background_music and args.background_music != 'none':
-            if generator.add_background_music(temp_output, args.background_music, args.output):
-                # Clean up temp file
-                try:
-                    os.remove(temp_output)
-                except:
-                    pass
-                print(f"🎵 Final output with background music: {args.output}")
-            else:
-                # If background music failed, just rename temp file to output
-                try:
-                    os.rename(temp_output, args.output)
-                    print(f"📁 Speech saved as: {args.output}")
-                except:
-                    pass
-        else:
-            # No background music requested, just rename temp file to output
-            try:
-                os.rename(temp_output, args.output)
-                print(f"📁 Speech saved as: {args.output}")
-            except:
-                pass
+        # Renders in outputs/ are indexed so the API can list and serve them
+        if written and Path(written).resolve().parent == Path('outputs').resolve():
+            from output_store import get_output_store
+            params = {key: value for key, value in enhanced_params.items() if value is not None}
+            get_output_store().add(written, dict(params, source='cli'))
     
     except ValueError as e:
         print("\nTo get an API key:")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Script Chunker
+
+Splits ad scripts into sentence-sized pieces that can be synthesized
+independently. Sentence and clause boundaries are language-aware:
+
+- Latin-script languages (English, Spanish, Vietnamese, ...) end sentences
+  with . ! ? followed by whitespace, and skip common abbreviations.
+- Chinese and Japanese end sentences with full-width 。！？； which are not
+  followed by spaces, and use ，、：as clause marks.
+- Thai has no sentence punctuation; runs of whitespace separate sentences.
+
+Ellipses are treated as pauses inside a sentence, not as sentence ends,
+since the script prompt uses them for dramatic weight.
+
+SentenceSplitter works incrementally, so it can also cut streamed LLM output
+into sentences as soon as each one is complete.
+"""
+
+import re
+
+
+DEFAULT_TARGET_CHARS = 220
+DEFAULT_MAX_CHARS = 400
+
+# Languages written without spaces between words
+CJK_LANGUAGES = frozenset({'zh', 'ja'})
+
+# One CJK character carries roughly as much speech as 2.5 Latin characters,
+# so character budgets are scaled down for CJK text
+CJK_LENGTH_FACTOR = 0.4
+WHITESPACE_SENTENCE_LANGUAGES = frozenset({'th'})
+
+# Closing quotes and brackets that stay attached to the end of a sentence
+_CLOSERS = '[' + re.escape('"\'”’»)]）」』】') + ']'
+
+_LATIN_SENTENCE_END = re.compile(rf'(?<!\.)(?:[!?]+\.?|\.(?!\.)[!?]*){_CLOSERS}*(?=\s)')
+_CJK_SENTENCE_END = re.compile(rf'(?:[。！？；]|[!?;](?!\w))+{_CLOSERS}*')
+_WHITESPACE_SENTENCE_END = re.compile(r'\s+')
+
+_LATIN_CLAUSE_END = re.compile(rf'(?:[,;:]|…|\.\.\.|\s[—–-]){_CLOSERS}*(?=\s)')
+_CJK_CLAUSE_END = re.compile(rf'[，、：,:…—]+{_CLOSERS}*')
+
+# Words that end with a period without ending the sentence
+ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'inc', 'ltd', 'co', 'corp',
+    'e.g', 'i.e', 'approx', 'no', 'dept', 'est', 'fig', 'mt', 'ft', 'sra', 'srta', 'av', 'mme', 'mlle',
+    'a.m', 'p.m', 'u.s', 'u.k', 'u.s.a', 'ph.d', 'ee.uu',
+})
+
+# Single letters separated by periods ("U.S.", "a.m.", "e.g."), after the final period is stripped
+_DOTTED_ABBREVIATION = re.compile(r'(?:[^\W\d_]\.)+[^\W\d_]')
+
+# Opening quotes and brackets in front of a word ("(e.g.")
+_OPENERS = '"\'“‘«([（「『【'
+
+
+def _is_cjk(language):
+    return language in CJK_LANGUAGES
+
+
+class SentenceSplitter:
+    def __init__(self, language=None):
+        """
+        Incremental sentence splitter.
+
+        Args:
+            language (str, optional): ISO 639-1 code of the text ('en', 'zh', 'vi', ...)
+        """
+        self.language = (language or 'en').lower()
+        self._buffer = ''
+
+        if _is_cjk(self.language):
+            self._pattern = _CJK_SENTENCE_END
+        elif self.language in WHITESPACE_SENTENCE_LANGUAGES:
+            self._pattern = _WHITESPACE_SENTENCE_END
+        else:
+            self._pattern = _LATIN_SENTENCE_END
+
+    def feed(self, text):
+        """Add text and return the sentences it completed (possibly none)."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in self._pattern.finditer(self._buffer):
+            end = match.end()
+            if self._pattern is _LATIN_SENTENCE_END and self._is_abbreviation(self._buffer[start:match.start() + 1]):
+                continue
+            sentence = self._buffer[start:end].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = end
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever text is left as a final sentence (or None)."""
+        remainder = self._buffer.strip()
+        self._buffer = ''
+        return remainder or None
+
+    @staticmethod
+    def _is_abbreviation(candidate):
+        words = candidate.split()
+        if not words:
+            return False
+        last_word = words[-1].lstrip(_OPENERS).rstrip('.').lower()
+        # Single letters are initials ("J. R. R. Tolkien")
+        return (last_word in ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha())
+                or _DOTTED_ABBREVIATION.fullmatch(last_word) is not None)
+
+
+def split_sentences(text, language=None):
+    """Split text into complete sentences."""
+    splitter = SentenceSplitter(language)
+    sentences = splitter.feed(text)
+    remainder = splitter.flush()
+    if remainder:
+        sentences.append(remainder)
+    return sentences
+
+
+def split_clauses(sentence, language=None, max_chars=DEFAULT_MAX_CHARS):
+    """Split an over-long sentence at clause marks, falling back to word (or character) boundaries."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    cjk = _is_cjk((language or '').lower())
+    pattern = _CJK_CLAUSE_END if cjk else _LATIN_CLAUSE_END
+    pieces = []
+    start = 0
+    for match in pattern.finditer(sentence):
+        piece = sentence[start:match.end()].strip()
+        if piece:
+            pieces.append(piece)
+        start = match.end()
+    tail = sentence[start:].strip()
+    if tail:
+        pieces.append(tail)
+
+    # Clauses that are still too long get cut at the last space (or hard-cut for CJK)
+    result = []
+    for piece in _merge(pieces, max_chars, cjk):
+        while len(piece) > max_chars:
+            cut = max_chars if cjk else piece.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            result.append(piece[:cut].strip())
+            piece = piece[cut:].strip()
+        if piece:
+            result.append(piece)
+    return result
+
+
+def chunk_text(text, language=None, target_chars=DEFAULT_TARGET_CHARS, max_chars=DEFAULT_MAX_CHARS):
+    """
+    Split a script into synthesis chunks.
+
+    Sentences are packed greedily into chunks of about ``target_chars`` so very short
+    sentences don't each cost a request; sentences longer than ``max_chars`` are split
+    at clause boundaries.
+
+    Returns:
+        list of str: Chunks in script order
+    """
+    language = (language or 'en').lower()
+    cjk = _is_cjk(language)
+    if cjk:
+        target_chars = max(1, int(target_chars * CJK_LENGTH_FACTOR))
+        max_chars = max(1, int(max_chars * CJK_LENGTH_FACTOR))
+
+    pieces = []
+    for sentence in split_sentences(text, language):
+        pieces.extend(split_clauses(sentence, language, max_chars))
+    return _merge(pieces, target_chars, cjk)
+
+
+def _merge(pieces, limit, cjk):
+    separator = '' if cjk else ' '
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + len(separator) + len(piece) <= limit:
+            chunks[-1] = chunks[-1] + separator + piece
+        else:
+            chunks.append(piece)
+    return chunks
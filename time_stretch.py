@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Time Stretching
+
+Fits rendered speech to an exact slot length (e.g. 15/30/60 s broadcast
+spots) without re-synthesizing it, using WSOLA (waveform similarity
+overlap-add): the signal is cut into overlapping Hann-windowed frames read at
+a different rate than they are written, and each frame is shifted by up to a
+few milliseconds so it lines up with the waveform of the previous one. That
+keeps pitch and timbre intact, which matters more for voice than for music.
+
+The frame search is a vectorized cross-correlation per frame, and
+overlap-add runs in blocks of frames: with 50% overlap, the even and odd
+frames of a block each tile the output without overlapping, so every block
+is two reshapes and two in-place additions.
+"""
+
+from lazy_imports import lazy_module
+
+np = lazy_module('numpy')
+
+
+# Speech is stretched at most ±15% by default; beyond that it starts to sound unnatural
+DEFAULT_MAX_STRETCH = 0.15
+# Largest max_stretch accepted: half or double speed; 1.0 or more would allow a rate of zero
+MAX_STRETCH_LIMIT = 0.5
+
+DEFAULT_FRAME_MS = 40
+# How far (as a fraction of the frame) a frame may move to match the previous one
+SEARCH_FRACTION = 0.25
+DEFAULT_BLOCK_FRAMES = 256
+
+
+def wsola(samples, rate, sample_rate, frame_ms=DEFAULT_FRAME_MS, block_frames=DEFAULT_BLOCK_FRAMES):
+    """
+    Change the tempo of mono audio without changing its pitch.
+
+    Args:
+        samples (np.ndarray): Mono float samples
+        rate (float): Speed factor; > 1 makes the audio shorter, < 1 longer
+        sample_rate (int): Sample rate of ``samples``
+        frame_ms (float): Analysis frame length
+        block_frames (int): Frames overlap-added per block
+
+    Returns:
+        np.ndarray: float32 samples, ``round(len(samples) / rate)`` long
+
+    Raises:
+        ValueError: If ``rate`` is not positive
+    """
+    if not rate > 0:
+        raise ValueError(f"Stretch rate must be positive: {rate}")
+    samples = np.asarray(samples, dtype=np.float32)
+    if rate == 1.0 or len(samples) == 0:
+        return samples.copy()
+    out_length = int(round(len(samples) / rate))
+
+    frame = max(64, int(sample_rate * frame_ms / 1000) // 2 * 2)
+    hop = frame // 2
+    tolerance = int(frame * SEARCH_FRACTION)
+    analysis_hop = hop * rate
+    n_frames = out_length // hop + 2
+
+    # Pad so every candidate window is in range: tolerance before, a frame and the search span after
+    padded = np.zeros(max(len(samples), int(n_frames * analysis_hop)) + 2 * tolerance + 2 * frame, dtype=np.float32)
+    padded[tolerance:tolerance + len(samples)] = samples
+    limit = tolerance + len(samples)
+
+    positions = np.empty(n_frames, dtype=np.int64)
+    positions[0] = tolerance
+    for k in range(1, n_frames):
+        nominal = tolerance + int(round(k * analysis_hop))
+        if nominal >= limit:
+            positions[k] = nominal
+            continue
+        # The frame that would naturally follow the previous one, and the windows around the nominal position
+        natural = positions[k - 1] + hop
+        template = padded[natural:natural + frame]
+        region = padded[nominal - tolerance:nominal + tolerance + frame]
+        positions[k] = nominal - tolerance + int(np.argmax(np.correlate(region, template, mode='valid')))
+
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)).astype(np.float32)
+    output = np.zeros((n_frames + 1) * hop, dtype=np.float32)
+    offsets = np.arange(frame)
+    for start in range(0, n_frames, block_frames):
+        block = positions[start:start + block_frames]
+        frames = padded[block[:, None] + offsets] * window
+        base = start * hop
+        # Even and odd frames each tile the output back to back; they overlap each other by half a frame
+        even, odd = frames[0::2], frames[1::2]
+        output[base:base + even.size] += even.reshape(-1)
+        output[base + hop:base + hop + odd.size] += odd.reshape(-1)
+
+    # Only the first half frame lacks a preceding overlap; undo its fade-in
+    output[1:hop] /= window[1:hop]
+    return output[:out_length]
+
+
+def fit_to_duration(samples, sample_rate, target_seconds, max_stretch=DEFAULT_MAX_STRETCH):
+    """
+    Stretch speech to exactly ``target_seconds``, within ±``max_stretch``.
+
+    Speech that would need more than the allowed stretch is stretched as far as
+    allowed; if it is then still short it is padded with silence, if it is still
+    long it is left long (speech is never cut).
+
+    Returns:
+        tuple: (float32 samples, info dict with rate, original/target/result seconds and fits)
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    target_frames = int(round(target_seconds * sample_rate))
+    if target_frames <= 0:
+        raise ValueError(f"Target duration must be positive: {target_seconds}")
+    if not 0 < max_stretch <= MAX_STRETCH_LIMIT:
+        raise ValueError(f"max_stretch must be in (0, {MAX_STRETCH_LIMIT}]: {max_stretch}")
+
+    needed = len(samples) / target_frames
+    rate = float(np.clip(needed, 1.0 - max_stretch, 1.0 + max_stretch))
+    stretched = wsola(samples, rate, sample_rate) if abs(rate - 1.0) > 1e-3 else samples
+
+    if len(stretched) < target_frames:
+        stretched = np.concatenate([stretched, np.zeros(target_frames - len(stretched), dtype=np.float32)])
+    elif len(stretched) - target_frames <= max(1, sample_rate // 100):
+        # Rounding leftovers (well under 10 ms)
+        stretched = stretched[:target_frames]
+
+    info = {
+        'rate': round(rate, 4),
+        'original_seconds': round(len(samples) / sample_rate, 3),
+        'target_seconds': round(target_frames / sample_rate, 3),
+        'result_seconds': round(len(stretched) / sample_rate, 3),
+        'fits': len(stretched) == target_frames,
+    }
+    return stretched, info
+
+
+def parse_stretch_options(data):
+    """
+    Read target_duration/max_stretch from a request body.
+
+    Raises:
+        ValueError: If either is not a positive number, or max_stretch is above MAX_STRETCH_LIMIT
+    """
+    options = {}
+    for field in ('target_duration', 'max_stretch'):
+        if data.get(field) is not None:
+            try:
+                value = float(data[field])
+            except (TypeError, ValueError):
+                raise ValueError(f'{field} must be a number')
+            if not 0 < value < float('inf'):
+                raise ValueError(f'{field} must be positive')
+            options[field] = value
+    if options.get('max_stretch', 0) > MAX_STRETCH_LIMIT:
+        raise ValueError(f'max_stretch must be at most {MAX_STRETCH_LIMIT}')
+    return options
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tone Analyzer
+
+Maps free-text tone descriptions ("warm and welcoming", "authoritative") onto
+the five ElevenLabs tone categories.
+
+The keyword tables are compiled once at import time: each category becomes a
+deduplicated frozenset plus a keyword → multiplicity table, and all keywords
+are loaded into a single Aho-Corasick automaton so one pass over the input
+finds every keyword it contains. Results for recent tone strings are memoized.
+Scores are identical to the original per-category list scans, including the
+extra weight that repeated keywords carry.
+"""
+
+from bisect import bisect_right
+from collections import Counter, deque
+from functools import lru_cache
+
+
+# Keywords describing each tone category. Repeated entries are intentional:
+# every occurrence adds to the partial-match score.
+TONE_KEYWORDS = {
+    'friendly': ['warm', 'cheerful', 'upbeat', 'kind', 'welcoming', 'pleasant', 'nice', 'gentle', 'sweet', 'caring', 'supportive', 'encouraging', 'positive', 'optimistic', 'happy', 'joyful', 'lively', 'vibrant', 'energetic', 'enthusiastic', 'excited', 'animated', 'bubbly', 'sunny', 'bright', 'cheery', 'upbeat', 'lively', 'spirited', 'vivacious', 'radiant', 'glowing', 'beaming', 'smiling', 'grinning', 'chirpy', 'perky', 'peppy', 'zippy', 'snappy', 'bouncy', 'springy', 'elastic', 'flexible', 'adaptable', 'versatile', 'accommodating', 'helpful', 'assisting', 'supportive', 'encouraging', 'motivating', 'inspiring', 'uplifting', 'heartwarming', 'touching', 'moving', 'emotional', 'sentimental', 'tender', 'soft', 'mild', 'gentle', 'smooth', 'easy', 'comfortable', 'cozy', 'snug', 'warm', 'toasty', 'inviting', 'welcoming', 'hospitable', 'gracious', 'courteous', 'polite', 'respectful', 'considerate', 'thoughtful', 'mindful', 'attentive', 'caring', 'loving', 'affectionate', 'fond', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'committed', 'dedicated', 'passionate', 'fervent', 'ardent', 'zealous', 'eager', 'keen', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'professional': ['formal', 'authoritative', 'clear', 'business', 'corporate', 'executive', 'managerial', 'administrative', 'official', 'ceremonial', 'ritual', 'traditional', 'conventional', 'standard', 'normal', 'regular', 'typical', 'usual', 'common', 'ordinary', 'everyday', 'routine', 'systematic', 'methodical', 'organized', 'structured', 'disciplined', 'controlled', 'regulated', 'governed', 'managed', 'supervised', 'overseen', 'monitored', 'tracked', 'measured', 'evaluated', 'assessed', 'analyzed', 'examined', 'studied', 'researched', 'investigated', 'explored', 'discovered', 'found', 'identified', 'recognized', 'acknowledged', 'accepted', 'approved', 'endorsed', 'supported', 'backed', 'sponsored', 'funded', 'financed', 'invested', 'committed', 'dedicated', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'casual': ['relaxed', 'conversational', 'informal', 'easy', 'comfortable', 'cozy', 'snug', 'warm', 'toasty', 'inviting', 'welcoming', 'hospitable', 'gracious', 'courteous', 'polite', 'respectful', 'considerate', 'thoughtful', 'mindful', 'attentive', 'caring', 'loving', 'affectionate', 'fond', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'committed', 'dedicated', 'passionate', 'fervent', 'ardent', 'zealous', 'eager', 'keen', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'dramatic': ['expressive', 'theatrical', 'powerful', 'intense', 'passionate', 'emotional', 'moving', 'touching', 'stirring', 'inspiring', 'uplifting', 'motivating', 'encouraging', 'supportive', 'helpful', 'assisting', 'accommodating', 'versatile', 'adaptable', 'flexible', 'elastic', 'springy', 'bouncy', 'snappy', 'zippy', 'peppy', 'perky', 'chirpy', 'grinning', 'smiling', 'beaming', 'glowing', 'radiant', 'vivacious', 'spirited', 'lively', 'bubbly', 'animated', 'excited', 'enthusiastic', 'eager', 'keen', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'calm': ['soothing', 'gentle', 'peaceful', 'tranquil', 'serene', 'quiet', 'still', 'silent', 'hushed', 'muted', 'soft', 'mild', 'tender', 'delicate', 'fragile', 'sensitive', 'vulnerable', 'open', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'compelling', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'convincing', 'persuasive', 'compelling', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized']
+}
+
+# Looser word associations; each input word found here adds a small bonus
+SEMANTIC_MATCHES = {
+    'friendly': ['nice', 'kind', 'warm', 'welcoming', 'pleasant', 'cheerful', 'happy', 'joyful', 'upbeat', 'positive', 'optimistic', 'encouraging', 'supportive', 'caring', 'loving', 'sweet', 'gentle', 'soft', 'tender', 'mild', 'easy', 'comfortable', 'cozy', 'inviting', 'gracious', 'polite', 'respectful', 'considerate', 'thoughtful', 'attentive', 'helpful', 'assisting', 'accommodating', 'versatile', 'adaptable', 'flexible', 'motivating', 'inspiring', 'uplifting', 'heartwarming', 'touching', 'moving', 'emotional', 'sentimental', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'committed', 'dedicated', 'passionate', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'confident', 'assured', 'certain', 'sure', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'professional': ['formal', 'business', 'corporate', 'executive', 'managerial', 'administrative', 'official', 'ceremonial', 'traditional', 'conventional', 'standard', 'normal', 'regular', 'typical', 'usual', 'common', 'ordinary', 'routine', 'systematic', 'methodical', 'organized', 'structured', 'disciplined', 'controlled', 'regulated', 'governed', 'managed', 'supervised', 'monitored', 'tracked', 'measured', 'evaluated', 'assessed', 'analyzed', 'examined', 'studied', 'researched', 'investigated', 'explored', 'discovered', 'found', 'identified', 'recognized', 'acknowledged', 'accepted', 'approved', 'endorsed', 'supported', 'backed', 'sponsored', 'funded', 'financed', 'invested', 'committed', 'dedicated', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'casual': ['relaxed', 'conversational', 'informal', 'easy', 'comfortable', 'cozy', 'snug', 'warm', 'toasty', 'inviting', 'welcoming', 'hospitable', 'gracious', 'courteous', 'polite', 'respectful', 'considerate', 'thoughtful', 'mindful', 'attentive', 'caring', 'loving', 'affectionate', 'fond', 'devoted', 'loyal', 'faithful', 'true', 'genuine', 'authentic', 'real', 'honest', 'sincere', 'earnest', 'serious', 'committed', 'dedicated', 'passionate', 'fervent', 'ardent', 'zealous', 'eager', 'keen', 'enthusiastic', 'excited', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'dramatic': ['expressive', 'theatrical', 'powerful', 'intense', 'passionate', 'emotional', 'moving', 'touching', 'stirring', 'inspiring', 'uplifting', 'motivating', 'encouraging', 'supportive', 'helpful', 'assisting', 'accommodating', 'versatile', 'adaptable', 'flexible', 'elastic', 'springy', 'bouncy', 'snappy', 'zippy', 'peppy', 'perky', 'chirpy', 'grinning', 'smiling', 'beaming', 'glowing', 'radiant', 'vivacious', 'spirited', 'lively', 'bubbly', 'animated', 'excited', 'enthusiastic', 'eager', 'keen', 'thrilled', 'delighted', 'pleased', 'satisfied', 'content', 'happy', 'joyful', 'merry', 'jolly', 'cheerful', 'upbeat', 'positive', 'optimistic', 'hopeful', 'confident', 'assured', 'certain', 'sure', 'definite', 'clear', 'obvious', 'evident', 'apparent', 'visible', 'noticeable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized'],
+    'calm': ['soothing', 'gentle', 'peaceful', 'tranquil', 'serene', 'quiet', 'still', 'silent', 'hushed', 'muted', 'soft', 'mild', 'tender', 'delicate', 'fragile', 'sensitive', 'vulnerable', 'open', 'honest', 'sincere', 'earnest', 'serious', 'grave', 'solemn', 'dignified', 'respectable', 'honorable', 'noble', 'distinguished', 'eminent', 'prominent', 'notable', 'remarkable', 'outstanding', 'excellent', 'superior', 'great', 'wonderful', 'fantastic', 'amazing', 'incredible', 'awesome', 'brilliant', 'magnificent', 'splendid', 'gorgeous', 'beautiful', 'lovely', 'charming', 'attractive', 'appealing', 'engaging', 'captivating', 'fascinating', 'interesting', 'intriguing', 'compelling', 'persuasive', 'convincing', 'powerful', 'strong', 'robust', 'sturdy', 'solid', 'firm', 'stable', 'steady', 'reliable', 'dependable', 'trustworthy', 'credible', 'believable', 'influential', 'impactful', 'effective', 'successful', 'productive', 'fruitful', 'beneficial', 'advantageous', 'profitable', 'valuable', 'precious', 'treasured', 'cherished', 'beloved', 'adored', 'loved', 'worshiped', 'revered', 'respected', 'honored', 'esteemed', 'admired', 'appreciated', 'valued', 'prized']
+}
+
+TONE_CATEGORIES = tuple(TONE_KEYWORDS)
+
+# Scores awarded per match type
+EXACT_MATCH_SCORE = 3
+PARTIAL_MATCH_SCORE = 2
+SEMANTIC_MATCH_SCORE = 1
+
+# Never part of a keyword, so it can separate keywords in one searchable string
+_SEPARATOR = '\x00'
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting which of a fixed set of keywords occur in a text."""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            self._output[node] = self._output[node] + (keyword_id,)
+
+        # Breadth-first construction of failure links; outputs inherit along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text):
+        """Return the set of keyword ids that occur anywhere in ``text``."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+class ToneAnalyzer:
+    def __init__(self, tone_keywords, semantic_matches, cache_size=1024):
+        """
+        Compile the tone keyword tables.
+
+        Args:
+            tone_keywords (dict): Tone category → list of keywords (duplicates add weight)
+            semantic_matches (dict): Tone category → list of related words
+            cache_size (int): Number of recent tone strings whose scores are memoized
+        """
+        self.categories = tuple(tone_keywords)
+        self.keyword_sets = {tone: frozenset(keywords) for tone, keywords in tone_keywords.items()}
+        self.semantic_sets = {tone: frozenset(semantic_matches.get(tone, ())) for tone in self.categories}
+
+        # Every distinct keyword gets an id; per category we keep how often each id is listed
+        vocabulary = sorted(set().union(*self.keyword_sets.values()))
+        self._keyword_ids = {keyword: keyword_id for keyword_id, keyword in enumerate(vocabulary)}
+        self._multiplicities = [
+            {self._keyword_ids[keyword]: count for keyword, count in Counter(tone_keywords[tone]).items()}
+            for tone in self.categories
+        ]
+        self._automaton = KeywordAutomaton(vocabulary)
+
+        # All keywords in one string so "description is inside a keyword" is a C-level find()
+        self._joined_keywords = _SEPARATOR.join(vocabulary)
+        self._keyword_starts = []
+        offset = 0
+        for keyword in vocabulary:
+            self._keyword_starts.append(offset)
+            offset += len(keyword) + 1
+
+        self.scores = lru_cache(maxsize=cache_size)(self._scores)
+
+    def analyze(self, tone_description):
+        """
+        Return (best_tone, score) for a normalized (lowercased, stripped) description.
+
+        best_tone is None when no category scored above zero. Ties resolve to the
+        category listed first, as before.
+        """
+        tone_scores = self.scores(tone_description)
+        best_index = max(range(len(tone_scores)), key=tone_scores.__getitem__)
+        best_score = tone_scores[best_index]
+        if best_score > 0:
+            return self.categories[best_index], best_score
+        return None, best_score
+
+    def _scores(self, tone_description):
+        """Score tuple aligned with self.categories."""
+        input_words = tone_description.split()
+        matched = self._keywords_related_to(tone_description)
+
+        scores = []
+        for category_index, tone in enumerate(self.categories):
+            keywords = self.keyword_sets[tone]
+            semantic = self.semantic_sets[tone]
+            multiplicities = self._multiplicities[category_index]
+
+            score = EXACT_MATCH_SCORE * sum(1 for word in input_words if word in keywords)
+            score += PARTIAL_MATCH_SCORE * sum(multiplicities.get(keyword_id, 0) for keyword_id in matched)
+            score += SEMANTIC_MATCH_SCORE * sum(1 for word in input_words if word in semantic)
+            scores.append(score)
+        return tuple(scores)
+
+    def _keywords_related_to(self, text):
+        """Ids of keywords that occur in ``text`` or that contain ``text``."""
+        if not text:
+            # The empty string is contained in every keyword
+            return set(range(len(self._keyword_starts)))
+
+        matched = self._automaton.find_all(text)
+
+        if _SEPARATOR not in text:
+            joined = self._joined_keywords
+            position = joined.find(text)
+            while position != -1:
+                keyword_id = bisect_right(self._keyword_starts, position) - 1
+                matched.add(keyword_id)
+                # Continue after this keyword; it can only be counted once
+                next_start = self._keyword_starts[keyword_id + 1] if keyword_id + 1 < len(self._keyword_starts) else len(joined)
+                position = joined.find(text, next_start)
+        return matched
+
+
+TONE_ANALYZER = ToneAnalyzer(TONE_KEYWORDS, SEMANTIC_MATCHES)
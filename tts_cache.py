@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+TTS Result Cache
+
+Content-addressed disk cache for raw text-to-speech audio. Entries are keyed
+on a hash of everything that determines the synthesized audio (text, voice,
+model, voice settings, language and output format), so re-mixing a script
+with a different music bed, or retrying a request, never calls the API again.
+
+Writes are atomic (temp file + rename), so several threads or worker
+processes can share one cache directory. The directory is kept under a size
+quota by evicting the least recently used entries.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path(".cache") / "tts"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Evict down to this fraction of the quota so we don't evict on every write
+EVICTION_TARGET_RATIO = 0.9
+
+_ENTRY_SUFFIX = ".audio"
+
+
+class TTSCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Create (or reopen) a TTS cache directory.
+
+        Args:
+            cache_dir (str): Directory holding cached audio
+            max_bytes (int): Size quota; least recently used entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = self._scan_size()
+
+    @staticmethod
+    def make_key(text, voice_id, model_id, voice_settings, language=None, output_format=None, context=None):
+        """
+        Stable hash of every request field that affects the synthesized audio.
+
+        ``context`` holds extra prosody inputs such as previous_text/next_text.
+        """
+        payload = json.dumps({
+            "text": text,
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings,
+            "language": language,
+            "output_format": output_format,
+            "context": context or None,
+        }, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return cached audio bytes, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Bump the modification time: it is the recency signal for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store audio bytes under ``key`` and evict old entries if over quota."""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            existed = path.exists()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write TTS cache entry: {e}")
+            return
+
+        with self._lock:
+            if not existed:
+                self._size += len(data)
+            over_quota = self._size > self.max_bytes
+        if over_quota:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache is below its quota."""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob(f"*/*{_ENTRY_SUFFIX}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue  # removed by another worker
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            size = sum(entry[1] for entry in entries)
+            target = self.max_bytes * EVICTION_TARGET_RATIO
+            for _, entry_size, path in sorted(entries):
+                if size <= target:
+                    break
+                try:
+                    path.unlink()
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+            self._size = size
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _path(self, key):
+        # Shard by prefix so no single directory grows huge
+        return self.cache_dir / key[:2] / f"{key}{_ENTRY_SUFFIX}"
+
+    def _scan_size(self):
+        total = 0
+        for path in self.cache_dir.glob(f"*/*{_ENTRY_SUFFIX}"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
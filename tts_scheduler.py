@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+TTS Request Scheduler
+
+Every text-to-speech request in the process waits here for a slot:
+
+- at most ``max_concurrency`` requests are in flight (ElevenLabs limits
+  concurrent requests per plan)
+- an optional characters-per-minute token bucket paces the character quota
+- waiters are served strictly first come, first served
+- limits are learned from the responses: the ``maximum-concurrent-requests``
+  header caps concurrency, and a 429 halves it and pauses the whole queue
+  for the Retry-After period instead of letting every thread retry on its
+  own (no thundering herd). Concurrency then grows back by one slot per run
+  of successful requests, up to the configured/learned ceiling.
+
+Queue depth, wait times and the current limits are exposed through stats().
+Threads wait with acquire(); asyncio tasks wait with acquire_async() without
+holding a thread, in the same queue.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Successful requests in a row before a throttled limit grows by one slot
+RECOVERY_SUCCESSES = 10
+
+# Pause applied after a 429 that didn't say how long to wait
+DEFAULT_THROTTLE_PAUSE = 1.0
+
+# Response headers ElevenLabs uses to report the concurrency limit of the plan
+MAX_CONCURRENCY_HEADER = "maximum-concurrent-requests"
+CURRENT_CONCURRENCY_HEADER = "current-concurrent-requests"
+
+
+class TTSSlot:
+    def __init__(self, scheduler, ticket, chars, waited):
+        self._scheduler = scheduler
+        self.ticket = ticket
+        self.chars = chars
+        self.waited = waited
+        self._released = False
+
+    def release(self):
+        """Give the slot back (idempotent)."""
+        if not self._released:
+            self._released = True
+            self._scheduler._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class TTSScheduler:
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, chars_per_minute=None):
+        """
+        Create a scheduler shared by every TTS call of the process.
+
+        Args:
+            max_concurrency (int): Upper bound for requests in flight
+            chars_per_minute (int, optional): Character budget per minute; None disables pacing.
+                The bucket holds one minute of characters, so short bursts are allowed.
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.chars_per_minute = chars_per_minute
+        self._condition = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting = []  # heap of tickets; the smallest is served next
+        # (loop, future) of asyncio tasks waiting in acquire_async
+        self._async_waiters = []
+
+        # Effective limit: lowered by 429s and by the provider's header, regrown on success
+        self._limit = self.max_concurrency
+        self._ceiling = self.max_concurrency
+        self._active = 0
+        self._successes = 0
+        self._paused_until = 0.0
+
+        self._tokens = float(chars_per_minute) if chars_per_minute else 0.0
+        self._refilled_at = time.monotonic()
+
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.provider_limit = None
+        self.provider_current = None
+
+    def acquire(self, chars, ticket=None):
+        """
+        Block until it is this caller's turn and a slot and enough characters are free.
+
+        Args:
+            chars (int): Characters the request will be billed for
+            ticket (int, optional): Ticket of an earlier slot, to retry a throttled request
+                at the front of the queue instead of the back
+
+        Returns:
+            TTSSlot: Release it (or use it as a context manager) when the response is consumed
+        """
+        start = time.monotonic()
+        with self._condition:
+            if ticket is None:
+                ticket = next(self._tickets)
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                delay = self._admission_delay(ticket, chars)
+                if delay == 0:
+                    break
+                self._condition.wait(timeout=delay)
+
+            heapq.heappop(self._waiting)
+            waited = time.monotonic() - start
+            self._admit(chars, waited)
+        return TTSSlot(self, ticket, chars, waited)
+
+    async def acquire_async(self, chars, ticket=None):
+        """acquire() for asyncio code: waits in the same queue without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        with self._condition:
+            if ticket is None:
+                ticket = next(self._tickets)
+            heapq.heappush(self._waiting, ticket)
+
+        try:
+            while True:
+                with self._condition:
+                    delay = self._admission_delay(ticket, chars)
+                    if delay == 0:
+                        heapq.heappop(self._waiting)
+                        waited = time.monotonic() - start
+                        self._admit(chars, waited)
+                        return TTSSlot(self, ticket, chars, waited)
+                    woken = loop.create_future()
+                    self._async_waiters.append((loop, woken))
+                try:
+                    await asyncio.wait_for(woken, timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # Cancelled while queued: leave the queue so the next waiter isn't stuck behind us
+            with self._condition:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                self._wake()
+            raise
+
+    def observe(self, response, slot=None):
+        """
+        Learn from a TTS response: provider concurrency headers, and 429 throttling.
+
+        On a 429 the slot's characters are refunded (they weren't billed), concurrency is
+        halved and the queue is paused for the Retry-After period.
+        """
+        headers = getattr(response, "headers", None) or {}
+        with self._condition:
+            limit = _int_header(headers, MAX_CONCURRENCY_HEADER)
+            if limit:
+                self.provider_limit = limit
+                self._ceiling = min(self.max_concurrency, limit)
+                self._limit = min(self._limit, self._ceiling)
+            current = _int_header(headers, CURRENT_CONCURRENCY_HEADER)
+            if current is not None:
+                self.provider_current = current
+
+            if response.status_code == 429:
+                self.throttled += 1
+                self._successes = 0
+                self._limit = max(1, min(self._limit, self._active) // 2)
+                pause = _retry_after(headers)
+                self._paused_until = max(self._paused_until, time.monotonic() + (pause if pause is not None else DEFAULT_THROTTLE_PAUSE))
+                if slot is not None and self.chars_per_minute:
+                    self._tokens += slot.chars
+            elif response.status_code < 400:
+                self._successes += 1
+                if self._limit < self._ceiling and self._successes >= RECOVERY_SUCCESSES:
+                    self._limit += 1
+                    self._successes = 0
+            self._wake()
+
+    def stats(self):
+        with self._condition:
+            self._refill()
+            return {
+                "queue_depth": len(self._waiting),
+                "active": self._active,
+                "concurrency_limit": self._limit,
+                "max_concurrency": self.max_concurrency,
+                "provider_max_concurrency": self.provider_limit,
+                "provider_current_concurrency": self.provider_current,
+                "chars_per_minute": self.chars_per_minute,
+                "chars_available": int(self._tokens) if self.chars_per_minute else None,
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "avg_wait_seconds": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+                "max_wait_seconds": round(self.max_wait, 4),
+            }
+
+    def _admit(self, chars, waited):
+        """Take a slot and the characters for the head of the queue (caller holds the lock)."""
+        self._active += 1
+        if self.chars_per_minute:
+            self._tokens -= chars
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        # The next waiter may be admissible too
+        self._wake()
+
+    def _wake(self):
+        """Wake every thread and task waiting for the queue to move (caller holds the lock)."""
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, woken in waiters:
+            loop.call_soon_threadsafe(_resolve, woken)
+
+    def _admission_delay(self, ticket, chars):
+        """0 if ``ticket`` may start now, else seconds to wait before checking again (caller holds the lock)."""
+        if self._waiting[0] != ticket:
+            return None  # not our turn: wait for a notification
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._active >= self._limit:
+            return None
+        if self.chars_per_minute:
+            self._refill()
+            # Requests larger than the whole bucket go through once it is full
+            needed = min(chars, self.chars_per_minute)
+            if self._tokens < needed:
+                return (needed - self._tokens) / (self.chars_per_minute / 60.0)
+        return 0
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.chars_per_minute:
+            self._tokens = min(float(self.chars_per_minute),
+                               self._tokens + (now - self._refilled_at) * self.chars_per_minute / 60.0)
+        self._refilled_at = now
+
+    def _release(self, slot):
+        with self._condition:
+            self._active -= 1
+            self._wake()
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _int_header(headers, name):
+    try:
+        value = headers.get(name)
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(headers):
+    try:
+        value = headers.get("Retry-After")
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
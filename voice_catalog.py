@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Voice Catalog Cache
+
+Keeps the ElevenLabs voice catalog in memory with a TTL, mirrors it to an
+on-disk snapshot so cold starts don't need the network, and refreshes it in
+the background using conditional requests (ETag / Last-Modified).
+
+A failed refresh is remembered for a short failure TTL: during an API outage
+the stale catalog keeps being served (and a cold one fails fast) instead of
+every lookup starting another fetch with its full retry sequence.
+
+Every time the catalog contents change, its version number is bumped so that
+derived caches (voice indexes, selections, ...) can key on it.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path(".cache")
+DEFAULT_TTL_SECONDS = 15 * 60
+# Seconds after a failed refresh before the API is asked again
+DEFAULT_FAILURE_TTL_SECONDS = 30
+
+
+class VoiceCatalog:
+    def __init__(self, fetch_voices, ttl=DEFAULT_TTL_SECONDS, snapshot_path=None, refresh_in_background=True,
+                 failure_ttl=DEFAULT_FAILURE_TTL_SECONDS):
+        """
+        Create a voice catalog cache.
+
+        Args:
+            fetch_voices (callable): ``fetch_voices(etag, last_modified)`` returning a tuple
+                ``(voices, etag, last_modified)``. ``voices`` is None when the server answered
+                304 Not Modified. Network errors are raised as exceptions.
+            ttl (float): Seconds a fetched catalog is considered fresh
+            snapshot_path (str, optional): JSON file used to persist the catalog between runs.
+                Pass None to keep the catalog in memory only.
+            refresh_in_background (bool): Serve stale data while refreshing in a daemon thread.
+                Short-lived processes (CLI) should disable this and refresh synchronously.
+            failure_ttl (float): Seconds after a failed refresh during which no new refresh is
+                attempted (except forced ones); the stale catalog is served meanwhile
+        """
+        self._fetch_voices = fetch_voices
+        self.ttl = ttl
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.refresh_in_background = refresh_in_background
+        self.failure_ttl = failure_ttl
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+
+        self._voices = None
+        self._fetched_at = 0.0
+        self._failed_at = 0.0
+        self._etag = None
+        self._last_modified = None
+        self._content_hash = None
+        self._version = 0
+        self._snapshot_loaded = False
+
+    @staticmethod
+    def snapshot_path_for(api_key, cache_dir=DEFAULT_CACHE_DIR):
+        """Snapshot location for an API key (accounts can see different voice libraries)."""
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+        return str(Path(cache_dir) / f"voices_{key_hash}.json")
+
+    @property
+    def version(self):
+        """Monotonic catalog version; changes whenever the voice list changes."""
+        self._ensure_loaded()
+        return self._version
+
+    def is_fresh(self):
+        return self._voices is not None and (time.time() - self._fetched_at) < self.ttl
+
+    def _recently_failed(self):
+        return (time.time() - self._failed_at) < self.failure_ttl
+
+    def get_voices(self):
+        """
+        Return the cached voice list (treat it as read-only).
+
+        Fresh data is returned straight from memory. Stale data is returned immediately
+        while a background refresh runs, unless background refresh is disabled. Only a
+        completely cold cache (no memory, no snapshot) blocks on the network. Within the
+        failure TTL of a failed refresh, no new refresh is started.
+        """
+        self._ensure_loaded()
+
+        if not self.is_fresh() and not self._recently_failed():
+            if self._voices is not None and self.refresh_in_background:
+                self._start_background_refresh()
+            else:
+                self.refresh()
+
+        return self._voices if self._voices is not None else []
+
+    def refresh(self, force=False):
+        """
+        Revalidate the catalog with the API.
+
+        Sends the stored validators so an unchanged catalog costs a 304 with no body.
+        Returns True when the catalog is available after the refresh.
+        """
+        with self._refresh_lock:
+            # Another thread may have refreshed while we were waiting for the lock
+            if not force and self.is_fresh():
+                return True
+            # Waiters behind a refresh that just failed don't repeat it
+            if not force and self._recently_failed():
+                return self._voices is not None
+
+            etag = None if force else self._etag
+            last_modified = None if force else self._last_modified
+            try:
+                voices, etag, last_modified = self._fetch_voices(etag, last_modified)
+            except Exception as e:
+                with self._lock:
+                    self._failed_at = time.time()
+                print(f"⚠️  Voice catalog refresh failed: {e} (retrying in {self.failure_ttl:.0f}s)")
+                return self._voices is not None
+
+            with self._lock:
+                self._fetched_at = time.time()
+                self._failed_at = 0.0
+                if voices is not None:
+                    self._store(voices, etag, last_modified)
+                else:
+                    # 304 Not Modified: keep the data, refresh validators if the server sent any
+                    self._etag = etag or self._etag
+                    self._last_modified = last_modified or self._last_modified
+
+            self._write_snapshot()
+            return True
+
+    def invalidate(self):
+        """Mark the in-memory catalog as stale so the next read revalidates it."""
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def _store(self, voices, etag, last_modified):
+        content_hash = hashlib.sha256(
+            json.dumps(voices, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+        if content_hash != self._content_hash:
+            self._version += 1
+            self._content_hash = content_hash
+            print(f"🗂️  Voice catalog updated: {len(voices)} voices (version {self._version})")
+        self._voices = voices
+        self._etag = etag
+        self._last_modified = last_modified
+
+    def _start_background_refresh(self):
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="voice-catalog-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _ensure_loaded(self):
+        """Load the on-disk snapshot the first time the catalog is used."""
+        if self._snapshot_loaded:
+            return
+        with self._lock:
+            if self._snapshot_loaded:
+                return
+            self._snapshot_loaded = True
+            self._read_snapshot()
+
+    def _read_snapshot(self):
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._voices = snapshot["voices"]
+            self._fetched_at = snapshot.get("fetched_at", 0.0)
+            self._etag = snapshot.get("etag")
+            self._last_modified = snapshot.get("last_modified")
+            self._content_hash = snapshot.get("content_hash")
+            self._version = snapshot.get("version", 1)
+            print(f"🗂️  Loaded voice catalog snapshot: {len(self._voices)} voices (version {self._version})")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Ignoring unreadable voice catalog snapshot: {e}")
+
+    def _write_snapshot(self):
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            snapshot = {
+                "voices": self._voices,
+                "fetched_at": self._fetched_at,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "content_hash": self._content_hash,
+                "version": self._version,
+            }
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial snapshot
+            tmp_path = self.snapshot_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"⚠️  Could not write voice catalog snapshot: {e}")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Voice Feature Index
+
+Precompiled, array-backed features for every voice in a catalog version.
+Name, description and labels are normalized once when the index is built;
+filtering and scoring then become bitmask tests and column sums instead of
+re-scanning every voice's text against hundreds of keywords per request.
+
+The matching rules are the ones ElevenLabsSpeechGenerator has always used
+(substring matches, keyword multiplicities, name indicators and penalties),
+so an index-backed selection returns the same voice as the old per-voice scan.
+"""
+
+from array import array
+from collections import Counter
+
+
+# Common first names used to detect a voice's gender from its name
+MALE_NAME_INDICATORS = ('adam', 'alex', 'andrew', 'anthony', 'brian', 'chris', 'daniel', 'david', 'eric', 'james', 'john', 'kevin', 'michael', 'paul', 'robert', 'steven', 'thomas', 'william', 'carlos', 'jose', 'antonio', 'francisco', 'manuel', 'juan', 'rafael', 'pedro', 'alejandro', 'miguel', 'jorge', 'fernando', 'sergio', 'alberto', 'pablo', 'mario', 'luis', 'diego', 'andres', 'javier', 'ricardo', 'roberto', 'eduardo', 'oscar', 'arturo', 'ramon', 'enrique', 'guillermo', 'salvador', 'victor', 'hugo', 'ignacio', 'adrian', 'sebastian', 'gabriel', 'emilio', 'raul', 'cesar', 'ruben', 'joaquin', 'alvaro', 'gonzalo', 'felix', 'marcos', 'nacho', 'israel', 'jordi', 'xavier', 'xavi')
+FEMALE_NAME_INDICATORS = ('sarah', 'emma', 'olivia', 'ava', 'isabella', 'sophia', 'charlotte', 'mia', 'amelia', 'harper', 'evelyn', 'abigail', 'emily', 'elizabeth', 'sofia', 'avery', 'ella', 'madison', 'scarlett', 'victoria', 'alice', 'maria', 'carmen', 'ana', 'lucia', 'elena', 'patricia', 'monica', 'isabel', 'cristina', 'laura', 'andrea', 'natalia', 'paula', 'sandra', 'raquel', 'beatriz', 'dolores', 'pilar', 'teresa', 'mercedes')
+
+# Words in a voice's text that count against the opposite gender
+FEMALE_PENALTY_WORDS = ('woman', 'female', 'lady', 'girl', 'soprano', 'alto', 'sweet', 'gentle')
+MALE_PENALTY_WORDS = ('man', 'male', 'guy', 'baritone', 'bass', 'husky', 'gruff')
+
+# Descriptive words accepted as a gender match when narrowing the candidates
+MALE_MATCH_WORDS = ('masculine', 'male', 'man', 'guy', 'baritone', 'bass', 'husky', 'gruff')
+FEMALE_MATCH_WORDS = ('feminine', 'female', 'woman', 'lady', 'girl', 'soprano', 'alto', 'sweet', 'gentle')
+
+# Native-language keywords: scoring bonus list and candidate-matching list
+LANGUAGE_SCORE_KEYWORDS = {
+    'spanish': ('español', 'espanol', 'castellano', 'hispano', 'latino', 'mexicano', 'argentino', 'colombiano', 'española', 'espanola'),
+    'french': ('français', 'francais', 'francophone', 'française', 'francaise'),
+    'german': ('deutsch', 'deutsche', 'german', 'germanic'),
+}
+LANGUAGE_MATCH_KEYWORDS = {
+    'spanish': ('español', 'espanol', 'castellano', 'hispano', 'latino', 'mexicano', 'argentino', 'colombiano'),
+    'french': ('français', 'francais', 'francophone'),
+    'german': ('deutsch', 'deutsche', 'german'),
+}
+
+HIGH_QUALITY_CATEGORIES = ('premade', 'cloned', 'professional')
+
+# Separator that never occurs inside a keyword, so a substring test on the joined
+# fields is equivalent to testing each field on its own
+_FIELD_SEPARATOR = '\x00'
+
+
+class VoiceIndex:
+    def __init__(self, voices, voice_characteristics, language_codes, version=None):
+        """
+        Build the feature index for a list of voices.
+
+        Args:
+            voices (list): Voice dicts as returned by the ElevenLabs /voices endpoint
+            voice_characteristics (dict): The generator's tone/gender keyword tables
+            language_codes (dict): Language name → ISO code mapping
+            version (int, optional): Catalog version the index was built from
+        """
+        self.version = version
+        self.voices = list(voices)
+        self.size = len(self.voices)
+        self._rows = {id(voice): row for row, voice in enumerate(self.voices)}
+
+        self._tone_keywords = {
+            tone: Counter(keyword.lower() for keyword in keywords)
+            for tone, keywords in voice_characteristics['tone'].items()
+        }
+        self._gender_keywords = {
+            gender: Counter(keyword.lower() for keyword in keywords)
+            for gender, keywords in voice_characteristics['gender'].items()
+        }
+        self._language_codes = dict(language_codes)
+
+        # Normalized text, computed once per voice
+        self._names = []
+        self._descriptions = []
+        self._texts = []
+        self._fields = []
+        self._label_languages = []
+        base = array('i')
+        for voice in self.voices:
+            name = (voice.get('name') or '').lower()
+            description = (voice.get('description') or '').lower()
+            labels = voice.get('labels') or {}
+            self._names.append(name)
+            self._descriptions.append(description)
+            self._texts.append(f"{voice.get('name', '')} {voice.get('description', '')} {str(voice.get('labels', {}))}".lower())
+            self._fields.append(_FIELD_SEPARATOR.join([description, name] + [str(label).lower() for label in labels.values()]))
+            self._label_languages.append(str(labels.get('language') or '').lower())
+
+            bonus = 0
+            if (voice.get('category') or '').lower() in HIGH_QUALITY_CATEGORIES:
+                bonus += 2
+            if len(voice.get('description') or '') > 20:
+                bonus += 1
+            base.append(bonus)
+        self._base_scores = base
+
+        # Lazily built columns (score arrays and membership bitmaps), memoized per index
+        self._columns = {}
+
+        # Per-voice features: bitmasks over tone categories, genders and languages
+        self._tone_bits = {tone: 1 << bit for bit, tone in enumerate(self._tone_keywords)}
+        self._gender_bits = {gender: 1 << bit for bit, gender in enumerate(self._gender_keywords)}
+        self._language_bits = {language: 1 << bit for bit, language in enumerate(self._language_codes)}
+        self.tone_features = self._build_mask(self._tone_bits, self._matches_keywords_filter, self._tone_keywords)
+        self.gender_features = self._build_mask(self._gender_bits, self._matches_keywords_filter, self._gender_keywords)
+        self.language_features = self._build_mask(self._language_bits, self._matches_language_filter, None)
+
+    def __len__(self):
+        return self.size
+
+    def rows_for(self, voices):
+        """Map voice dicts to row numbers; returns None if any voice is not part of this index."""
+        rows = []
+        for voice in voices:
+            row = self._rows.get(id(voice))
+            if row is None:
+                return None
+            rows.append(row)
+        return rows
+
+    def features(self, row):
+        """Decoded feature sets for one voice (tone categories, genders and languages)."""
+        return {
+            'tones': {tone for tone, bit in self._tone_bits.items() if self.tone_features[row] & bit},
+            'genders': {gender for gender, bit in self._gender_bits.items() if self.gender_features[row] & bit},
+            'languages': {language for language, bit in self._language_bits.items() if self.language_features[row] & bit},
+        }
+
+    def filter_rows(self, rows, tone=None, gender=None, language=None):
+        """Rows whose name, description or labels match the tone, gender and language filters."""
+        if tone:
+            tone = tone.lower()
+            keywords = self._tone_keywords.get(tone)
+            if keywords:
+                bit = self._tone_bits[tone]
+                rows = [row for row in rows if self.tone_features[row] & bit]
+
+        if gender:
+            gender = gender.lower()
+            keywords = self._gender_keywords.get(gender)
+            if keywords:
+                bit = self._gender_bits[gender]
+                rows = [row for row in rows if self.gender_features[row] & bit]
+
+        if language:
+            language = language.lower()
+            if self._language_codes.get(language):
+                bit = self._language_bits[language]
+                rows = [row for row in rows if self.language_features[row] & bit]
+
+        return rows
+
+    def scores(self, rows, tone=None, gender=None, language=None):
+        """Match scores for the given rows, summed from the precomputed score columns."""
+        columns = [self._base_scores]
+        if tone:
+            columns.append(self._column(('tone_score', tone.lower()), self._tone_score))
+        if gender:
+            columns.append(self._column(('gender_score', gender.lower()), self._gender_score))
+        if language:
+            columns.append(self._column(('language_score', language.lower()), self._language_score))
+        return [sum(column[row] for column in columns) for row in rows]
+
+    def candidate_mask(self, gender=None, language=None):
+        """Bitmap (one byte per voice) of voices that plausibly have the requested gender and language."""
+        mask = None
+        if gender:
+            mask = self._column(('gender_match', gender.lower()), self._gender_match, typecode='B')
+        if language:
+            language_mask = self._column(('language_match', language.lower()), self._language_match, typecode='B')
+            mask = language_mask if mask is None else array('B', map(min, mask, language_mask))
+        return mask
+
+    def rank_rows(self, rows, tone=None, gender=None, language=None):
+        """Score rows and return (row, score) pairs sorted best first; ties keep catalog order."""
+        ranked = list(zip(rows, self.scores(rows, tone, gender, language)))
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
+
+    # Column builders ---------------------------------------------------------
+
+    def _column(self, key, builder, typecode='i'):
+        column = self._columns.get(key)
+        if column is None:
+            column = array(typecode, (builder(row, key[1]) for row in range(self.size)))
+            self._columns[key] = column
+        return column
+
+    def _build_mask(self, bits, matcher, tables):
+        mask = array('Q')
+        for row in range(self.size):
+            value = 0
+            for key, bit in bits.items():
+                if matcher(row, key, tables):
+                    value |= bit
+            mask.append(value)
+        return mask
+
+    def _matches_keywords_filter(self, row, key, tables):
+        fields = self._fields[row]
+        return any(keyword in fields for keyword in tables[key])
+
+    def _matches_language_filter(self, row, language, _tables):
+        lang_code = self._language_codes.get(language)
+        if not lang_code:
+            return False
+        if lang_code in self._label_languages[row]:
+            return True
+        # Only description and name take part in the language-name test
+        return language in self._descriptions[row] or language in self._names[row]
+
+    def _tone_score(self, row, tone):
+        text = self._texts[row]
+        score = 3 * sum(count for keyword, count in self._tone_keywords.get(tone, {}).items() if keyword in text)
+        if tone in self._names[row]:
+            score += 5
+        return score
+
+    def _gender_score(self, row, gender):
+        text = self._texts[row]
+        name = self._names[row]
+        score = 5 * sum(count for keyword, count in self._gender_keywords.get(gender, {}).items() if keyword in text)
+        if gender in name:
+            score += 10
+
+        if gender == 'male':
+            if any(indicator in name for indicator in MALE_NAME_INDICATORS):
+                score += 8
+            score -= 5 * sum(1 for word in FEMALE_PENALTY_WORDS if word in text)
+        elif gender == 'female':
+            if any(indicator in name for indicator in FEMALE_NAME_INDICATORS):
+                score += 8
+            score -= 5 * sum(1 for word in MALE_PENALTY_WORDS if word in text)
+        return score
+
+    def _language_score(self, row, language):
+        text = self._texts[row]
+        lang_code = self._language_codes.get(language)
+        score = 0
+        if lang_code and lang_code in text:
+            score += 5
+        if language in text:
+            score += 8
+        if any(keyword in text for keyword in LANGUAGE_SCORE_KEYWORDS.get(language, ())):
+            score += 6
+        return score
+
+    def _gender_match(self, row, gender):
+        text = self._texts[row]
+        if gender == 'male':
+            return any(word in text for word in MALE_NAME_INDICATORS + MALE_MATCH_WORDS)
+        if gender == 'female':
+            return any(word in text for word in FEMALE_NAME_INDICATORS + FEMALE_MATCH_WORDS)
+        return True
+
+    def _language_match(self, row, language):
+        text = self._texts[row]
+        indicators = [language]
+        lang_code = self._language_codes.get(language)
+        if lang_code:
+            indicators.append(lang_code)
+        indicators.extend(LANGUAGE_MATCH_KEYWORDS.get(language, ()))
+        return any(indicator in text for indicator in indicators)
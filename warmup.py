@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Startup Warmup
+
+Pays every cold cost of the render hot path once per worker, before real
+traffic arrives: codec capability probing, the heavy audio imports (librosa
+alone takes seconds), the voice catalog and its index, the decoded music
+beds and the Gemini client. The first request is then as fast as the
+hundredth.
+
+Steps run in order in a background thread (or inline), and their progress is
+what the readiness endpoint reports.
+"""
+
+import time
+import importlib
+import threading
+
+
+# Imported on first use by the mixing path; importing them up front moves the cost to startup
+AUDIO_MODULES = ('numpy', 'soundfile', 'scipy.signal', 'librosa')
+
+
+def import_audio_modules():
+    """Import the heavy audio modules; missing optional ones are reported, not fatal."""
+    imported = []
+    for name in AUDIO_MODULES:
+        try:
+            importlib.import_module(name)
+            imported.append(name)
+        except ImportError as e:
+            print(f"⚠️  Warmup: {name} unavailable ({e})")
+    return imported
+
+
+def default_steps(speech_generator=None):
+    """
+    The warmup steps for an API worker.
+
+    Args:
+        speech_generator (ElevenLabsSpeechGenerator, optional): Steps needing it are skipped if None
+
+    Returns:
+        list of (name, callable)
+    """
+    from audio_codecs import detect_capabilities
+    from llm import get_client, get_script_cache
+
+    steps = [
+        ('codec_capabilities', detect_capabilities),
+        ('audio_modules', import_audio_modules),
+    ]
+    if speech_generator is not None:
+        steps += [
+            ('voice_catalog', lambda: len(speech_generator.get_voices())),
+            ('voice_index', lambda: speech_generator.get_voice_index() and True),
+            ('music_beds', speech_generator.warm_music_cache),
+        ]
+    steps += [
+        ('gemini_client', lambda: get_client() and True),
+        ('script_cache', lambda: get_script_cache().stats()['entries']),
+    ]
+    return steps
+
+
+class Warmup:
+    def __init__(self, steps):
+        """
+        Args:
+            steps (list): (name, callable) pairs, run in order
+        """
+        self.steps = steps
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._results = {name: {'status': 'pending'} for name, _ in steps}
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def start(self):
+        """Run the steps in a background thread; returns immediately."""
+        threading.Thread(target=self.run, name='warmup', daemon=True).start()
+        return self
+
+    def run(self):
+        """Run every step in order. A failing step is recorded and the rest still run."""
+        self.started_at = time.time()
+        for name, step in self.steps:
+            with self._lock:
+                self._results[name] = {'status': 'running'}
+            started = time.perf_counter()
+            try:
+                step()
+                result = {'status': 'done'}
+            except Exception as e:
+                print(f"⚠️  Warmup step {name} failed: {e}")
+                result = {'status': 'failed', 'error': str(e)}
+            result['seconds'] = round(time.perf_counter() - started, 3)
+            with self._lock:
+                self._results[name] = result
+        self.finished_at = time.time()
+        print(f"🔥 Warmup finished in {self.finished_at - self.started_at:.2f}s")
+        self._done.set()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until warmup finished; returns whether it did."""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        with self._lock:
+            steps = {name: dict(result) for name, result in self._results.items()}
+        return {
+            'ready': self.ready,
+            'ok': self.ready and all(step['status'] == 'done' for step in steps.values()),
+            'seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            'steps': steps,
+        }